@@ -0,0 +1,396 @@
+"""
+Benchmarks for the singleton access and construction paths.
+
+Every case is run against each available implementation (``singleton_base_legacy`` everywhere,
+``singleton_base_new`` on Python 3.11+) and for each requested thread count. Results are reported as
+nanoseconds per operation with percentiles taken over all samples from all threads, and can be saved as
+JSON and compared against a previous run to flag regressions.
+
+``method_call`` and ``method_call_after_reset`` time a method call on the instance, the second right after the
+instance has been reset and rebuilt. They should match: building or resetting an instance must not write to the
+class, which would throw away the attribute caches and specialized bytecode CPython keeps for it.
+
+``--scaling`` instead measures aggregate ``get_instance()`` throughput from one thread up to one per core, which
+shows whether the read path scales linearly on free-threaded builds.
+
+Usage::
+
+    python benchmarks/bench_singleton.py --output .benchmarks/results.json
+    python benchmarks/bench_singleton.py --baseline benchmarks/baselines/3.12.json --threshold 0.25
+    python -X gil=0 benchmarks/bench_singleton.py --scaling --min-efficiency 0.8
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+from threading import Barrier, Lock, Thread
+from time import perf_counter_ns
+from typing import Callable, Optional
+
+from singleton_base import singleton_base_legacy
+
+IMPLEMENTATIONS: dict[str, type] = {"legacy": singleton_base_legacy.SingletonBase}
+if sys.version_info >= (3, 11):
+    from singleton_base import singleton_base_new
+
+    IMPLEMENTATIONS["new"] = singleton_base_new.SingletonBase
+
+THREAD_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def make_target(base: type) -> type:
+    """Create a fresh singleton subclass of ``base`` so every case starts from a clean slate."""
+
+    class Target(base):
+        def __init__(self, value: int = 0):
+            self.value = value
+
+    return Target
+
+
+def make_method_target(base: type) -> type:
+    """Create a singleton subclass of ``base`` with a method, rebuilt after a fork so it records its arguments."""
+
+    class MethodTarget(base, fork_policy="reinit"):
+        def __init__(self, value: int = 0):
+            self.value = value
+
+        def read(self) -> int:
+            return self.value
+
+    return MethodTarget
+
+
+# region Cases
+
+
+def hot_get_instance(cls: type) -> Callable[[], object]:
+    cls.get_instance(init=True)
+    return cls.get_instance
+
+
+def hot_has_instance(cls: type) -> Callable[[], object]:
+    cls.get_instance(init=True)
+    return cls.has_instance
+
+
+def hot_call(cls: type) -> Callable[[], object]:
+    cls.get_instance(init=True)
+    return cls
+
+
+def hot_reset_instance(cls: type) -> Callable[[], object]:
+    return cls.reset_instance
+
+
+def cold_reset_and_construct(cls: type) -> Callable[[], object]:
+    def op():
+        cls.reset_instance()
+        return cls.get_instance(init=True)
+
+    return op
+
+
+HOT_CASES: dict[str, Callable[[type], Callable[[], object]]] = {
+    "get_instance": hot_get_instance,
+    "has_instance": hot_has_instance,
+    "call": hot_call,
+    "reset_instance": hot_reset_instance,
+    "reset_and_construct": cold_reset_and_construct,
+}
+
+# endregion
+
+# region Runners
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Summarize per-op timings (in ns) as mean and percentiles."""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+    else:
+        p50 = p90 = p99 = ordered[0]
+    return {
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+        "p50": p50,
+        "p90": p90,
+        "p99": p99,
+        "max": ordered[-1],
+    }
+
+
+def run_threads(thread_count: int, worker: Callable[[], list[float]]) -> tuple[list[float], int]:
+    """Run ``worker`` on ``thread_count`` threads released together, returning all samples and wall time in ns."""
+    barrier = Barrier(thread_count + 1)
+    samples: list[float] = []
+    samples_lock = Lock()
+
+    def target():
+        barrier.wait()
+        result = worker()
+        with samples_lock:
+            samples.extend(result)
+
+    threads = [Thread(target=target) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    start = perf_counter_ns()
+    barrier.wait()
+    for thread in threads:
+        thread.join()
+    return samples, perf_counter_ns() - start
+
+
+def bench_loop(op: Callable[[], object], thread_count: int, samples: int, inner: int) -> dict:
+    """Time ``inner`` back-to-back calls of ``op``, ``samples`` times per thread."""
+
+    def worker() -> list[float]:
+        timings = []
+        for _ in range(samples):
+            start = perf_counter_ns()
+            for _ in range(inner):
+                op()
+            timings.append((perf_counter_ns() - start) / inner)
+        return timings
+
+    timings, wall_ns = run_threads(thread_count, worker)
+    total_ops = thread_count * samples * inner
+    return {"ns_per_op": summarize(timings), "ops_per_sec": total_ops / (wall_ns / 1e9), "samples": len(timings)}
+
+
+def bench_method_call(base: type, thread_count: int, samples: int, inner: int, reset: bool) -> dict:
+    """Time ``inner`` calls of a method on the instance, resetting and rebuilding it before every sample if ``reset``."""
+    cls = make_method_target(base)
+    cls.get_instance(init=True)
+
+    def worker() -> list[float]:
+        timings = []
+        for _ in range(samples):
+            if reset:
+                cls.reset_instance()
+            instance = cls.get_instance(init=True)
+            start = perf_counter_ns()
+            for _ in range(inner):
+                instance.read()
+            timings.append((perf_counter_ns() - start) / inner)
+        return timings
+
+    timings, wall_ns = run_threads(thread_count, worker)
+    total_ops = thread_count * samples * inner
+    return {"ns_per_op": summarize(timings), "ops_per_sec": total_ops / (wall_ns / 1e9), "samples": len(timings)}
+
+
+def bench_contended_construction(base: type, thread_count: int, rounds: int) -> dict:
+    """Release ``thread_count`` threads at once against a cold singleton and time each first access."""
+    cls = make_target(base)
+    timings: list[float] = []
+    for _ in range(rounds):
+        cls.reset_instance()
+
+        def worker() -> list[float]:
+            start = perf_counter_ns()
+            cls.get_instance(init=True)
+            return [float(perf_counter_ns() - start)]
+
+        round_timings, _ = run_threads(thread_count, worker)
+        timings.extend(round_timings)
+    return {"ns_per_op": summarize(timings), "samples": len(timings)}
+
+
+def scaling_thread_counts() -> list[int]:
+    """Powers of two up to the number of cores, plus the number of cores itself."""
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def bench_scaling(base: type, thread_counts: list[int], ops: int, repeats: int) -> list[dict]:
+    """
+    Measure aggregate ``get_instance()`` throughput with ``ops`` calls per thread for each thread count.
+
+    The best of ``repeats`` runs is kept. Speedup is relative to the first thread count, and efficiency is the
+    speedup divided by the thread ratio, so 1.0 means perfectly linear scaling.
+    """
+    get_instance = hot_get_instance(make_target(base))
+
+    def worker() -> list[float]:
+        for _ in range(ops):
+            get_instance()
+        return []
+
+    results = []
+    for threads in thread_counts:
+        best_ns = min(run_threads(threads, worker)[1] for _ in range(repeats))
+        results.append({"threads": threads, "ops_per_sec": threads * ops / (best_ns / 1e9)})
+    first = results[0]
+    for result in results:
+        result["speedup"] = result["ops_per_sec"] / first["ops_per_sec"]
+        result["efficiency"] = result["speedup"] / (result["threads"] / first["threads"])
+    return results
+
+
+def run_all(
+    implementations: list[str],
+    thread_counts: list[int],
+    samples: int,
+    inner: int,
+    rounds: int,
+    out=sys.stdout,
+) -> list[dict]:
+    """Run every case for every implementation and thread count, printing a line per result."""
+    results = []
+    for impl in implementations:
+        base = IMPLEMENTATIONS[impl]
+        for threads in thread_counts:
+            for case, setup in HOT_CASES.items():
+                result = bench_loop(setup(make_target(base)), threads, samples, inner)
+                results.append({"implementation": impl, "case": case, "threads": threads, **result})
+                print(format_result(results[-1]), file=out)
+            for case, reset in (("method_call", False), ("method_call_after_reset", True)):
+                result = bench_method_call(base, threads, samples, inner, reset)
+                results.append({"implementation": impl, "case": case, "threads": threads, **result})
+                print(format_result(results[-1]), file=out)
+            result = bench_contended_construction(base, threads, rounds)
+            results.append({"implementation": impl, "case": "contended_construction", "threads": threads, **result})
+            print(format_result(results[-1]), file=out)
+    return results
+
+
+def format_result(result: dict) -> str:
+    ns = result["ns_per_op"]
+    return (
+        f"{result['implementation']:<7} {result['case']:<24} threads={result['threads']:<3} "
+        f"mean={ns['mean']:>10.1f}ns p50={ns['p50']:>10.1f}ns p90={ns['p90']:>10.1f}ns p99={ns['p99']:>10.1f}ns"
+    )
+
+
+def format_scaling(implementation: str, result: dict) -> str:
+    return (
+        f"{implementation:<7} {'scaling':<24} threads={result['threads']:<3} "
+        f"ops/s={result['ops_per_sec']:>14,.0f} speedup={result['speedup']:>6.2f}x "
+        f"efficiency={result['efficiency'] * 100:>5.1f}%"
+    )
+
+
+# endregion
+
+# region Baselines
+
+
+def result_key(result: dict) -> tuple[str, str, int]:
+    return result["implementation"], result["case"], result["threads"]
+
+
+def find_regressions(results: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    """Return a message for every result whose p50 is more than ``threshold`` slower than the baseline."""
+    previous = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        new_p50, old_p50 = result["ns_per_op"]["p50"], old["ns_per_op"]["p50"]
+        if old_p50 > 0 and new_p50 > old_p50 * (1 + threshold):
+            impl, case, threads = result_key(result)
+            regressions.append(
+                f"{impl} {case} threads={threads}: p50 {old_p50:.1f}ns -> {new_p50:.1f}ns "
+                f"(+{(new_p50 / old_p50 - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": sys.implementation.name,
+        "platform": platform.platform(),
+        "cpu_count": str(os.cpu_count()),
+        "gil_enabled": str(getattr(sys, "_is_gil_enabled", lambda: True)()),
+    }
+
+
+# endregion
+
+
+def write_output(path: Optional[str], data: dict) -> None:
+    if path:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Results written to {path}")
+
+
+def main_scaling(args: argparse.Namespace) -> int:
+    """Run the scaling benchmark, returning 1 if ``--min-efficiency`` is not met."""
+    thread_counts = args.threads if args.threads != THREAD_COUNTS else scaling_thread_counts()
+    env = environment()
+    print(f"GIL enabled: {env['gil_enabled']}, cores: {env['cpu_count']}")
+    scaling = {}
+    for impl in args.implementations:
+        scaling[impl] = bench_scaling(IMPLEMENTATIONS[impl], thread_counts, args.ops, args.repeats)
+        for result in scaling[impl]:
+            print(format_scaling(impl, result))
+    write_output(args.output, {"environment": env, "scaling": scaling})
+
+    if args.min_efficiency is not None:
+        failures = [
+            f"{impl} threads={result['threads']}: efficiency {result['efficiency'] * 100:.1f}%"
+            for impl, results in scaling.items()
+            for result in results
+            if result["efficiency"] < args.min_efficiency
+        ]
+        for failure in failures:
+            print(f"POOR SCALING: {failure}")
+        if failures:
+            return 1
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--implementations", nargs="+", choices=sorted(IMPLEMENTATIONS), default=sorted(IMPLEMENTATIONS)
+    )
+    parser.add_argument("--threads", nargs="+", type=int, default=THREAD_COUNTS)
+    parser.add_argument("--samples", type=int, default=20, help="timed samples per thread for loop cases")
+    parser.add_argument("--inner", type=int, default=1000, help="operations per timed sample")
+    parser.add_argument("--rounds", type=int, default=20, help="rounds for contended construction")
+    parser.add_argument("--output", help="write JSON results to this path")
+    parser.add_argument("--baseline", help="compare p50 against this JSON results file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--scaling", action="store_true", help="measure get_instance throughput from 1 to N cores")
+    parser.add_argument("--ops", type=int, default=200_000, help="get_instance calls per thread when scaling")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per thread count when scaling, best is kept")
+    parser.add_argument("--min-efficiency", type=float, help="fail if scaling efficiency drops below this (0.8 = 80%%)")
+    args = parser.parse_args(argv)
+
+    if args.scaling:
+        return main_scaling(args)
+
+    results = run_all(args.implementations, args.threads, args.samples, args.inner, args.rounds)
+    write_output(args.output, {"environment": environment(), "results": results})
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
+import os
+
 import nox
 
 VERSIONS = ["3.9", "3.10", "3.11", "3.12", "3.13"]
+FREE_THREADED_VERSIONS = ["3.13t", "3.14t"]
 
 
 @nox.session(venv_backend="uv", tags=["lint"])
@@ -66,5 +69,32 @@ def black(session):
 @nox.session(python=VERSIONS, venv_backend="uv")
 def test_all_tests(session):
     session.install("-e", ".")
-    session.install("pytest")
+    session.install("pytest", "pytest-xdist")
     session.run("pytest")
+
+
+@nox.session(python=FREE_THREADED_VERSIONS, venv_backend="uv")
+def test_free_threaded(session):
+    """Run the tests on free-threaded builds, keeping the GIL off even if a dependency asks for it"""
+    session.install("-e", ".")
+    session.install("pytest", "pytest-xdist")
+    session.run("pytest", env={"PYTHON_GIL": "0"})
+
+
+@nox.session(python=VERSIONS, venv_backend="uv", tags=["bench"], default=False)
+def benchmark(session):
+    """Run the singleton benchmarks, comparing against a saved baseline when one exists"""
+    session.install("-e", ".")
+    args = ["--output", f".benchmarks/{session.python}.json"]
+    baseline = f"benchmarks/baselines/{session.python}.json"
+    if os.path.exists(baseline):
+        args += ["--baseline", baseline]
+    session.run("python", "benchmarks/bench_singleton.py", *args, *session.posargs)
+
+
+@nox.session(python=FREE_THREADED_VERSIONS, venv_backend="uv", tags=["bench"], default=False)
+def benchmark_scaling(session):
+    """Check that get_instance throughput scales with cores on free-threaded builds"""
+    session.install("-e", ".")
+    args = ["--scaling", "--output", f".benchmarks/scaling-{session.python}.json", "--min-efficiency", "0.8"]
+    session.run("python", "benchmarks/bench_singleton.py", *args, *session.posargs, env={"PYTHON_GIL": "0"})
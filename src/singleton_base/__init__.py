@@ -2,6 +2,43 @@
 
 import sys
 
+from .singleton_base_async import AsyncSingletonBase
+from .singleton_base_host import HostProxy, HostSingletonBase
+from .singleton_base_keyed import KeyedSingletonBase
+from .singleton_base_mapped import MappedSingletonBase, MappedStrings, write_mapped_file
+from .singleton_base_pool import PooledSingletonBase
+from .singleton_base_sharded import ShardedSingletonBase
+from .singleton_base_ttl import RefreshingSingletonBase
+from .singleton_deadlock import (
+    ConstructionDeadlockError,
+    SingletonTimeoutError,
+    constructions_in_progress,
+    disable_deadlock_detection,
+    enable_deadlock_detection,
+)
+from .singleton_fork import preload_and_freeze
+from .singleton_introspect import SingletonInfo, deep_sizeof, live_singletons
+from .singleton_metrics import (
+    SingletonStats,
+    add_metrics_hook,
+    disable_metrics,
+    enable_metrics,
+    metrics_snapshot,
+    remove_metrics_hook,
+)
+from .singleton_profile import ConstructionProfile, record_constructions, start_recording, stop_recording
+from .singleton_proxy import SingletonProxy
+from .singleton_registry import DependencyCycleError, registered_singletons, warm_up
+from .singleton_shutdown import (
+    ShutdownReport,
+    ashutdown_all,
+    disable_shutdown_at_exit,
+    enable_shutdown_at_exit,
+    shutdown_all,
+)
+from .singleton_snapshot import restore_all, snapshot_all
+from .singleton_testing import override_instance, reset_all
+
 __version__ = "1.0.8"
 
 
@@ -11,4 +48,49 @@ else:
     from .singleton_base_new import SingletonBase
 
 
-__all__ = ["SingletonBase", "__version__"]
+__all__ = [
+    "AsyncSingletonBase",
+    "ConstructionDeadlockError",
+    "ConstructionProfile",
+    "DependencyCycleError",
+    "HostProxy",
+    "HostSingletonBase",
+    "KeyedSingletonBase",
+    "MappedSingletonBase",
+    "MappedStrings",
+    "PooledSingletonBase",
+    "RefreshingSingletonBase",
+    "ShardedSingletonBase",
+    "ShutdownReport",
+    "SingletonBase",
+    "SingletonInfo",
+    "SingletonProxy",
+    "SingletonStats",
+    "SingletonTimeoutError",
+    "add_metrics_hook",
+    "ashutdown_all",
+    "constructions_in_progress",
+    "deep_sizeof",
+    "disable_deadlock_detection",
+    "disable_metrics",
+    "disable_shutdown_at_exit",
+    "enable_deadlock_detection",
+    "enable_metrics",
+    "enable_shutdown_at_exit",
+    "live_singletons",
+    "metrics_snapshot",
+    "override_instance",
+    "preload_and_freeze",
+    "record_constructions",
+    "registered_singletons",
+    "remove_metrics_hook",
+    "reset_all",
+    "restore_all",
+    "shutdown_all",
+    "snapshot_all",
+    "start_recording",
+    "stop_recording",
+    "warm_up",
+    "write_mapped_file",
+    "__version__",
+]
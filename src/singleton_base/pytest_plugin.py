@@ -0,0 +1,168 @@
+"""
+Pytest plugin for isolating singletons between tests, loaded automatically once ``singleton-base`` is installed.
+
+- ``singleton_autoreset = true`` in the pytest configuration resets every singleton after each test. Without it,
+  request the ``reset_singletons`` fixture in the tests or modules that need it.
+- The session-scoped ``frozen_singleton`` fixture builds a singleton once for the whole session. It is never reset,
+  and a test that rebinds its attributes or resizes a list, dict or set it holds fails and has its state put back.
+  ``singleton_check_frozen_deep = true`` also catches changes that keep those sizes, by pickling the instance after
+  every test.
+- ``override_instance(cls, obj)`` swaps in a fake for the duration of a ``with`` block.
+
+Every pytest-xdist worker is its own process, so each one keeps its own singletons and frozen instances.
+"""
+
+import pickle
+from typing import Any, Callable, Iterator, Optional
+
+import pytest
+
+from .singleton_testing import override_instance, reset_all
+
+_CONTAINERS = (list, dict, set, bytearray)
+
+
+class _Frozen:
+    """A session-wide instance and the state it must keep."""
+
+    __slots__ = ("instance", "fingerprint", "pickled")
+
+    def __init__(self, instance: Any):
+        self.instance = instance
+        self.fingerprint = _fingerprint(instance)
+        self.pickled = _pickled(instance)
+
+    def changed(self, deep: bool) -> bool:
+        """Return whether a test changed the instance, pickling it again only if ``deep``."""
+        if _fingerprint(self.instance) != self.fingerprint:
+            return True
+        return deep and self.pickled is not None and _pickled(self.instance) != self.pickled
+
+    def restore(self) -> bool:
+        """Put the attributes saved when the instance was frozen back onto it, keeping its identity. Return success."""
+        if self.pickled is None or not hasattr(self.instance, "__dict__"):
+            return False
+        attributes = vars(pickle.loads(self.pickled))
+        vars(self.instance).clear()
+        vars(self.instance).update(attributes)
+        self.fingerprint = _fingerprint(self.instance)
+        return True
+
+
+_frozen: dict[type, _Frozen] = {}
+
+
+def _fingerprint(instance: Any) -> Optional[dict[str, tuple[int, int]]]:
+    """
+    Capture cheaply what a test could change about ``instance``: the identity of each attribute, and the length of
+    those that are lists, dicts, sets or bytearrays. Catches rebinding and resizing, not every change made inside.
+    """
+    if not hasattr(instance, "__dict__"):
+        return None
+    return {
+        name: (id(value), len(value) if isinstance(value, _CONTAINERS) else -1)
+        for name, value in vars(instance).items()
+    }
+
+
+def _pickled(instance: Any) -> Optional[bytes]:
+    """Return the pickled form of ``instance``, or ``None`` if it cannot be pickled."""
+    try:
+        return pickle.dumps(instance, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+
+def _check_frozen(check_state: bool, deep: bool) -> list[str]:
+    """Put every frozen instance back in place and return the names of those the test mutated."""
+    mutated = []
+    for cls, frozen in _frozen.items():
+        with cls._lock:
+            if cls._slot.instance is not frozen.instance:
+                cls.reset_instance(all_scopes=True)
+                cls._slot.instance = frozen.instance
+        if check_state and frozen.changed(deep):
+            restored = frozen.restore()
+            mutated.append(cls.__qualname__ + ("" if restored else " (could not be restored)"))
+    return mutated
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addini("singleton_autoreset", "Reset every singleton after each test.", type="bool", default=False)
+    parser.addini(
+        "singleton_check_frozen",
+        "Fail tests that mutate an instance built by the frozen_singleton fixture.",
+        type="bool",
+        default=True,
+    )
+    parser.addini(
+        "singleton_check_frozen_deep",
+        "Also pickle every frozen instance after each test, to catch changes that keep attribute sizes.",
+        type="bool",
+        default=False,
+    )
+
+
+# region Fixtures
+
+
+@pytest.fixture(autouse=True)
+def _singleton_isolation(request: pytest.FixtureRequest) -> Iterator[None]:
+    yield
+    config = request.config
+    mutated = []
+    if _frozen:
+        mutated = _check_frozen(config.getini("singleton_check_frozen"), config.getini("singleton_check_frozen_deep"))
+    if request.config.getini("singleton_autoreset"):
+        reset_all(frozenset(_frozen))
+    if mutated:
+        pytest.fail(f"Test mutated frozen singleton {', '.join(mutated)}", pytrace=False)
+
+
+@pytest.fixture
+def reset_singletons() -> Iterator[None]:
+    """Reset every singleton except frozen ones after the test."""
+    yield
+    reset_all(frozenset(_frozen))
+
+
+@pytest.fixture(scope="session")
+def frozen_singleton() -> Iterator[Callable[..., Any]]:
+    """
+    Return ``freeze(cls, **kwargs)``, which builds ``cls`` with ``kwargs`` on first use and returns the same
+    instance for the rest of the session.
+
+    Frozen instances are not reset between tests. After each test the identity of every attribute, and the length
+    of every list, dict, set and bytearray among them, is compared with the state when the instance was frozen. A
+    test that changed it fails and has the original state put back from a pickle taken when it was frozen. With
+    ``singleton_check_frozen_deep`` the instance is also pickled again after each test and compared in full.
+    """
+
+    def freeze(cls: type, **kwargs) -> Any:
+        frozen = _frozen.get(cls)
+        if frozen is None:
+            frozen = _frozen[cls] = _Frozen(cls.get_instance(init=True, **kwargs))
+        return frozen.instance
+
+    yield freeze
+    for cls in _frozen:
+        cls.reset_instance(all_scopes=True)
+    _frozen.clear()
+
+
+@pytest.fixture
+def singleton_override() -> Iterator[Callable[[type, Any], Any]]:
+    """Return ``override(cls, obj)``, which makes ``obj`` the instance of ``cls`` until the test ends."""
+    overrides = []
+
+    def override(cls: type, obj: Any) -> Any:
+        context = override_instance(cls, obj)
+        overrides.append(context)
+        return context.__enter__()
+
+    yield override
+    for context in reversed(overrides):
+        context.__exit__(None, None, None)
+
+
+# endregion
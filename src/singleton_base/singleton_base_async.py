@@ -0,0 +1,161 @@
+import asyncio
+import sys
+from typing import Any, Callable, Optional, TypeVar
+
+from .singleton_fork import REINIT
+from .singleton_profile import caller_site, constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase, SingletonMeta
+else:
+    from .singleton_base_new import SingletonBase, SingletonMeta
+
+T = TypeVar("T", bound="AsyncSingletonBase")
+
+
+class _AsyncState:
+    """
+    The construction in flight, if any, that concurrent ``aget_instance`` calls on its event loop all await.
+    Guarded by the class lock.
+    """
+
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        self.pending: Optional[asyncio.Future] = None
+
+
+class AsyncSingletonMeta(SingletonMeta):
+    """Metaclass for singletons that are constructed by awaiting ``aget_instance(init=True)``."""
+
+    _async: _AsyncState
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        if cls._fork_policy == REINIT:
+            raise ValueError(
+                f"{name} cannot use fork_policy={REINIT!r}: it is initialized asynchronously, which a fork handler "
+                "cannot wait for. Use fork_policy='reset' and await aget_instance(init=True) in the child instead."
+            )
+        cls._async = _AsyncState()
+
+    def __call__(cls, *args, **kwargs):
+        instance = cls._slot.instance
+        if instance is None:
+            raise RuntimeError(
+                f"{cls.__name__} is initialized asynchronously, use `await {cls.__name__}.aget_instance(init=True)`"
+            )
+        return instance
+
+
+class AsyncSingletonBase(SingletonBase, metaclass=AsyncSingletonMeta, _abstract=True):
+    """A base class for singleton classes whose initialization is awaited instead of blocking"""
+
+    _restorable = False
+
+    async def ainit(self) -> None:
+        """Async initialization hook, awaited once after ``__init__`` and before the instance is published."""
+
+    # region Private Class Methods
+
+    @classmethod
+    def _after_fork(cls) -> None:
+        """Also forget a construction in flight, whose event loop is not running in the child."""
+        super()._after_fork()
+        cls._async.pending = None
+
+    @classmethod
+    async def _abuild(cls: type[T], kwargs: dict, site: Optional[str]) -> T:
+        """
+        Build, initialize and publish the instance, and return the published one. Only one of these runs at a time
+        per event loop. If a build on another loop published first, its instance wins and this one is dropped.
+        """
+        try:
+            with constructing(cls, site=site):
+                instance = type.__call__(cls, **kwargs)
+                await instance.ainit()
+            with cls._lock:
+                published = cls._slot.instance
+                if published is None:
+                    cls._publish(instance)
+                    published = instance
+            return published
+        finally:
+            # Only the build registered as pending clears it, never one that started on another loop meanwhile.
+            with cls._lock:
+                if cls._async.pending is asyncio.current_task():
+                    cls._async.pending = None
+
+    # endregion
+
+    # region Public Class Methods
+
+    @classmethod
+    async def aget_instance(cls: type[T], init: bool = False, **kwargs) -> T:
+        """
+        Return the singleton instance, awaiting its construction if it does not yet exist.
+
+        Coroutines that ask for a cold singleton at the same time all await the same construction, which
+        runs ``__init__(**kwargs)`` followed by ``await ainit()``. The class lock is only held for bookkeeping,
+        never while ``ainit()`` runs, so the event loop is not blocked. Cancelling one caller does not cancel the
+        construction the others are waiting on. Callers on another event loop cannot await that construction, so
+        they run their own, and every caller gets whichever instance was published first.
+
+        Args:
+            init: Whether to initialize the instance if it does not yet exist.
+            **kwargs: Arguments passed to ``__init__`` when creating the instance.
+
+        Returns:
+            T: The singleton instance of the class.
+
+        Raises:
+            RuntimeError: If ``init`` is ``False`` and the instance has not been initialized.
+        """
+        instance: Optional[T] = cls._slot.instance
+        if instance is not None:
+            return instance
+        if not init:
+            raise RuntimeError(f"Instance of {cls.__name__} is not initialized yet")
+        site = caller_site()
+        with cls._lock:
+            instance = cls._slot.instance
+            if instance is not None:
+                return instance
+            pending = cls._async.pending
+            if pending is None or pending.done() or pending.get_loop().is_closed():
+                pending = cls._async.pending = asyncio.ensure_future(cls._abuild(kwargs, site))
+            elif pending.get_loop() is not asyncio.get_running_loop():
+                pending = None
+        if pending is None:
+            # Another loop is building it, and its task cannot be awaited here: build one too, and the first to
+            # finish is published and returned by both.
+            return await cls._abuild(kwargs, site)
+        return await asyncio.shield(pending)
+
+    @classmethod
+    async def areload(cls: type[T], on_retired: Optional[Callable[[], Any]] = None, **kwargs) -> T:
+        """
+        Build and initialize a new instance with ``kwargs``, then swap it in atomically as ``replace_instance`` does.
+
+        Readers keep getting the current instance while ``__init__`` and ``ainit()`` run. If either raises, the
+        current instance stays in place. When reloads overlap, the one that finishes last wins.
+
+        Args:
+            on_retired: Called without arguments once the old instance is no longer referenced anywhere.
+            **kwargs: Arguments passed to ``__init__``.
+
+        Returns:
+            T: The new instance.
+        """
+        with constructing(cls, site=caller_site()):
+            instance = type.__call__(cls, **kwargs)
+            await instance.ainit()
+        cls.replace_instance(instance, on_retired)
+        return instance
+
+    @classmethod
+    def reload(cls, *args, **kwargs):
+        """Async singletons are reloaded with ``await areload()``, which also awaits ``ainit()``."""
+        raise TypeError(f"{cls.__name__} is initialized asynchronously, use `await {cls.__name__}.areload()`")
+
+    # endregion
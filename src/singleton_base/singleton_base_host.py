@@ -0,0 +1,421 @@
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.reduction import ForkingPickler
+from threading import Thread, local
+from time import monotonic, sleep
+from typing import Any, Optional
+
+from .singleton_deadlock import construction_lock
+from .singleton_fork import REINIT
+from .singleton_profile import constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase, SingletonMeta
+else:
+    from .singleton_base_new import SingletonBase, SingletonMeta
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+_AUTHKEY_FILE = "authkey"
+_AUTHKEY_BYTES = 32
+_authkeys: dict[str, bytes] = {}
+
+# A request is a list of (method name, args, kwargs); the reply is a list of (ok, result or exception).
+Call = tuple[str, tuple, dict]
+
+
+def _run_calls(instance: Any, calls: list[Call]) -> list[tuple[bool, Any]]:
+    results = []
+    for name, args, kwargs in calls:
+        try:
+            results.append((True, getattr(instance, name)(*args, **kwargs)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+def _dump_replies(calls: list[Call], replies: list[tuple[bool, Any]]) -> bytes:
+    """Pickle ``replies``, replacing any result or exception that cannot be pickled with a ``TypeError`` saying so."""
+    try:
+        return bytes(ForkingPickler.dumps(replies))
+    except Exception:
+        pass
+    checked = []
+    for (name, _, _), (ok, value) in zip(calls, replies):
+        try:
+            ForkingPickler.dumps(value)
+        except Exception as e:
+            what = "result" if ok else f"{type(value).__name__} raised"
+            ok, value = False, TypeError(f"The owner could not pickle the {what} by {name}(): {e}")
+        checked.append((ok, value))
+    return bytes(ForkingPickler.dumps(checked))
+
+
+def _unwrap(result: tuple[bool, Any]) -> Any:
+    ok, value = result
+    if not ok:
+        raise value
+    return value
+
+
+class _HostServer:
+    """Serves the owning process's instance to the other processes on the host."""
+
+    def __init__(self, instance: Any, address: str, authkey: bytes, lock_fd: int):
+        self.instance = instance
+        self.address = address
+        self.authkey = authkey
+        self.lock_fd = lock_fd
+        self.pid = os.getpid()
+        self.closed = False
+        if os.path.exists(address):
+            os.unlink(address)  # left behind by a previous owner that died
+        self.listener = Listener(address, family="AF_UNIX", authkey=authkey)
+        Thread(target=self._accept, name=f"singleton-host-{os.path.basename(address)}", daemon=True).start()
+
+    def _accept(self) -> None:
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                return
+            if self.closed:
+                conn.close()
+                return
+            Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    request = conn.recv_bytes()
+                except (EOFError, OSError):
+                    return
+                # A request or reply that cannot be (un)pickled fails that call only, and the owner keeps serving.
+                try:
+                    calls = pickle.loads(request)
+                except Exception as e:
+                    failed = [(False, TypeError(f"The owner could not unpickle the call: {e}"))]
+                    reply = bytes(ForkingPickler.dumps(failed))
+                else:
+                    reply = _dump_replies(calls, _run_calls(self.instance, calls))
+                try:
+                    conn.send_bytes(reply)
+                except OSError:
+                    return
+
+    def close(self) -> None:
+        """Stop serving and give up ownership. In a forked child this only drops the inherited descriptors."""
+        self.closed = True
+        if self.pid == os.getpid():
+            try:
+                Client(self.address, family="AF_UNIX", authkey=self.authkey).close()  # wake up accept()
+            except OSError:
+                pass
+        # Closing the listener also removes the socket file, but only in the process that created it.
+        self.listener.close()
+        os.close(self.lock_fd)
+
+
+class HostProxy:
+    """
+    Stand-in for a host-scoped singleton owned by another process.
+
+    Every attribute is treated as a method: ``proxy.name(*args, **kwargs)`` runs ``name`` on the real instance
+    in the owning process and returns the result. Arguments, results and exceptions must be picklable; a result
+    or exception the owner cannot pickle raises ``TypeError`` for that call. If the owner has exited, the next
+    call elects a new owner, which may be this process. A call that was already sent when the owner went away is
+    not sent again, since it may have run, and raises ``ConnectionError`` instead.
+    """
+
+    __slots__ = ("__cls", "__local", "__owned")
+
+    def __init__(self, cls: type):
+        self.__cls = cls
+        self.__local = local()
+        self.__owned: Optional[Any] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def remote_method(*args, **kwargs):
+            return _unwrap(self.__send([(name, args, kwargs)])[0])
+
+        remote_method.__name__ = name
+        return remote_method
+
+    def __connection(self) -> Optional[Connection]:
+        """Return this thread's connection to the owner, or ``None`` once this process has become the owner."""
+        conn = getattr(self.__local, "conn", None)
+        if conn is not None:
+            # The owner never sends anything unasked, so a readable idle connection means it has closed.
+            if not conn.poll():
+                return conn
+            conn.close()
+            self.__local.conn = None
+        cls = self.__cls
+        deadline = monotonic() + cls.host_connect_timeout
+        while self.__owned is None:
+            try:
+                conn = self.__local.conn = Client(cls.host_address, family="AF_UNIX", authkey=cls._authkey())
+                return conn
+            except (FileNotFoundError, ConnectionRefusedError):
+                if monotonic() > deadline:
+                    raise TimeoutError(f"Could not reach the owner of {cls.__name__} at {cls.host_address}")
+                # The owner may still be building the instance, or may have exited without a successor.
+                cls._reelect(self)
+                if self.__owned is None:
+                    sleep(0.05)
+        return None
+
+    def __send(self, calls: list[Call]) -> list[tuple[bool, Any]]:
+        conn = self.__connection()
+        if conn is None:
+            return _run_calls(self.__owned, calls)
+        try:
+            conn.send(calls)
+            return conn.recv()
+        except (EOFError, ConnectionError) as e:
+            # The owner went away, possibly after running the calls, so they are not retried. The next call
+            # reconnects to a new owner or takes over ownership.
+            self.__local.conn = None
+            conn.close()
+            raise ConnectionError(f"Lost the owner of {self.__cls.__name__} during a call") from e
+
+    def __repr__(self) -> str:
+        return f"<HostProxy for {self.__cls.__name__} at {self.__cls.host_address}>"
+
+
+class HostBatch:
+    """
+    Queues method calls on a host-scoped singleton and sends them to the owner in a single round trip.
+
+    Calls are queued by calling methods on the batch inside the ``with`` block and run in order when the
+    block exits. Their return values are then available as ``results``; the first call that raised is
+    re-raised after all of them have run. A batch saves round trips but is not atomic.
+    """
+
+    __slots__ = ("__cls", "__calls", "results")
+
+    def __init__(self, cls: type):
+        self.__cls = cls
+        self.__calls: list[Call] = []
+        self.results: list[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> None:
+            self.__calls.append((name, args, kwargs))
+
+        return queue
+
+    def __enter__(self) -> "HostBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None or not self.__calls:
+            return
+        instance = self.__cls.get_instance()
+        if isinstance(instance, HostProxy):
+            replies = instance._HostProxy__send(self.__calls)
+        else:
+            replies = _run_calls(instance, self.__calls)
+        self.results = [_unwrap(reply) for reply in replies]
+
+
+def _default_address(cls: type) -> str:
+    """Socket path for ``cls`` in a directory private to the current user, short enough for AF_UNIX."""
+    digest = hashlib.sha1(f"{cls.__module__}.{cls.__qualname__}".encode()).hexdigest()[:16]
+    user = os.getuid() if hasattr(os, "getuid") else os.getlogin()
+    return os.path.join(tempfile.gettempdir(), f"singleton-base-{user}", f"{cls.__name__[:40]}-{digest}.sock")
+
+
+def _private_dir(path: str) -> str:
+    """
+    Create ``path`` as a directory only the current user can use, or check that an existing one is.
+
+    Raises:
+        PermissionError: If ``path`` is not a real directory owned by the current user with mode ``0o700``,
+            e.g. because another user created it first to intercept the sockets in it.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    else:
+        os.chmod(path, 0o700)  # in case the umask took away some of the owner's bits
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) != 0o700:
+        raise PermissionError(
+            f"{path} must be a directory owned by uid {os.getuid()} with mode 0700, "
+            f"found uid {st.st_uid} and mode {stat.S_IMODE(st.st_mode):o}"
+        )
+    return path
+
+
+def _user_authkey(directory: str) -> bytes:
+    """
+    Return the random key that authenticates the current user's processes to each other, stored in ``directory``.
+
+    The first process to need it writes it to a temporary file and links it into place, so others never read a
+    partly written key.
+    """
+    key = _authkeys.get(directory)
+    if key is not None:
+        return key
+    path = os.path.join(_private_dir(directory), _AUTHKEY_FILE)
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+        try:
+            os.fchmod(fd, 0o600)
+            os.write(fd, os.urandom(_AUTHKEY_BYTES))
+        finally:
+            os.close(fd)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp)
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC | getattr(os, "O_NOFOLLOW", 0))
+    try:
+        st = os.fstat(fd)
+        if st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) != 0o600:
+            raise PermissionError(f"{path} must be owned by uid {os.getuid()} with mode 0600")
+        key = os.read(fd, _AUTHKEY_BYTES)
+    finally:
+        os.close(fd)
+    if len(key) != _AUTHKEY_BYTES:
+        raise PermissionError(f"{path} does not hold a {_AUTHKEY_BYTES}-byte key")
+    _authkeys[directory] = key
+    return key
+
+
+class _HostState:
+    """The server sharing the real instance, while this process owns it."""
+
+    __slots__ = ("server",)
+
+    def __init__(self):
+        self.server: Optional[_HostServer] = None
+
+
+class HostSingletonMeta(SingletonMeta):
+    """Metaclass for singletons that are shared by every process on the host."""
+
+    _host: _HostState
+    host_address: str
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        cls._host = _HostState()
+        if "host_address" not in namespace:
+            cls.host_address = _default_address(cls)
+
+    def __call__(cls, *args, **kwargs):
+        instance = cls._slot.instance
+        if instance is None:
+            with construction_lock(cls):
+                instance = cls._slot.instance
+                if instance is None:
+                    cls._state.fork_args = (args, kwargs)
+                    instance = cls._take_ownership()
+                    if instance is None:
+                        instance = HostProxy(cls)
+                    cls._slot.instance = instance
+        return instance
+
+    def _take_ownership(cls) -> Optional[Any]:
+        """Build and serve the real instance unless another process on the host already owns it."""
+        if fcntl is None:
+            raise OSError(f"{cls.__name__} is host-scoped, which needs fcntl and Unix domain sockets")
+        authkey = cls._authkey()
+        # The owner holds an exclusive lock on this file for as long as it lives. The kernel drops the lock
+        # when the owner exits, however it exits, which is what lets another process take over.
+        lock_fd = os.open(cls.host_address + ".lock", os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            return None
+        try:
+            args, kwargs = cls._fork_args
+            with constructing(cls):
+                instance = type.__call__(cls, *args, **kwargs)
+            cls._host.server = _HostServer(instance, cls.host_address, authkey, lock_fd)
+        except BaseException:
+            os.close(lock_fd)
+            raise
+        return instance
+
+    def _authkey(cls) -> bytes:
+        """Return ``host_authkey``, or the current user's random key if it is not set."""
+        if cls.host_authkey is not None:
+            _private_dir(os.path.dirname(cls.host_address))
+            return cls.host_authkey
+        return _user_authkey(os.path.dirname(cls.host_address))
+
+    def _reelect(cls, proxy: HostProxy) -> None:
+        """Try to take over from an owner that is gone, pointing ``proxy`` at the new local instance if we win."""
+        with cls._lock:
+            if proxy._HostProxy__owned is not None or cls._host.server is not None:
+                return
+            instance = cls._take_ownership()
+            if instance is not None:
+                proxy._HostProxy__owned = instance
+                if cls._slot.instance is proxy:
+                    cls._slot.instance = instance
+
+
+class HostSingletonBase(SingletonBase, metaclass=HostSingletonMeta, fork_policy=REINIT, _abstract=True):
+    """
+    A base class for singletons shared by every process on the host.
+
+    The first process to construct the singleton owns the real instance and serves it on a Unix domain socket.
+    Every other process gets a ``HostProxy`` that forwards method calls to it. When the owner exits, the next
+    call from another process elects a new owner, which builds a fresh instance with the arguments it was
+    given. Remote calls are served on threads, so the instance must be thread-safe.
+
+    The socket lives in a directory that must belong to the current user with mode ``0o700``. Connections are
+    authenticated with ``host_authkey``, by default a random key generated once per user and kept in that
+    directory with mode ``0o600``, so only the current user's processes can call the instance.
+    """
+
+    host_authkey: Optional[bytes] = None
+    host_connect_timeout: float = 30.0
+    _swappable = False
+    _restorable = False
+
+    @classmethod
+    def is_owner(cls) -> bool:
+        """Return ``True`` if this process owns the real instance."""
+        return cls._host.server is not None
+
+    @classmethod
+    def batch(cls) -> HostBatch:
+        """Return a context manager that sends the method calls queued on it in one round trip."""
+        return HostBatch(cls)
+
+    @classmethod
+    def reset_instance(cls, all_scopes: bool = False) -> None:
+        """Reset the singleton instance, giving up ownership if this process is the owner."""
+        with cls._lock:
+            if cls._host.server is not None:
+                cls._host.server.close()
+                cls._host.server = None
+            super().reset_instance(all_scopes)
@@ -0,0 +1,206 @@
+import sys
+from collections import OrderedDict
+from collections.abc import Hashable
+from threading import Lock, RLock
+from typing import Any, Optional, TypeVar
+
+from .singleton_deadlock import SingletonTimeoutError
+from .singleton_fork import REINIT
+from .singleton_profile import constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase, SingletonMeta
+else:
+    from .singleton_base_new import SingletonBase, SingletonMeta
+
+T = TypeVar("T", bound="KeyedSingletonBase")
+
+
+class _KeyedState:
+    """Per-class instance map, construction locks and counters of a keyed singleton."""
+
+    __slots__ = ("lock", "instances", "key_locks", "hits", "misses", "evictions")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.instances: OrderedDict[Hashable, Any] = OrderedDict()
+        self.key_locks: dict[Hashable, RLock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+class KeyedSingletonMeta(SingletonMeta):
+    """Metaclass for singletons that keep one instance per key."""
+
+    _keyed: _KeyedState
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        if cls._fork_policy == REINIT:
+            raise ValueError(
+                f"{name} cannot use fork_policy={REINIT!r}: it keeps one instance per key, which a fork handler "
+                "cannot rebuild. Use fork_policy='reset' and get the keys it needs in the child instead."
+            )
+        cls._keyed = _KeyedState()
+
+    def __call__(cls, *args, **kwargs):
+        raise RuntimeError(f"{cls.__name__} is keyed, use `{cls.__name__}.get_instance(key, init=True)`")
+
+
+class KeyedSingletonBase(SingletonBase, metaclass=KeyedSingletonMeta, _abstract=True):
+    """
+    A base class for multitons: one instance per key, such as one client per tenant or region.
+
+    At most ``max_instances`` instances are kept (``None`` for no limit). When a new key would exceed it, the
+    least recently used instance is evicted and handed to ``on_evict``. Instances for different keys are built
+    in parallel; only callers asking for the same key wait for each other.
+    """
+
+    max_instances: Optional[int] = 128
+    _swappable = False
+    _restorable = False
+
+    @classmethod
+    def on_evict(cls, key: Hashable, instance: Any) -> None:
+        """Hook called with every instance evicted to make room for a new key, e.g. to close it."""
+
+    # region Private Class Methods
+
+    @classmethod
+    def _evict_overflow(cls) -> list[tuple[Hashable, Any]]:
+        """Drop least recently used instances beyond ``max_instances``. Must be called with the map lock held."""
+        state = cls._keyed
+        evicted = []
+        while cls.max_instances is not None and len(state.instances) > cls.max_instances:
+            evicted.append(state.instances.popitem(last=False))
+            state.evictions += 1
+        return evicted
+
+    @classmethod
+    def _after_fork(cls) -> None:
+        """Also replace the map lock, and forget key locks of constructions that cannot finish in the child."""
+        super()._after_fork()
+        state = cls._keyed
+        state.lock = Lock()
+        state.key_locks.clear()
+
+    @classmethod
+    def _drop_key_lock(cls, key: Hashable, key_lock: RLock) -> None:
+        """Forget the construction lock for ``key`` unless it was replaced. Must be called with the map lock held."""
+        key_locks = cls._keyed.key_locks
+        if key_locks.get(key) is key_lock:
+            del key_locks[key]
+
+    # endregion
+
+    # region Public Class Methods
+
+    @classmethod
+    def get_instance(cls: type[T], key: Hashable, init: bool = False, timeout: Optional[float] = None, **kwargs) -> T:
+        """
+        Return the instance for ``key``, creating it with ``cls(key, **kwargs)`` if ``init`` is set.
+
+        Args:
+            key: Which instance to return.
+            init: Whether to initialize the instance if it does not yet exist.
+            timeout: Seconds to wait for another thread that is constructing the instance for ``key``. ``None``
+                waits forever.
+            **kwargs: Arguments passed to ``cls`` after ``key`` when creating the instance.
+
+        Returns:
+            T: The instance for ``key``.
+
+        Raises:
+            RuntimeError: If ``init`` is ``False`` and there is no instance for ``key``.
+            SingletonTimeoutError: If the instance could not be obtained within ``timeout`` seconds.
+        """
+        state = cls._keyed
+        with state.lock:
+            instance = state.instances.get(key)
+            if instance is not None:
+                state.instances.move_to_end(key)
+                state.hits += 1
+                return instance
+            if not init:
+                raise RuntimeError(f"Instance of {cls.__name__} for key {key!r} is not initialized yet")
+            key_lock = state.key_locks.setdefault(key, RLock())
+
+        if not key_lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise SingletonTimeoutError(cls, timeout)
+        try:
+            with state.lock:
+                instance = state.instances.get(key)
+                if instance is not None:
+                    state.instances.move_to_end(key)
+                    state.hits += 1
+                    return instance
+            try:
+                with constructing(cls, f"{cls.__module__}.{cls.__qualname__}[{key!r}]"):
+                    instance = type.__call__(cls, key, **kwargs)
+            except BaseException:
+                with state.lock:
+                    cls._drop_key_lock(key, key_lock)
+                raise
+            # Publish and drop the key lock together, so a caller arriving in between finds one or the other.
+            with state.lock:
+                state.misses += 1
+                state.instances[key] = instance
+                cls._drop_key_lock(key, key_lock)
+                evicted = cls._evict_overflow()
+        finally:
+            key_lock.release()
+
+        for evicted_key, evicted_instance in evicted:
+            cls.on_evict(evicted_key, evicted_instance)
+        return instance
+
+    @classmethod
+    def has_instance(cls, key: Optional[Hashable] = None) -> bool:
+        """
+        Return ``True`` if there is an instance for ``key``, or for any key if ``key`` is ``None``.
+
+        Returns:
+            bool: ``True`` if the instance exists, ``False`` otherwise.
+        """
+        state = cls._keyed
+        with state.lock:
+            return bool(state.instances) if key is None else key in state.instances
+
+    @classmethod
+    def reset_instance(cls, key: Optional[Hashable] = None, all_scopes: bool = False) -> None:
+        """
+        Forget the instance for ``key``, or every instance if ``key`` is ``None``. ``on_evict`` is not called.
+
+        Args:
+            key: Which instance to forget.
+            all_scopes: Accepted for compatibility with ``SingletonBase.reset_instance``.
+        """
+        state = cls._keyed
+        with state.lock:
+            if key is None:
+                state.instances.clear()
+            else:
+                state.instances.pop(key, None)
+
+    @classmethod
+    def keys(cls) -> list[Hashable]:
+        """Return the keys that currently have an instance, least recently used first."""
+        state = cls._keyed
+        with state.lock:
+            return list(state.instances)
+
+    @classmethod
+    def stats(cls) -> dict[str, Optional[int]]:
+        """Return hit, miss and eviction counters along with the current and maximum number of instances."""
+        state = cls._keyed
+        with state.lock:
+            return {
+                "hits": state.hits,
+                "misses": state.misses,
+                "evictions": state.evictions,
+                "size": len(state.instances),
+                "max_instances": cls.max_instances,
+            }
+
+    # endregion
@@ -0,0 +1,210 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from itertools import accumulate
+from typing import Any, Optional, Union
+
+from .singleton_profile import constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase
+else:
+    from .singleton_base_new import SingletonBase
+
+MAGIC = b"SBMAP001"
+ALIGNMENT = 64
+ARRAY_FORMATS = frozenset("bBhHiIlLqQfd")
+
+SectionData = Union[bytes, bytearray, memoryview, array, Sequence[str]]
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _raw(value: Any) -> tuple[memoryview, str]:
+    """Return the bytes of a buffer along with its ``memoryview`` format, rejecting what cannot be mapped back."""
+    view = memoryview(value)
+    if not view.c_contiguous:
+        raise ValueError("Mapped sections must be C-contiguous buffers")
+    fmt = view.format.lstrip("@=<")
+    if fmt not in ARRAY_FORMATS:
+        raise ValueError(f"Unsupported buffer format {view.format!r}, use one of {''.join(sorted(ARRAY_FORMATS))}")
+    return view.cast("B"), fmt
+
+
+def write_mapped_file(
+    path: Union[str, "os.PathLike[str]"], sections: Mapping[str, SectionData], meta: Optional[dict] = None
+) -> None:
+    """
+    Write ``sections`` in the file format read by ``MappedSingletonBase``.
+
+    Each section is either a buffer, such as ``bytes`` or an ``array.array``, read back as a ``memoryview`` with
+    the same format, or a sequence of strings read back as a ``MappedStrings``. The file is written next to
+    ``path`` and renamed over it, so processes that have the old file mapped keep reading it unharmed.
+
+    Args:
+        path: File to write.
+        sections: Data to store, by section name.
+        meta: JSON-serializable metadata, such as a build date or source version.
+    """
+    entries: dict[str, dict] = {}
+    chunks: list[tuple[int, memoryview]] = []
+    offset = 0
+
+    def add(raw: memoryview) -> dict:
+        """Place ``raw`` at the next aligned offset after the data start."""
+        nonlocal offset
+        entry = {"offset": offset, "length": raw.nbytes}
+        chunks.append((offset, raw))
+        offset = _aligned(offset + raw.nbytes)
+        return entry
+
+    for name, value in sections.items():
+        if isinstance(value, Sequence) and not isinstance(value, (bytes, bytearray, memoryview, array, str)):
+            encoded = [item.encode() for item in value]
+            ends = array("Q", accumulate((len(item) for item in encoded), initial=0))
+            blob = memoryview(b"".join(encoded))
+            entries[name] = {"kind": "strings", "offsets": add(memoryview(ends).cast("B")), "blob": add(blob)}
+        else:
+            raw, fmt = _raw(value)
+            entries[name] = {"kind": "array", "format": fmt, **add(raw)}
+
+    header = json.dumps({"sections": entries, "meta": meta}).encode()
+    data_start = _aligned(len(MAGIC) + 4 + len(header))
+    path = os.fspath(path)
+    partial = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "wb") as f:
+            f.write(MAGIC + len(header).to_bytes(4, "little") + header)
+            for chunk_offset, chunk in chunks:
+                f.seek(data_start + chunk_offset)
+                f.write(chunk)
+            f.truncate(data_start + offset)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+
+
+class MappedStrings(Sequence):
+    """Read-only sequence of strings decoded on access from a mapped section."""
+
+    __slots__ = ("__ends", "__blob")
+
+    def __init__(self, ends: memoryview, blob: memoryview):
+        self.__ends = ends
+        self.__blob = blob
+
+    def __len__(self) -> int:
+        return len(self.__ends) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MappedStrings index out of range")
+        return bytes(self.__blob[self.__ends[index] : self.__ends[index + 1]]).decode()
+
+
+class MappedSingletonBase(SingletonBase, _abstract=True):
+    """
+    A base class for read-only lookup tables backed by a memory-mapped file, such as geo-IP data or vocabularies.
+
+    Building the instance only maps ``data_path``, and every process that maps the same file shares its page cache
+    pages, so the data costs neither startup time nor private memory per worker. ``section(name)`` returns the data
+    written by ``write_mapped_file`` without copying it. Subclasses that override ``__init__`` must accept ``path``
+    and pass it on.
+    """
+
+    data_path: Optional[str] = None
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or type(self).data_path
+        if path is None:
+            raise ValueError(f"{type(self).__name__} needs a `data_path` or a `path` argument")
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.__mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__identity = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.view = memoryview(self.__mapping)
+        if bytes(self.view[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{self.path} was not written by write_mapped_file")
+        header_length = int.from_bytes(self.view[len(MAGIC) : len(MAGIC) + 4], "little")
+        header = json.loads(bytes(self.view[len(MAGIC) + 4 : len(MAGIC) + 4 + header_length]))
+        self.meta = header["meta"]
+        self.__entries: dict[str, dict] = header["sections"]
+        self.__data_start = _aligned(len(MAGIC) + 4 + header_length)
+        self.__sections: dict[str, Any] = {}
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """Expose the whole mapped file through the buffer protocol on Python 3.12+."""
+        return self.view
+
+    def __slice(self, entry: dict) -> memoryview:
+        start = self.__data_start + entry["offset"]
+        return self.view[start : start + entry["length"]]
+
+    def sections(self) -> list[str]:
+        """Return the names of the sections in the file."""
+        return list(self.__entries)
+
+    def section(self, name: str) -> Union[memoryview, MappedStrings]:
+        """
+        Return a section without copying it.
+
+        Args:
+            name: Section name given to ``write_mapped_file``.
+
+        Returns:
+            memoryview | MappedStrings: A read-only ``memoryview`` in the format the data was written with, or a
+                ``MappedStrings`` for a sequence of strings.
+
+        Raises:
+            KeyError: If the file has no such section.
+        """
+        section = self.__sections.get(name)
+        if section is None:
+            entry = self.__entries[name]
+            if entry["kind"] == "strings":
+                section = MappedStrings(self.__slice(entry["offsets"]).cast("Q"), self.__slice(entry["blob"]))
+            else:
+                section = self.__slice(entry).cast(entry["format"])
+            self.__sections[name] = section
+        return section
+
+    def is_stale(self) -> bool:
+        """Return ``True`` if the file at ``path`` has been replaced since it was mapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns) != self.__identity
+
+    @classmethod
+    def remap(cls) -> bool:
+        """
+        Map the file again if it has been replaced, and make the new mapping the singleton.
+
+        The old mapping is not closed: callers still holding the old instance or its sections keep reading the old
+        data, and it is unmapped once the last of them lets go. Replace the file by renaming a new one over it, as
+        ``write_mapped_file`` does. Rewriting it in place would change or truncate pages under every reader.
+
+        Returns:
+            bool: ``True`` if a new mapping was published.
+        """
+        with cls._lock:
+            current = cls._slot.instance
+            if current is None or not current.is_stale():
+                return False
+            with constructing(cls):
+                replacement = type.__call__(cls, current.path)
+            cls._publish(replacement, (), {"path": current.path})
+            return True
@@ -1,60 +1,197 @@
+import os
+import weakref
 from threading import RLock
-from typing import Any, ClassVar, Self
+from typing import Any, Callable, Self
 
-INSTANCE_NAME = "_instance_{instance_name}"
+from .singleton_deadlock import construction_lock
+from .singleton_fork import FORK_POLICIES, INHERIT, REINIT
+from .singleton_profile import constructing
+from .singleton_proxy import SingletonProxy
+from .singleton_registry import register
+from .singleton_scope import (
+    PROCESS,
+    SCOPES,
+    SLOT_TYPES,
+    ClassState,
+    ContextSlot,
+    ProcessSlot,
+    ThreadSlot,
+    WeakSlot,
+)
+from .singleton_snapshot import check_restorable, restore_instance, write_snapshot
 
 
 class SingletonMeta(type):
     """Metaclass that enforces the singleton pattern."""
 
-    _lock: ClassVar[RLock] = RLock()
+    _state: ClassState
+    _scope: str
+    _weak: bool
+    _keep_alive: float | None
+    _slot: ProcessSlot | ThreadSlot | ContextSlot | WeakSlot
+    _depends_on: tuple[type, ...]
+    _eager: bool
+    _fork_policy: str
+
+    def __new__(
+        mcs,
+        name,
+        bases,
+        namespace,
+        depends_on=None,
+        eager=False,
+        fork_policy=None,
+        scope=None,
+        weak=None,
+        keep_alive=None,
+        _abstract=False,
+        **kwargs,
+    ):
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+    def __init__(
+        cls,
+        name,
+        bases,
+        namespace,
+        depends_on=None,
+        eager=False,
+        fork_policy=None,
+        scope=None,
+        weak=None,
+        keep_alive=None,
+        _abstract=False,
+        **kwargs,
+    ):
+        super().__init__(name, bases, namespace, **kwargs)
+        # Each class gets its own lock, created here while the class is still private to the
+        # defining thread, so construction only serializes per class and never races. It is kept with the rest of
+        # the state that changes after this point on a separate object, so the class itself is never written to
+        # again and its attribute caches stay valid.
+        cls._state = ClassState()
+        # Dependencies, fork policy, scope and weak mode are inherited unless redeclared, ``eager`` only applies
+        # to the declaring class.
+        cls._depends_on = tuple(depends_on) if depends_on is not None else getattr(cls, "_depends_on", ())
+        cls._eager = eager
+        if fork_policy is not None and fork_policy not in FORK_POLICIES:
+            raise ValueError(f"fork_policy must be one of {FORK_POLICIES}, got {fork_policy!r}")
+        cls._fork_policy = fork_policy or getattr(cls, "_fork_policy", INHERIT)
+        if scope is not None and scope not in SCOPES:
+            raise ValueError(f"scope must be one of {SCOPES}, got {scope!r}")
+        cls._scope = scope or getattr(cls, "_scope", PROCESS)
+        cls._weak = weak if weak is not None else getattr(cls, "_weak", False)
+        cls._keep_alive = keep_alive if keep_alive is not None else getattr(cls, "_keep_alive", None)
+        if cls._weak and cls._scope != PROCESS:
+            raise ValueError("weak=True is only supported with scope='process'")
+        # The slot is resolved once per class, so the hot path is two attribute loads with no string building.
+        # Thread and context slots hand every thread or context its own instance without taking a lock.
+        if cls._weak:
+            cls._slot = WeakSlot(cls.__qualname__, cls._keep_alive)
+        else:
+            cls._slot = SLOT_TYPES[cls._scope](cls.__qualname__)
+        # The package's own variant bases pass ``_abstract=True``: they never hold an instance themselves, so
+        # registry walks such as ``reset_all()``, ``shutdown_all()`` and ``enable_metrics()`` only see user classes.
+        if bases and not _abstract:
+            register(cls)
+
+    @property
+    def _lock(cls) -> RLock:
+        """The lock construction and reset of this class serialize on."""
+        return cls._state.lock
+
+    @_lock.setter
+    def _lock(cls, lock: RLock) -> None:
+        cls._state.lock = lock
+
+    @property
+    def _fork_args(cls) -> tuple[tuple, dict]:
+        """
+        The arguments the instance was built with, to rebuild it with after a fork under ``fork_policy="reinit"``.
+
+        Read-only: writes go to ``cls._state`` directly, since setting any attribute on a class, even through a
+        property, invalidates its type caches on Python 3.9 to 3.12.
+        """
+        return cls._state.fork_args
 
     def __call__(cls, *args, **kwargs):
-        class_attr_name: str = INSTANCE_NAME.format(instance_name=cls.__name__)
-        if not getattr(cls, class_attr_name, False):
-            with cls._lock:
-                if not getattr(cls, class_attr_name, False):
-                    setattr(cls, class_attr_name, super().__call__(*args, **kwargs))
-        return getattr(cls, class_attr_name)
+        instance = cls._slot.instance
+        if instance is None:
+            with construction_lock(cls):
+                instance = cls._slot.instance
+                if instance is None:
+                    with constructing(cls):
+                        instance = super().__call__(*args, **kwargs)
+                    if cls._fork_policy == REINIT:
+                        cls._state.fork_args = (args, kwargs)
+                    # Publishing is a single store made after __init__ has returned, so readers on the lock-free
+                    # fast path see either nothing or a fully built instance, with or without the GIL.
+                    cls._slot.instance = instance
+        return instance
 
 
 class SingletonBase(metaclass=SingletonMeta):
     """A base class for singleton classes"""
 
-    # region Private Class Methods
+    _swappable = True
+    _restorable = True
 
-    @classmethod
-    def __instance(cls) -> Self:
-        """Method used when we know the instance is present"""
-        return getattr(cls, cls._instance_attr())
+    # region Private Class Methods
 
     @classmethod
     def __set_instance(cls, value: Self | None) -> None:
         """Set the singleton instance to a new value"""
-        setattr(cls, cls._instance_attr(), value)
+        cls._slot.instance = value
+
+    @classmethod
+    def _publish(cls, instance: Any, args: tuple | None = None, kwargs: dict | None = None) -> None:
+        """
+        Make ``instance`` current in a single store. Must be called with the class lock held.
+
+        ``args`` and ``kwargs`` are the arguments ``instance`` was built with, if it was built from arguments.
+        """
+        if kwargs is not None and cls._fork_policy == REINIT:
+            cls._state.fork_args = (args or (), kwargs)
+        cls._slot.instance = instance
 
     @classmethod
-    def __get_instance(cls) -> Self | None:
-        """Get the singleton instance, or None if it does not exist"""
-        return getattr(cls, cls._instance_attr(), None)
+    def _after_fork(cls) -> None:
+        """
+        Replace the locks a forked child inherited, which may be held by threads that do not exist there. Called
+        in the child before ``fork_policy`` is applied. Variants with their own locks or threads extend it.
+        """
+        cls._lock = RLock()
+        slot = cls._slot
+        getattr(slot, "inner", slot).after_fork()
 
     @classmethod
-    def _instance_attr(cls) -> str:
-        """Get the name of the class attribute that holds the singleton instance."""
-        return INSTANCE_NAME.format(instance_name=cls.__name__)
+    def __swap(cls, new: Any, on_retired: Callable[[], Any] | None, kwargs: dict | None = None) -> None:
+        """Publish ``new`` in place of the current instance. Must be called with the class lock held."""
+        current = cls._slot.instance
+        if on_retired is not None and current is not None:
+            weakref.finalize(current, on_retired)
+        cls._publish(new, (), kwargs)
 
     # endregion
 
     # region Public Class Methods
 
     @classmethod
-    def get_instance(cls, init: bool = False, **kwargs) -> Self:
+    def get_instance(
+        cls,
+        init: bool = False,
+        timeout: float | None = None,
+        restore_from: str | os.PathLike | None = None,
+        **kwargs,
+    ) -> Self:
         """
         Return the singleton instance. If the instance does not yet exist, it is created using the provided
         arguments. Uses a lock to ensure thread safety.
 
         Args:
             init: Whether to initialize the instance if it does not yet exist.
+            timeout: Seconds to wait for another thread that is constructing the instance. ``None`` waits forever.
+            restore_from: Path of a snapshot written by ``snapshot()`` to load the instance from instead of building
+                it. A missing, stale or unreadable snapshot falls back to building the instance.
             **kwargs: Arguments passed to ``cls`` when creating the instance.
 
         Returns:
@@ -62,15 +199,117 @@ class SingletonBase(metaclass=SingletonMeta):
 
         Raises:
             RuntimeError: If ``init`` is ``False`` and the instance has not been initialized.
+            SingletonTimeoutError: If the instance could not be obtained within ``timeout`` seconds.
+            TypeError: If ``restore_from`` is given for a variant, such as a keyed, pooled or host-wide singleton,
+                that builds its instance its own way.
         """
-
-        if not cls.has_instance() and not init:
+        instance: Self | None = cls._slot.instance
+        if instance is not None:
+            return instance
+        if not init:
             raise RuntimeError(f"Instance of {cls.__name__} is not initialized yet")
-        elif not cls.has_instance() and init:
-            with cls._lock:
-                if not cls.has_instance():
-                    cls.__set_instance(cls(**kwargs))
-        return cls.__instance()
+        if restore_from is not None:
+            check_restorable(cls)
+            with construction_lock(cls, timeout):
+                instance = cls._slot.instance
+                if instance is None:
+                    instance = restore_instance(cls, restore_from, kwargs)
+                if instance is not None:
+                    return instance
+        # SingletonMeta.__call__ re-checks and publishes the instance under the class lock.
+        if timeout is None:
+            return cls(**kwargs)
+        with construction_lock(cls, timeout):
+            return cls(**kwargs)
+
+    @classmethod
+    def lazy(cls, **kwargs) -> Self:
+        """
+        Return a proxy that defers construction until the singleton is first used.
+
+        The first attribute access on the proxy builds the instance through ``get_instance(init=True, **kwargs)``
+        and every access after that is forwarded to it.
+
+        Args:
+            **kwargs: Arguments passed to ``cls`` when the instance is created.
+
+        Returns:
+            Self: A ``SingletonProxy`` standing in for the singleton instance.
+        """
+        return SingletonProxy(cls, kwargs)  # type: ignore[return-value]
+
+    @classmethod
+    def snapshot(cls, path: str | os.PathLike) -> None:
+        """
+        Save the current instance to ``path`` for ``get_instance(init=True, restore_from=path)`` to load later.
+
+        The class opts in by setting ``snapshot_version``, which is stored with the snapshot and must match when it
+        is restored. Bump it whenever the instance's state changes shape. The instance is pickled, so it can control
+        what is saved with ``__getstate__`` and ``__setstate__``. Only restore snapshots from trusted locations.
+
+        Args:
+            path: File to write. It is replaced atomically.
+
+        Raises:
+            TypeError: If the class does not set ``snapshot_version``, or is a variant that builds its instance its
+                own way.
+            RuntimeError: If the instance has not been initialized.
+        """
+        write_snapshot(cls, path)
+
+    @classmethod
+    def replace_instance(cls, new: Self, on_retired: Callable[[], Any] | None = None) -> None:
+        """
+        Make ``new`` the instance in one atomic step, for hot reloading an instance built elsewhere.
+
+        Readers never take a lock and get either the old or the new instance, never an error. Callers that still
+        hold the old instance keep using it until they are done.
+
+        Args:
+            new: The instance to publish. It is not initialized again.
+            on_retired: Called without arguments once the old instance is no longer referenced anywhere, e.g. to
+                close the resources it used. It must not refer to the old instance itself, or that never happens:
+                pass the resource's ``close`` method instead.
+
+        Raises:
+            TypeError: If the class has no single instance to replace, like keyed, pooled and host-wide singletons,
+                or the old instance does not support weak references and ``on_retired`` is given.
+        """
+        if not cls._swappable:
+            raise TypeError(f"{cls.__name__} has no single instance to replace")
+        with cls._lock:
+            cls.__swap(new, on_retired)
+
+    @classmethod
+    def reload(cls, timeout: float | None = None, on_retired: Callable[[], Any] | None = None, **kwargs) -> Self:
+        """
+        Build a new instance with ``kwargs`` and swap it in atomically, RCU-style.
+
+        The replacement is built while readers keep getting the current instance without taking a lock, and is
+        published in a single store once ``__init__`` has returned. Concurrent reloads and first constructions are
+        serialized on the class lock. If ``__init__`` raises, the current instance stays in place.
+
+        Args:
+            timeout: Seconds to wait for another thread that is constructing or reloading the instance. ``None``
+                waits forever.
+            on_retired: Called without arguments once the old instance is no longer referenced anywhere, as in
+                ``replace_instance``.
+            **kwargs: Arguments passed to ``__init__``. They replace the original ones for ``fork_policy="reinit"``.
+
+        Returns:
+            Self: The new instance.
+
+        Raises:
+            SingletonTimeoutError: If the class lock could not be acquired within ``timeout`` seconds.
+            TypeError: If the class has no single instance to replace.
+        """
+        if not cls._swappable:
+            raise TypeError(f"{cls.__name__} has no single instance to replace")
+        with construction_lock(cls, timeout):
+            with constructing(cls):
+                instance = type.__call__(cls, **kwargs)
+            cls.__swap(instance, on_retired, kwargs)
+        return instance
 
     @classmethod
     def has_instance(cls) -> bool:
@@ -80,16 +319,23 @@ class SingletonBase(metaclass=SingletonMeta):
         Returns:
             bool: ``True`` if the instance exists, ``False`` otherwise.
         """
-        return cls.__get_instance() is not None
+        return cls._slot.instance is not None
 
     @classmethod
-    def reset_instance(cls) -> None:
+    def reset_instance(cls, all_scopes: bool = False) -> None:
         """
         Reset the singleton instance to allow re-initialization.
 
-        Uses a lock to ensure thread safety.
+        For classes declared with ``scope="thread"`` or ``scope="context"`` only the calling thread's or context's
+        instance is reset, unless ``all_scopes`` is set. Uses a lock to ensure thread safety.
+
+        Args:
+            all_scopes: Reset the instance of every thread or context instead of just the current one.
         """
         with cls._lock:
-            cls.__set_instance(None)
+            if all_scopes:
+                cls._slot.clear_all()
+            else:
+                cls.__set_instance(None)
 
     # endregion
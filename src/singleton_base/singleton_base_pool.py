@@ -0,0 +1,332 @@
+import sys
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition
+from time import monotonic
+from typing import Any, Iterator, Optional, TypeVar
+
+from .singleton_deadlock import SingletonTimeoutError
+from .singleton_fork import REINIT
+from .singleton_profile import constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase, SingletonMeta
+else:
+    from .singleton_base_new import SingletonBase, SingletonMeta
+
+T = TypeVar("T", bound="PooledSingletonBase")
+
+
+class _PoolState:
+    """Idle instances, live instance count and counters of a pooled singleton."""
+
+    __slots__ = (
+        "condition",
+        "idle",
+        "size",
+        "in_use",
+        "generation",
+        "acquisitions",
+        "waits",
+        "wait_seconds_total",
+        "wait_seconds_max",
+        "timeouts",
+        "created",
+        "discarded",
+        "peak_in_use",
+        "busy_seconds",
+        "since",
+        "changed_at",
+    )
+
+    def __init__(self):
+        self.condition = Condition()
+        self.idle: deque[tuple[Any, float]] = deque()
+        self.size = 0
+        self.in_use = 0
+        self.generation = 0
+        self.acquisitions = 0
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.peak_in_use = 0
+        self.busy_seconds = 0.0
+        self.since = self.changed_at = monotonic()
+
+    def set_in_use(self, in_use: int) -> None:
+        """Change the checked out count, accumulating checked-out time for the utilization average."""
+        now = monotonic()
+        self.busy_seconds += self.in_use * (now - self.changed_at)
+        self.changed_at = now
+        self.in_use = in_use
+        self.peak_in_use = max(self.peak_in_use, in_use)
+
+
+class PooledSingletonMeta(SingletonMeta):
+    """Metaclass for singletons that keep a bounded pool of instances."""
+
+    _pool: _PoolState
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        if cls.max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {cls.max_size!r}")
+        if cls._fork_policy == REINIT:
+            raise ValueError(
+                f"{name} cannot use fork_policy={REINIT!r}: its instances are created on demand by acquire(), which "
+                "a fork handler cannot do. Use fork_policy='reset' and the child creates its own on first acquire()."
+            )
+        cls._pool = _PoolState()
+
+    def __call__(cls, *args, **kwargs):
+        raise RuntimeError(f"{cls.__name__} is pooled, use `with {cls.__name__}.acquire() as instance:`")
+
+
+class PooledSingletonBase(SingletonBase, metaclass=PooledSingletonMeta, _abstract=True):
+    """
+    A base class for expensive resources that cannot be shared between threads, such as native library handles.
+
+    Up to ``max_size`` instances are created lazily and lent out one caller at a time by ``acquire()``. Returned
+    instances that fail ``is_healthy`` are discarded, and instances left idle for more than ``max_idle`` seconds
+    are discarded on the next pool activity or ``shrink()``, down to ``min_size``.
+    """
+
+    max_size: int = 8
+    min_size: int = 0
+    max_idle: Optional[float] = None
+    _swappable = False
+    _restorable = False
+
+    @classmethod
+    def is_healthy(cls, instance: Any) -> bool:
+        """Hook called with every returned instance. Returning ``False`` or raising discards it."""
+        return True
+
+    @classmethod
+    def on_discard(cls, instance: Any) -> None:
+        """Hook called with every instance the pool drops, e.g. to close it."""
+
+    # region Private Class Methods
+
+    @classmethod
+    def _after_fork(cls) -> None:
+        """Also replace the pool condition."""
+        super()._after_fork()
+        cls._pool.condition = Condition()
+
+    @classmethod
+    def _expired(cls, now: float) -> list[Any]:
+        """Drop idle instances past ``max_idle``, oldest first. Must be called with the pool condition held."""
+        state = cls._pool
+        expired = []
+        while (
+            cls.max_idle is not None
+            and state.idle
+            and state.size > cls.min_size
+            and now - state.idle[0][1] > cls.max_idle
+        ):
+            expired.append(state.idle.popleft()[0])
+            state.size -= 1
+            state.discarded += 1
+        return expired
+
+    @classmethod
+    def _discard(cls, instances: list[Any]) -> None:
+        for instance in instances:
+            cls.on_discard(instance)
+
+    @classmethod
+    def _wait_for_room(cls, start: float, deadline: Optional[float]) -> bool:
+        """
+        Wait until an instance is idle or one more can be created, recording the wait. Must be called with the pool
+        condition held.
+
+        Returns:
+            bool: ``False`` if ``deadline`` passed first.
+        """
+        state = cls._pool
+        waited = False
+        while not state.idle and state.size >= cls.max_size:
+            remaining = None if deadline is None else deadline - monotonic()
+            if remaining is not None and remaining <= 0:
+                state.timeouts += 1
+                return False
+            waited = True
+            state.condition.wait(remaining)
+        if waited:
+            seconds = monotonic() - start
+            state.waits += 1
+            state.wait_seconds_total += seconds
+            state.wait_seconds_max = max(state.wait_seconds_max, seconds)
+        return True
+
+    @classmethod
+    def _unreserve(cls, instance: Any, generation: int) -> None:
+        """Give back a checkout that failed: the idle ``instance`` it took, or the slot it reserved if ``None``."""
+        if instance is not None:
+            cls._checkin(instance, generation)
+            return
+        state = cls._pool
+        with state.condition:
+            state.size -= 1
+            state.set_in_use(state.in_use - 1)
+            state.condition.notify()
+
+    @classmethod
+    def _checkout(cls, timeout: Optional[float], kwargs: dict) -> tuple[Any, int]:
+        state = cls._pool
+        start = monotonic()
+        deadline = None if timeout is None else start + timeout
+        instance = None
+        with state.condition:
+            expired = cls._expired(start)
+            available = cls._wait_for_room(start, deadline)
+            if available:
+                state.acquisitions += 1
+                state.set_in_use(state.in_use + 1)
+                generation = state.generation
+                # Reuse the most recently returned instance so the ones at the other end can age out.
+                if state.idle:
+                    instance = state.idle.pop()[0]
+                else:
+                    state.size += 1
+        if not available:
+            cls._discard(expired)
+            raise SingletonTimeoutError(cls, timeout)
+        reused = instance
+        try:
+            cls._discard(expired)
+            if reused is None:
+                with constructing(cls):
+                    instance = type.__call__(cls, **kwargs)
+        except BaseException:
+            # Give the reservation back, or a failing on_discard or __init__ would shrink the pool for good.
+            cls._unreserve(reused, generation)
+            raise
+        if reused is None:
+            with state.condition:
+                state.created += 1
+        return instance, generation
+
+    @classmethod
+    def _checkin(cls, instance: Any, generation: int) -> None:
+        state = cls._pool
+        try:
+            healthy = generation == state.generation and cls.is_healthy(instance)
+        except Exception:
+            healthy = False
+        with state.condition:
+            state.set_in_use(state.in_use - 1)
+            if healthy and generation == state.generation:
+                state.idle.append((instance, monotonic()))
+                discarded = []
+            else:
+                state.size -= 1
+                state.discarded += 1
+                discarded = [instance]
+            discarded += cls._expired(monotonic())
+            state.condition.notify()
+        cls._discard(discarded)
+
+    # endregion
+
+    # region Public Class Methods
+
+    @classmethod
+    @contextmanager
+    def acquire(cls: type[T], timeout: Optional[float] = None, **kwargs) -> Iterator[T]:
+        """
+        Check out an instance for the duration of the ``with`` block, creating one if the pool is not full.
+
+        Args:
+            timeout: Seconds to wait for an instance when all ``max_size`` are checked out. ``None`` waits forever.
+            **kwargs: Arguments passed to ``cls`` when a new instance has to be created.
+
+        Yields:
+            T: An instance used by no other caller until the block exits.
+
+        Raises:
+            SingletonTimeoutError: If no instance became available within ``timeout`` seconds.
+        """
+        instance, generation = cls._checkout(timeout, kwargs)
+        try:
+            yield instance
+        finally:
+            cls._checkin(instance, generation)
+
+    @classmethod
+    def get_instance(cls, *args, **kwargs):
+        """Pooled instances are only handed out through ``acquire()``."""
+        raise RuntimeError(f"{cls.__name__} is pooled, use `with {cls.__name__}.acquire() as instance:`")
+
+    @classmethod
+    def has_instance(cls) -> bool:
+        """
+        Return ``True`` if the pool holds any instance, idle or checked out.
+
+        Returns:
+            bool: ``True`` if an instance exists, ``False`` otherwise.
+        """
+        with cls._pool.condition:
+            return cls._pool.size > 0
+
+    @classmethod
+    def reset_instance(cls, all_scopes: bool = False) -> None:
+        """
+        Discard every idle instance now, and every checked out instance when it is returned.
+
+        Args:
+            all_scopes: Accepted for compatibility with ``SingletonBase.reset_instance``.
+        """
+        state = cls._pool
+        with state.condition:
+            discarded = [instance for instance, _ in state.idle]
+            state.idle.clear()
+            state.discarded += len(discarded)
+            state.size -= len(discarded)
+            state.generation += 1
+            state.condition.notify_all()
+        cls._discard(discarded)
+
+    @classmethod
+    def shrink(cls) -> int:
+        """Discard instances idle for longer than ``max_idle`` now, and return how many were discarded."""
+        with cls._pool.condition:
+            expired = cls._expired(monotonic())
+        cls._discard(expired)
+        return len(expired)
+
+    @classmethod
+    def stats(cls) -> dict[str, float]:
+        """
+        Return pool size, wait and utilization counters for sizing the pool.
+
+        ``utilization`` is the share of ``max_size`` checked out right now, and ``mean_utilization`` the average
+        share since the pool was created.
+        """
+        state = cls._pool
+        with state.condition:
+            now = monotonic()
+            busy = state.busy_seconds + state.in_use * (now - state.changed_at)
+            elapsed = now - state.since
+            return {
+                "size": state.size,
+                "idle": len(state.idle),
+                "in_use": state.in_use,
+                "max_size": cls.max_size,
+                "acquisitions": state.acquisitions,
+                "waits": state.waits,
+                "wait_seconds_total": state.wait_seconds_total,
+                "wait_seconds_max": state.wait_seconds_max,
+                "timeouts": state.timeouts,
+                "created": state.created,
+                "discarded": state.discarded,
+                "peak_in_use": state.peak_in_use,
+                "utilization": state.in_use / cls.max_size,
+                "mean_utilization": busy / (cls.max_size * elapsed) if elapsed > 0 else 0.0,
+            }
+
+    # endregion
@@ -0,0 +1,166 @@
+import os
+import sys
+from threading import local
+from typing import Any, Optional, TypeVar
+
+from .singleton_deadlock import construction_lock
+from .singleton_fork import REINIT
+from .singleton_profile import constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase, SingletonMeta
+else:
+    from .singleton_base_new import SingletonBase, SingletonMeta
+
+T = TypeVar("T", bound="ShardedSingletonBase")
+
+
+class _ShardState:
+    """The shards of a sharded singleton, which shard each thread uses, and the arguments shards are built with."""
+
+    __slots__ = ("instances", "local", "assigned", "kwargs")
+
+    def __init__(self, count: int):
+        self.instances: list[Optional[Any]] = [None] * count
+        self.local = local()
+        self.assigned = 0
+        self.kwargs: Optional[dict] = None
+
+
+class ShardedSingletonMeta(SingletonMeta):
+    """Metaclass for singletons split into shards that threads update independently."""
+
+    _sharded: _ShardState
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        if cls.shards is not None and cls.shards < 1:
+            raise ValueError(f"shards must be at least 1, got {cls.shards!r}")
+        cls._sharded = _ShardState(cls.shards or os.cpu_count() or 1)
+
+    def __call__(cls, **kwargs):
+        return cls.get_instance(init=True, **kwargs)
+
+
+class ShardedSingletonBase(SingletonBase, metaclass=ShardedSingletonMeta, _abstract=True):
+    """
+    A base class for state that every thread updates, such as counters, rate limiters and in-process caches.
+
+    The singleton is split into ``shards`` instances, one per CPU by default, and each thread is assigned one of
+    them round-robin the first time it asks. ``get_instance()`` returns the calling thread's shard, so threads
+    update their own shard instead of contending on one instance. ``merged()`` combines all shards through the
+    ``merge`` hook for reads. Threads share a shard once there are more threads than shards, so shard methods must
+    still be thread-safe, but each shard's lock is only contended by the threads assigned to it.
+    """
+
+    shards: Optional[int] = None
+    _swappable = False
+    _restorable = False
+
+    @classmethod
+    def merge(cls: type[T], shards: list[T]) -> Any:
+        """
+        Hook that combines the shards into the value returned by ``merged()``, e.g. by summing their counts.
+
+        Other threads may update the shards while they are being merged. Returns the list of shards by default.
+        """
+        return shards
+
+    # region Private Class Methods
+
+    @classmethod
+    def _assign_shard(cls) -> int:
+        """Pick the calling thread's shard, the next one round-robin."""
+        state = cls._sharded
+        with cls._lock:
+            index = state.local.index = state.assigned % len(state.instances)
+            state.assigned += 1
+        return index
+
+    # endregion
+
+    # region Public Class Methods
+
+    @classmethod
+    def get_instance(cls: type[T], init: bool = False, timeout: Optional[float] = None, **kwargs) -> T:
+        """
+        Return the calling thread's shard, building it if needed.
+
+        The first shard is built with ``kwargs`` and every other shard with the same arguments, on first use by a
+        thread assigned to it, so only the first call needs ``init=True``.
+
+        Args:
+            init: Whether to initialize the singleton if no shard has been built yet.
+            timeout: Seconds to wait for another thread that is building a shard. ``None`` waits forever.
+            **kwargs: Arguments passed to ``cls`` when building the shards.
+
+        Returns:
+            T: The calling thread's shard.
+
+        Raises:
+            RuntimeError: If ``init`` is ``False`` and no shard has been built yet.
+            SingletonTimeoutError: If the shard could not be obtained within ``timeout`` seconds.
+        """
+        state = cls._sharded
+        try:
+            index = state.local.index
+        except AttributeError:
+            index = cls._assign_shard()
+        instance = state.instances[index]
+        if instance is not None:
+            return instance
+        with construction_lock(cls, timeout):
+            instances = state.instances
+            instance = instances[index]
+            if instance is None:
+                if state.kwargs is None and not init:
+                    raise RuntimeError(f"Instance of {cls.__name__} is not initialized yet")
+                shard_kwargs = kwargs if state.kwargs is None else state.kwargs
+                with constructing(cls, f"{cls.__module__}.{cls.__qualname__}[shard {index}]"):
+                    instance = type.__call__(cls, **shard_kwargs)
+                if state.kwargs is None:
+                    state.kwargs = shard_kwargs
+                    if cls._fork_policy == REINIT:
+                        cls._state.fork_args = ((), shard_kwargs)
+                instances[index] = instance
+        return instance
+
+    @classmethod
+    def shard_instances(cls: type[T]) -> list[T]:
+        """Return the shards built so far."""
+        return [instance for instance in cls._sharded.instances if instance is not None]
+
+    @classmethod
+    def merged(cls) -> Any:
+        """
+        Return the shards combined by ``merge``.
+
+        Returns:
+            Any: Whatever ``merge`` returns for the shards built so far.
+        """
+        return cls.merge(cls.shard_instances())
+
+    @classmethod
+    def has_instance(cls) -> bool:
+        """
+        Return ``True`` if any shard has been built.
+
+        Returns:
+            bool: ``True`` if an instance exists, ``False`` otherwise.
+        """
+        return any(instance is not None for instance in cls._sharded.instances)
+
+    @classmethod
+    def reset_instance(cls, all_scopes: bool = False) -> None:
+        """
+        Drop every shard, so the next ``get_instance(init=True, ...)`` starts over.
+
+        Args:
+            all_scopes: Accepted for compatibility with ``SingletonBase.reset_instance``.
+        """
+        state = cls._sharded
+        with cls._lock:
+            state.instances = [None] * len(state.instances)
+            state.kwargs = None
+
+    # endregion
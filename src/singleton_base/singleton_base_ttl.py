@@ -0,0 +1,226 @@
+import os
+import random
+import sys
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, Optional, TypeVar, Union
+
+from .singleton_deadlock import construction_lock
+from .singleton_profile import constructing
+
+if sys.version_info < (3, 11):
+    from .singleton_base_legacy import SingletonBase, SingletonMeta
+else:
+    from .singleton_base_new import SingletonBase, SingletonMeta
+
+T = TypeVar("T", bound="RefreshingSingletonBase")
+
+
+class _RefreshState:
+    """When the current instance expires, how to rebuild it, and the refresh in flight if any."""
+
+    __slots__ = ("lock", "expires_at", "stale_limit_at", "args", "thread", "last_error", "failures", "retry_at")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.expires_at = float("inf")
+        self.stale_limit_at: Optional[float] = None
+        self.args: tuple[tuple, dict] = ((), {})
+        self.thread: Optional[Thread] = None
+        self.last_error: Optional[BaseException] = None
+        self.failures = 0
+        self.retry_at = 0.0
+
+
+class RefreshingSingletonMeta(SingletonMeta):
+    """Metaclass for singletons that are rebuilt in the background once they are older than their TTL."""
+
+    _refresh: _RefreshState
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        if cls.ttl is not None and cls.ttl <= 0:
+            raise ValueError(f"ttl must be positive or None, got {cls.ttl!r}")
+        if cls.refresh_backoff < 0 or cls.refresh_backoff_max < cls.refresh_backoff:
+            raise ValueError(
+                f"refresh_backoff must be at least 0 and at most refresh_backoff_max, got {cls.refresh_backoff!r} "
+                f"and {cls.refresh_backoff_max!r}"
+            )
+        cls._refresh = _RefreshState()
+
+    def __call__(cls, *args, **kwargs):
+        instance = cls._slot.instance
+        if instance is None:
+            with construction_lock(cls):
+                instance = cls._slot.instance
+                if instance is None:
+                    with constructing(cls):
+                        instance = type.__call__(cls, *args, **kwargs)
+                    cls._publish(instance, args, kwargs)
+            return instance
+        if monotonic() < cls._refresh.expires_at:
+            return instance
+        return cls._stale(instance)
+
+
+class RefreshingSingletonBase(SingletonBase, metaclass=RefreshingSingletonMeta, _abstract=True):
+    """
+    A base class for singletons whose data goes stale, such as feature-flag snapshots or credentials.
+
+    Once an instance is older than ``ttl`` seconds, plus a random ``0..ttl_jitter`` so that processes do not all
+    refresh at once, the next access starts one background thread that builds a replacement with the original
+    arguments and swaps it in atomically. Readers keep getting the current instance meanwhile. If the instance is
+    older than ``ttl + max_staleness``, readers wait for the refresh instead, and get a ``RuntimeError`` if it
+    fails. A failed background refresh keeps the current instance and is retried on the first access after
+    ``refresh_backoff`` seconds, doubling after each further failure up to ``refresh_backoff_max``.
+    """
+
+    ttl: Optional[float] = None
+    ttl_jitter: float = 0.0
+    max_staleness: Optional[float] = None
+    refresh_backoff: float = 1.0
+    refresh_backoff_max: float = 60.0
+
+    # region Private Class Methods
+
+    @classmethod
+    def _after_fork(cls) -> None:
+        """Also replace the refresh lock, and forget a refresh whose thread does not exist in the child."""
+        super()._after_fork()
+        state = cls._refresh
+        state.lock = Lock()
+        state.thread = None
+
+    @classmethod
+    def _publish(cls, instance: Any, args: Optional[tuple] = None, kwargs: Optional[dict] = None) -> None:
+        """
+        Make ``instance`` current and schedule its expiry. Called with the class lock held.
+
+        Refreshes rebuild the instance with ``args`` and ``kwargs``, or with the previous arguments if not given.
+        """
+        state = cls._refresh
+        now = monotonic()
+        if kwargs is not None:
+            state.args = (args or (), kwargs)
+        state.failures, state.retry_at = 0, 0.0
+        if cls.ttl is None:
+            state.expires_at, state.stale_limit_at = float("inf"), None
+        else:
+            state.expires_at = now + cls.ttl + random.uniform(0, cls.ttl_jitter)
+            state.stale_limit_at = None if cls.max_staleness is None else now + cls.ttl + cls.max_staleness
+        super()._publish(instance, args, kwargs)
+
+    @classmethod
+    def _start_refresh(cls, force: bool = False) -> Optional[Thread]:
+        """
+        Start the background refresh unless one is already running or, unless ``force`` is set, the last one failed
+        less than the backoff ago. Return the running refresh, if any.
+        """
+        state = cls._refresh
+        with state.lock:
+            if state.thread is None and (force or monotonic() >= state.retry_at):
+                state.thread = Thread(target=cls._run_refresh, name=f"refresh-{cls.__name__}", daemon=True)
+                state.thread.start()
+            return state.thread
+
+    @classmethod
+    def _run_refresh(cls) -> None:
+        state = cls._refresh
+        try:
+            args, kwargs = state.args
+            with constructing(cls):
+                instance = type.__call__(cls, *args, **kwargs)
+            with cls._lock:
+                if cls._slot.instance is not None:  # reset_instance() while we were building wins
+                    cls._publish(instance, args, kwargs)
+            state.last_error = None
+        except Exception as e:
+            state.last_error = e
+            cls._back_off()
+        finally:
+            with state.lock:
+                state.thread = None
+
+    @classmethod
+    def _back_off(cls) -> None:
+        """Hold off the next refresh after a failed one, doubling the delay after every failure in a row."""
+        state = cls._refresh
+        with cls._lock:
+            state.failures += 1
+            delay = min(cls.refresh_backoff * 2 ** min(state.failures - 1, 32), cls.refresh_backoff_max)
+            state.retry_at = monotonic() + delay
+            # Keep readers on the lock-free fast path until then, but not past the point they must block.
+            expires_at = state.retry_at
+            if state.stale_limit_at is not None:
+                expires_at = min(expires_at, state.stale_limit_at)
+            state.expires_at = max(state.expires_at, expires_at)
+
+    @classmethod
+    def _stale(cls: type[T], instance: T) -> T:
+        state = cls._refresh
+        stale_limit_at = state.stale_limit_at
+        thread = cls._start_refresh()
+        if stale_limit_at is None or monotonic() < stale_limit_at:
+            return instance
+        # Too stale to hand out: wait for the replacement.
+        if thread is not None:
+            thread.join()
+        instance = cls._slot.instance
+        if instance is None or (state.stale_limit_at is not None and monotonic() >= state.stale_limit_at):
+            raise RuntimeError(
+                f"Instance of {cls.__name__} is past its max_staleness and could not be refreshed"
+            ) from state.last_error
+        return instance
+
+    # endregion
+
+    # region Public Class Methods
+
+    @classmethod
+    def get_instance(
+        cls: type[T],
+        init: bool = False,
+        timeout: Optional[float] = None,
+        restore_from: Union[str, os.PathLike, None] = None,
+        **kwargs,
+    ) -> T:
+        """
+        Return the singleton instance, starting a background refresh if it is older than ``ttl``.
+
+        Args:
+            init: Whether to initialize the instance if it does not yet exist.
+            timeout: Seconds to wait for another thread that is constructing the instance. ``None`` waits forever.
+            restore_from: Path of a snapshot written by ``snapshot()`` to load the instance from instead of building
+                it. A restored instance expires after ``ttl`` like a built one, and refreshes build it from
+                ``kwargs``.
+            **kwargs: Arguments passed to ``cls`` when creating the instance. Refreshes reuse them.
+
+        Returns:
+            T: The singleton instance of the class.
+
+        Raises:
+            RuntimeError: If ``init`` is ``False`` and the instance has not been initialized, or if the instance is
+                past ``max_staleness`` and could not be refreshed.
+            SingletonTimeoutError: If the instance could not be obtained within ``timeout`` seconds.
+        """
+        instance: Optional[T] = cls._slot.instance
+        if instance is not None:
+            if monotonic() < cls._refresh.expires_at:
+                return instance
+            return cls._stale(instance)
+        if not init:
+            raise RuntimeError(f"Instance of {cls.__name__} is not initialized yet")
+        if restore_from is not None:
+            return super().get_instance(init=True, timeout=timeout, restore_from=restore_from, **kwargs)
+        if timeout is None:
+            return cls(**kwargs)
+        with construction_lock(cls, timeout):
+            return cls(**kwargs)
+
+    @classmethod
+    def refresh(cls) -> None:
+        """Start a background refresh now, regardless of the TTL and backoff. Does nothing if there is no instance."""
+        if cls._slot.instance is not None:
+            cls._start_refresh(force=True)
+
+    # endregion
@@ -0,0 +1,166 @@
+import os
+from threading import Lock, Thread, current_thread
+from typing import Any, Optional
+
+
+class SingletonTimeoutError(TimeoutError):
+    """Raised when a singleton could not be obtained within the ``timeout`` passed to ``get_instance``."""
+
+    def __init__(self, cls: type, timeout: float):
+        self.cls = cls
+        self.timeout = timeout
+        super().__init__(f"Timed out after {timeout}s waiting for the instance of {cls.__name__}")
+
+
+class ConstructionDeadlockError(RuntimeError):
+    """
+    Raised with deadlock detection enabled when threads constructing singletons wait on each other in a cycle.
+
+    ``cycle`` lists the classes in the order they are waited for, and ``threads`` the name of the thread building
+    each of them. The last thread in the chain is the one the error is raised in.
+    """
+
+    def __init__(self, waiter: str, cycle: list[type], threads: list[str]):
+        self.cycle = cycle
+        self.threads = threads
+        chain = "".join(f" -> {cls.__name__} (built by {thread})" for cls, thread in zip(cycle, threads))
+        super().__init__(f"Singleton construction deadlock: {waiter}{chain}")
+
+
+_tracking = False
+_graph_lock = Lock()
+_owners: dict[type, Thread] = {}
+_depths: dict[type, int] = {}
+_waiting: dict[Thread, type] = {}
+
+
+def _find_cycle(me: Thread, cls: type) -> Optional[tuple[list[type], list[Thread]]]:
+    """Follow "waits for class, built by thread" edges from ``me``. Must be called with the graph lock held."""
+    cycle: list[type] = []
+    threads: list[Thread] = []
+    while cls not in cycle:
+        owner = _owners.get(cls)
+        if owner is None:
+            return None
+        cycle.append(cls)
+        threads.append(owner)
+        if owner is me:
+            return cycle, threads
+        cls = _waiting.get(owner)
+        if cls is None:
+            return None
+    return None
+
+
+class _ConstructionLock:
+    """Acquires a class's lock with a timeout, recording who holds and who waits for it if tracking is on."""
+
+    __slots__ = ("cls", "lock", "timeout", "tracked")
+
+    def __init__(self, cls: type, timeout: Optional[float]):
+        self.cls = cls
+        self.lock = cls._lock
+        self.timeout = timeout
+        self.tracked = False
+
+    def __enter__(self) -> None:
+        cls, lock = self.cls, self.lock
+        timeout = -1 if self.timeout is None else self.timeout
+        if not _tracking:
+            if not lock.acquire(timeout=timeout):
+                raise SingletonTimeoutError(cls, self.timeout)
+            return
+        me = current_thread()
+        with _graph_lock:
+            if lock.acquire(blocking=False):
+                self.__held(me)
+                return
+            # Whichever thread closes a cycle sees every other edge of it already recorded here.
+            found = _find_cycle(me, cls)
+            if found is not None:
+                cycle, threads = found
+                raise ConstructionDeadlockError(me.name, cycle, [thread.name for thread in threads])
+            _waiting[me] = cls
+        acquired = False
+        try:
+            acquired = lock.acquire(timeout=timeout)
+        finally:
+            with _graph_lock:
+                _waiting.pop(me, None)
+                if acquired:
+                    self.__held(me)
+        if not acquired:
+            raise SingletonTimeoutError(cls, self.timeout)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.tracked:
+            with _graph_lock:
+                depth = _depths.pop(self.cls) - 1
+                if depth:
+                    _depths[self.cls] = depth
+                else:
+                    del _owners[self.cls]
+        self.lock.release()
+
+    def __held(self, me: Thread) -> None:
+        self.tracked = True
+        _owners[self.cls] = me
+        _depths[self.cls] = _depths.get(self.cls, 0) + 1
+
+
+def construction_lock(cls: type, timeout: Optional[float] = None) -> Any:
+    """
+    Return the context manager that guards construction of ``cls``.
+
+    Without a timeout and with deadlock detection off this is the class lock itself, so the default path costs
+    nothing extra.
+
+    Raises:
+        SingletonTimeoutError: If the lock could not be acquired within ``timeout`` seconds.
+        ConstructionDeadlockError: If deadlock detection is on and waiting would close a cycle.
+    """
+    if timeout is None and not _tracking:
+        return cls._lock
+    return _ConstructionLock(cls, timeout)
+
+
+# region Public API
+
+
+def enable_deadlock_detection() -> None:
+    """
+    Track which thread is constructing which singleton, and raise ``ConstructionDeadlockError`` instead of hanging.
+
+    This is a debugging aid: every construction then takes a global bookkeeping lock, so leave it off in
+    production. Only waits on the construction lock are tracked, not ``reset_instance()``.
+    """
+    global _tracking
+    _tracking = True
+
+
+def disable_deadlock_detection() -> None:
+    """Stop tracking constructions. Constructions already in progress finish their bookkeeping normally."""
+    global _tracking
+    _tracking = False
+
+
+def constructions_in_progress() -> dict[type, str]:
+    """Return the name of the thread constructing each class, as recorded while deadlock detection is on."""
+    with _graph_lock:
+        return {cls: thread.name for cls, thread in _owners.items()}
+
+
+# endregion
+
+
+def _reset_tracking_after_fork() -> None:
+    """Threads recorded in the parent do not exist in a forked child."""
+    global _graph_lock
+    _graph_lock = Lock()
+    _owners.clear()
+    _depths.clear()
+    _waiting.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_tracking_after_fork)
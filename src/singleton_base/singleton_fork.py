@@ -0,0 +1,77 @@
+import gc
+import logging
+import os
+from typing import Optional
+
+from .singleton_registry import registered_singletons, warm_up
+
+INHERIT = "inherit"
+RESET = "reset"
+REINIT = "reinit"
+FORK_POLICIES = (INHERIT, RESET, REINIT)
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_fork_policy(cls: type) -> None:
+    if cls._fork_policy == RESET:
+        cls.reset_instance()
+    elif cls._fork_policy == REINIT and cls.has_instance():
+        args, kwargs = cls._fork_args
+        cls.reset_instance()
+        cls(*args, **kwargs)
+
+
+def _after_fork_in_child() -> None:
+    """
+    Make every registered singleton usable in a freshly forked child.
+
+    A lock held by some other thread at fork time would stay held forever in the child because that
+    thread does not exist there, so every class replaces its locks through ``_after_fork``. Then each
+    class's ``fork_policy`` is applied: ``inherit`` keeps the parent's instance, ``reset`` drops it, and
+    ``reinit`` rebuilds it with the arguments it was originally constructed with. A class that fails is
+    logged and skipped, so the classes after it are still handled.
+    """
+    classes = registered_singletons()
+    for cls in classes:
+        try:
+            cls._after_fork()
+        except Exception:
+            logger.exception("Could not replace the locks of %s after fork", cls.__qualname__)
+    for cls in classes:
+        try:
+            _apply_fork_policy(cls)
+        except Exception:
+            logger.exception("Could not apply fork_policy=%r to %s after fork", cls._fork_policy, cls.__qualname__)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def preload_and_freeze(
+    *classes: type,
+    max_workers: Optional[int] = None,
+    kwargs: Optional[dict[type, dict]] = None,
+) -> dict[type, float]:
+    """
+    Build singletons in a pre-fork parent and move everything alive out of the garbage collector's reach.
+
+    Call this in the master process right before workers are forked. The singletons are built with
+    ``warm_up``, then a full collection runs and ``gc.freeze()`` moves every surviving object into the
+    permanent generation. Collections in the workers then never touch those objects, so their memory
+    pages stay shared copy-on-write instead of being copied into each worker.
+
+    Args:
+        *classes: Classes to build along with their dependencies. Defaults to every class declared with
+            ``eager=True``.
+        max_workers: Size of the warm-up thread pool.
+        kwargs: Constructor arguments per class.
+
+    Returns:
+        dict[type, float]: Seconds spent building each class, as returned by ``warm_up``.
+    """
+    timings = warm_up(*classes, max_workers=max_workers, kwargs=kwargs)
+    gc.collect()
+    gc.freeze()
+    return timings
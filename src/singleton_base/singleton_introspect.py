@@ -0,0 +1,129 @@
+import sys
+import types
+from asyncio import AbstractEventLoop
+from collections import deque
+from gc import get_referents
+from threading import Thread
+from time import perf_counter, time
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+from .singleton_registry import registered_singletons
+
+# Written on every construction, so it is kept cheap: a plain tuple of (finished, seconds, thread, allocated, loop)
+# per class and no lock, since entries are only ever set and read one at a time. The thread name and wall clock
+# time are only worked out when queried.
+BuildRecord = tuple[float, float, Thread, Optional[int], Optional[AbstractEventLoop]]
+_builds: "WeakKeyDictionary[type, BuildRecord]" = WeakKeyDictionary()
+
+
+def note_built(
+    cls: type,
+    finished: float,
+    seconds: float,
+    thread: Thread,
+    allocated: Optional[int],
+    loop: Optional[AbstractEventLoop],
+) -> None:
+    """Record a construction of ``cls`` that ended at ``perf_counter()`` time ``finished``."""
+    _builds[cls] = (finished, seconds, thread, allocated, loop)
+
+
+def build_record(cls: type) -> Optional[BuildRecord]:
+    """
+    Return ``(finished, seconds, thread, allocated, loop)`` for the last construction of ``cls``, if any, where
+    ``loop`` is the event loop that was running on the building thread.
+    """
+    return _builds.get(cls)
+
+
+# Shared objects that a deep size should not walk into: classes, modules and code belong to no one instance.
+_SHARED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.CodeType,
+    types.FrameType,
+)
+
+
+def deep_sizeof(obj: Any, exclude: frozenset = frozenset()) -> int:
+    """
+    Return the approximate number of bytes reachable from ``obj``.
+
+    Every object reachable through ``gc.get_referents`` is counted once with ``sys.getsizeof``. Classes, modules,
+    functions and objects whose ``id`` is in ``exclude`` are neither counted nor walked into.
+    """
+    seen = set(exclude)
+    pending = deque([obj])
+    total = 0
+    while pending:
+        item = pending.popleft()
+        if id(item) in seen or isinstance(item, _SHARED_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        pending.extend(get_referents(item))
+    return total
+
+
+class SingletonInfo:
+    """What one live singleton costs and where it came from, as reported by ``live_singletons()``."""
+
+    __slots__ = ("cls", "name", "deep_size", "allocated", "built_at", "age", "construction_seconds", "built_by")
+
+    def __init__(self, cls: type, deep_size: Optional[int], build: Optional[tuple]):
+        finished, seconds, thread, allocated, _ = build or (None, None, None, None, None)
+        self.cls = cls
+        self.name = f"{cls.__module__}.{cls.__qualname__}"
+        self.deep_size = deep_size
+        self.allocated = allocated
+        self.age = perf_counter() - finished if build else None
+        self.built_at = time() - self.age if build else None
+        self.construction_seconds = seconds
+        self.built_by = thread.name if build else None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "cls"}
+
+    def __repr__(self) -> str:
+        return f"<SingletonInfo {self.name} deep_size={self.deep_size} age={self.age} built_by={self.built_by!r}>"
+
+
+# region Public API
+
+
+def live_singletons(deep_size: bool = True) -> list[SingletonInfo]:
+    """
+    Describe every registered singleton class that currently has an instance, largest first.
+
+    ``deep_size`` is the approximate size of everything reachable from the instance, not counting other singletons
+    it refers to, so each byte is reported under one singleton. ``allocated`` is the memory traced by
+    ``tracemalloc`` during construction, including singletons built along the way, and is only known if
+    ``tracemalloc`` was tracing at the time. For thread and context scoped classes the calling thread's or
+    context's instance is reported. Keyed and pooled classes report through their own ``stats()``.
+
+    Args:
+        deep_size: Walk each instance to compute ``deep_size``. Pass ``False`` for a quick listing.
+
+    Returns:
+        list[SingletonInfo]: One entry per live singleton.
+    """
+    live = []
+    for cls in registered_singletons():
+        slot = cls.__dict__.get("_slot")
+        instance = getattr(slot, "inner", slot).instance if slot is not None else None
+        if instance is not None:
+            live.append((cls, instance))
+    singleton_ids = frozenset(id(instance) for _, instance in live)
+    infos = []
+    for cls, instance in live:
+        size = deep_sizeof(instance, singleton_ids - {id(instance)}) if deep_size else None
+        infos.append(SingletonInfo(cls, size, build_record(cls)))
+    infos.sort(key=lambda info: info.deep_size or 0, reverse=True)
+    return infos
+
+
+# endregion
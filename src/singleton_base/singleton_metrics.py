@@ -0,0 +1,204 @@
+import logging
+import os
+from threading import local
+from time import perf_counter
+from typing import Any, Callable, Optional
+
+from .singleton_registry import registered_singletons
+
+logger = logging.getLogger(__name__)
+
+MetricsHook = Callable[[str, type, float], None]
+
+_hooks: list[MetricsHook] = []
+
+
+class SingletonStats:
+    """
+    Counters for one singleton class.
+
+    ``hits`` counts reads that found an instance: ``get_instance()``, ``MyClass()`` and ``has_instance()`` calls
+    on a built singleton, including callers that waited on the lock while another thread built it. It is
+    updated without a lock, so it can undercount slightly under heavy contention.
+    """
+
+    __slots__ = (
+        "hits",
+        "constructions",
+        "construction_seconds_total",
+        "construction_seconds_max",
+        "lock_waits",
+        "lock_wait_seconds_total",
+        "lock_wait_seconds_max",
+        "resets",
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def snapshot(self) -> dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _emit(event: str, cls: type, seconds: float) -> None:
+    for hook in list(_hooks):
+        try:
+            hook(event, cls, seconds)
+        except Exception:
+            logger.exception("Singleton metrics hook %r failed on %s for %s", hook, event, cls.__name__)
+
+
+class _MeteredLock:
+    """Wraps a class's ``RLock`` to time how long callers wait for it."""
+
+    def __init__(self, inner: Any, cls: type, stats: SingletonStats):
+        self.inner = inner
+        self.cls = cls
+        self.stats = stats
+        self.held = local()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        start = perf_counter()
+        acquired = self.inner.acquire(blocking, timeout)
+        if acquired and not getattr(self.held, "depth", 0):
+            waited = perf_counter() - start
+            stats = self.stats
+            stats.lock_waits += 1
+            stats.lock_wait_seconds_total += waited
+            stats.lock_wait_seconds_max = max(stats.lock_wait_seconds_max, waited)
+            _emit("lock_wait", self.cls, waited)
+        if acquired:
+            self.held.depth = getattr(self.held, "depth", 0) + 1
+        return acquired
+
+    def release(self) -> None:
+        self.held.depth -= 1
+        self.inner.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class _MeteredSlot:
+    """Wraps a class's instance slot to count hits, constructions and resets."""
+
+    __slots__ = ("inner", "cls", "stats", "built")
+
+    def __init__(self, inner: Any, cls: type, stats: SingletonStats):
+        self.inner = inner
+        self.cls = cls
+        self.stats = stats
+        self.built = local()
+
+    @property
+    def instance(self) -> Optional[Any]:
+        instance = self.inner.instance
+        if instance is not None:
+            self.stats.hits += 1
+        return instance
+
+    @instance.setter
+    def instance(self, value: Optional[Any]) -> None:
+        self.inner.instance = value
+        if value is None:
+            self._record_reset()
+            return
+        stats = self.stats
+        stats.constructions += 1
+        # Every variant publishes on the thread that built the instance, right after constructing() timed it.
+        seconds = getattr(self.built, "seconds", None)
+        if seconds is not None:
+            self.built.seconds = None
+            stats.construction_seconds_total += seconds
+            stats.construction_seconds_max = max(stats.construction_seconds_max, seconds)
+            _emit("construct", self.cls, seconds)
+
+    def note_construction(self, seconds: float) -> None:
+        """Called by ``constructing()`` with how long a build took, to be recorded when it is published."""
+        self.built.seconds = seconds
+
+    def clear_all(self) -> None:
+        self.inner.clear_all()
+        self._record_reset()
+
+    def _record_reset(self) -> None:
+        self.stats.resets += 1
+        _emit("reset", self.cls, 0.0)
+
+
+# region Public API
+
+
+def enable_metrics(*classes: type) -> None:
+    """
+    Start collecting metrics for ``classes``, or for every registered singleton class if none are given.
+
+    The class's instance slot and lock are swapped for metered wrappers, and ``disable_metrics()`` swaps the
+    originals back, so classes without metrics run exactly the code they always did with no flag to check on
+    the hot path. Enabling a class that already collects metrics keeps its counters.
+    """
+    for cls in classes or registered_singletons():
+        if isinstance(cls.__dict__.get("_slot"), _MeteredSlot):
+            continue
+        stats = SingletonStats()
+        cls._lock = _MeteredLock(cls._lock, cls, stats)
+        cls._slot = _MeteredSlot(cls._slot, cls, stats)
+
+
+def disable_metrics(*classes: type) -> None:
+    """Stop collecting metrics for ``classes``, or for every class, and drop their counters."""
+    for cls in classes or registered_singletons():
+        slot = cls.__dict__.get("_slot")
+        if isinstance(slot, _MeteredSlot):
+            cls._slot = slot.inner
+            if isinstance(cls._lock, _MeteredLock):
+                cls._lock = cls._lock.inner
+
+
+def metrics_snapshot(*classes: type) -> dict[str, dict[str, float]]:
+    """
+    Return the counters of ``classes``, or of every class collecting metrics, keyed by ``module.qualname``.
+
+    Durations are in seconds.
+    """
+    snapshot = {}
+    for cls in classes or registered_singletons():
+        slot = cls.__dict__.get("_slot")
+        if isinstance(slot, _MeteredSlot):
+            snapshot[f"{cls.__module__}.{cls.__qualname__}"] = slot.stats.snapshot()
+    return snapshot
+
+
+def add_metrics_hook(hook: MetricsHook) -> None:
+    """
+    Call ``hook(event, cls, seconds)`` on every ``"construct"``, ``"lock_wait"`` and ``"reset"`` event.
+
+    Hooks run synchronously on the thread that triggered the event, so they should be quick, e.g. forwarding
+    the value to a metrics client. Hits are only reported through ``metrics_snapshot()``, never to hooks,
+    to keep the hot path cheap. Exceptions raised by hooks are logged and otherwise ignored.
+    """
+    _hooks.append(hook)
+
+
+def remove_metrics_hook(hook: MetricsHook) -> None:
+    """Stop calling ``hook``."""
+    _hooks.remove(hook)
+
+
+# endregion
+
+
+def _rewrap_locks_after_fork() -> None:
+    """The fork handler gives every class a plain new lock; put the meter back around it for metered classes."""
+    for cls in registered_singletons():
+        slot = cls.__dict__.get("_slot")
+        if isinstance(slot, _MeteredSlot) and not isinstance(cls._lock, _MeteredLock):
+            cls._lock = _MeteredLock(cls._lock, cls, slot.stats)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_rewrap_locks_after_fork)
@@ -0,0 +1,253 @@
+import json
+import os
+import sys
+import tracemalloc
+from asyncio import _get_running_loop
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock, current_thread
+from time import perf_counter
+from typing import Any, Iterator, Optional
+
+from .singleton_introspect import note_built
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class ConstructionRecord:
+    """One singleton construction, with the constructions it triggered as ``children``."""
+
+    __slots__ = ("name", "cls", "thread", "call_site", "start", "inclusive", "error", "children")
+
+    def __init__(self, name: str, cls: type, thread: str, call_site: Optional[str], start: float):
+        self.name = name
+        self.cls = cls
+        self.thread = thread
+        self.call_site = call_site
+        self.start = start
+        self.inclusive: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: list[ConstructionRecord] = []
+
+    @property
+    def exclusive(self) -> Optional[float]:
+        """Seconds spent in this construction itself, not counting the singletons it constructed."""
+        if self.inclusive is None:
+            return None
+        return self.inclusive - sum(child.inclusive or 0.0 for child in self.children)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "thread": self.thread,
+            "call_site": self.call_site,
+            "start": self.start,
+            "inclusive": self.inclusive,
+            "exclusive": self.exclusive,
+            "error": self.error,
+            "children": [child.as_dict() for child in self.children],
+        }
+
+
+class ConstructionProfile:
+    """
+    Singleton constructions recorded between ``start_recording()`` and ``stop_recording()``.
+
+    Constructions triggered while another one is running on the same thread or asyncio task are nested under it.
+    Times are in seconds, and ``start`` is relative to the start of the recording.
+    """
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.roots: list[ConstructionRecord] = []
+        self.lock = Lock()
+
+    def records(self) -> Iterator[tuple[int, ConstructionRecord]]:
+        """Yield ``(depth, record)`` for every construction, depth first in start order."""
+        stack = [(0, record) for record in reversed(self.roots)]
+        while stack:
+            depth, record = stack.pop()
+            yield depth, record
+            stack.extend((depth + 1, child) for child in reversed(record.children))
+
+    def as_dict(self) -> dict[str, Any]:
+        total = sum(record.inclusive or 0.0 for record in self.roots)
+        return {"total": total, "constructions": [record.as_dict() for record in self.roots]}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+    def report(self) -> str:
+        """Return the construction tree as text, with inclusive and exclusive time in milliseconds."""
+        count = sum(1 for _ in self.records())
+        total = self.as_dict()["total"]
+        lines = [
+            f"Singleton construction profile: {count} constructions, {total * 1000:.3f} ms total",
+            f"{'inclusive':>12} {'exclusive':>12}  singleton",
+        ]
+        for depth, record in self.records():
+            if record.inclusive is None:
+                inclusive = exclusive = "running"
+            else:
+                inclusive, exclusive = f"{record.inclusive * 1000:.3f} ms", f"{record.exclusive * 1000:.3f} ms"
+            details = [record.thread] + ([record.call_site] if record.call_site else [])
+            failed = f" FAILED ({record.error})" if record.error else ""
+            name = f"{'  ' * depth}{record.name}{failed}"
+            lines.append(f"{inclusive:>12} {exclusive:>12}  {name}  [{', '.join(details)}]")
+        return "\n".join(lines)
+
+    def folded(self) -> str:
+        """
+        Return the profile in the folded stack format read by ``flamegraph.pl`` and speedscope.
+
+        Each line is a ``;``-separated chain of constructions followed by its exclusive time in microseconds.
+        """
+        lines = []
+        stack: list[str] = []
+        for depth, record in self.records():
+            del stack[depth:]
+            stack.append(record.name)
+            if record.exclusive is not None:
+                lines.append(f"{';'.join(stack)} {round(record.exclusive * 1_000_000)}")
+        return "\n".join(lines)
+
+
+_profile: Optional[ConstructionProfile] = None
+_current: ContextVar[Optional[ConstructionRecord]] = ContextVar("singleton_construction", default=None)
+
+
+def caller_site() -> Optional[str]:
+    """Return ``file:line in function`` of the nearest caller outside this package, if recording."""
+    if _profile is None:
+        return None
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+    if frame is None:
+        return None
+    return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+class _Construction:
+    """Notes how long building ``cls`` took and on which thread, for ``live_singletons()`` and metrics."""
+
+    __slots__ = ("cls", "start", "traced")
+
+    def __init__(self, cls: type):
+        self.cls = cls
+
+    def __enter__(self) -> None:
+        self.traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self.start = perf_counter()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            finished = perf_counter()
+            allocated = None
+            if self.traced is not None and tracemalloc.is_tracing():
+                allocated = max(tracemalloc.get_traced_memory()[0] - self.traced, 0)
+            seconds = finished - self.start
+            note_built(self.cls, finished, seconds, current_thread(), allocated, _get_running_loop())
+            # A metered slot records the time when the instance is published, whichever lock that happens under.
+            note_construction = getattr(self.cls.__dict__.get("_slot"), "note_construction", None)
+            if note_construction is not None:
+                note_construction(seconds)
+
+
+class _Recording(_Construction):
+    """Also adds the construction to the running profile, nested under the one that triggered it."""
+
+    __slots__ = ("profile", "record", "token")
+
+    def __init__(self, cls: type, profile: ConstructionProfile, record: ConstructionRecord):
+        super().__init__(cls)
+        self.profile = profile
+        self.record = record
+
+    def __enter__(self) -> None:
+        parent = _current.get()
+        with self.profile.lock:
+            (self.profile.roots if parent is None else parent.children).append(self.record)
+        self.token = _current.set(self.record)
+        super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        super().__exit__(exc_type, exc, tb)
+        record = self.record
+        record.inclusive = perf_counter() - self.profile.started - record.start
+        if exc_type is not None:
+            record.error = exc_type.__name__
+        _current.reset(self.token)
+
+
+def constructing(cls: type, label: Optional[str] = None, site: Optional[str] = None) -> Any:
+    """
+    Return the context manager that wraps building an instance of ``cls``.
+
+    Every construction is timed for ``live_singletons()``. Only while a recording is running is it also added to
+    the profile, along with its call site.
+
+    Args:
+        cls: The class being constructed.
+        label: Name shown in the profile, defaults to ``module.qualname``.
+        site: Call site to record when the caller is not on the stack, e.g. for async construction.
+    """
+    profile = _profile
+    if profile is None:
+        return _Construction(cls)
+    record = ConstructionRecord(
+        label or f"{cls.__module__}.{cls.__qualname__}",
+        cls,
+        current_thread().name,
+        site or caller_site(),
+        perf_counter() - profile.started,
+    )
+    return _Recording(cls, profile, record)
+
+
+# region Public API
+
+
+def start_recording() -> ConstructionProfile:
+    """
+    Start recording every singleton construction in the process and return the profile being filled.
+
+    Call it before importing the application to include singletons built at import time; their call site then
+    ends in ``<module>``.
+
+    Raises:
+        RuntimeError: If a recording is already running.
+    """
+    global _profile
+    if _profile is not None:
+        raise RuntimeError("A singleton construction recording is already running")
+    _profile = ConstructionProfile()
+    return _profile
+
+
+def stop_recording() -> ConstructionProfile:
+    """
+    Stop recording and return the profile.
+
+    Raises:
+        RuntimeError: If no recording is running.
+    """
+    global _profile
+    profile = _profile
+    if profile is None:
+        raise RuntimeError("No singleton construction recording is running")
+    _profile = None
+    return profile
+
+
+@contextmanager
+def record_constructions() -> Iterator[ConstructionProfile]:
+    """Record singleton constructions for the duration of the ``with`` block."""
+    profile = start_recording()
+    try:
+        yield profile
+    finally:
+        stop_recording()
+
+
+# endregion
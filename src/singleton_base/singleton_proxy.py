@@ -0,0 +1,41 @@
+from typing import Any
+
+
+class SingletonProxy:
+    """
+    Lightweight stand-in for a singleton that is only constructed on first use.
+
+    Attribute access, assignment and deletion are forwarded to the real instance. The instance is looked up
+    through ``get_instance()`` every time, so the proxy follows ``reset_instance()``, rebuilds with the kwargs it
+    was created with if the singleton is missing, and gets whatever checks a variant makes on access, such as the
+    expiry of a ``RefreshingSingletonBase``. Once the instance exists, each access costs one ``get_instance()``
+    call plus the forwarded lookup.
+    """
+
+    __slots__ = ("__cls", "__kwargs")
+
+    def __init__(self, cls: type, kwargs: dict):
+        object.__setattr__(self, "_SingletonProxy__cls", cls)
+        object.__setattr__(self, "_SingletonProxy__kwargs", kwargs)
+
+    def __resolve(self) -> Any:
+        return self.__cls.get_instance(init=True, **self.__kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.__resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self.__resolve(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self.__resolve())
+
+    def __repr__(self) -> str:
+        cls = self.__cls
+        instance = cls._slot.instance
+        if instance is None:
+            return f"<SingletonProxy for {cls.__name__} (not constructed)>"
+        return repr(instance)
@@ -0,0 +1,142 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from time import perf_counter
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+_registry: "WeakKeyDictionary[type, None]" = WeakKeyDictionary()
+_registry_lock = Lock()
+
+
+class DependencyCycleError(RuntimeError):
+    """Raised when singleton dependencies declared with ``depends_on`` form a cycle."""
+
+    def __init__(self, cycle: list[type]):
+        self.cycle = cycle
+        super().__init__("Dependency cycle between singletons: " + " -> ".join(cls.__name__ for cls in cycle))
+
+
+# region Registry
+
+
+def _reset_lock_after_fork() -> None:
+    """Replace the registry lock in a forked child, where it may have been held by a thread that is gone."""
+    global _registry_lock
+    _registry_lock = Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+def register(cls: type) -> None:
+    """Record a singleton class. Called by ``SingletonMeta`` for every subclass it creates."""
+    with _registry_lock:
+        _registry[cls] = None
+
+
+def registered_singletons() -> list[type]:
+    """
+    Return every registered singleton class in definition order.
+
+    Classes are held weakly, so classes that are no longer referenced anywhere drop out of the registry.
+    """
+    with _registry_lock:
+        return list(_registry)
+
+
+# endregion
+
+# region Warm-up
+
+
+def _dependency_graph(classes: tuple[type, ...]) -> dict[type, tuple[type, ...]]:
+    """Collect ``classes`` and everything they transitively depend on."""
+    graph: dict[type, tuple[type, ...]] = {}
+    stack = list(classes)
+    while stack:
+        cls = stack.pop()
+        if cls not in graph:
+            graph[cls] = cls._depends_on
+            stack.extend(cls._depends_on)
+    return graph
+
+
+def _check_cycles(graph: dict[type, tuple[type, ...]]) -> None:
+    """Raise ``DependencyCycleError`` with the full chain if ``graph`` contains a cycle."""
+    visiting: list[type] = []
+    done: set[type] = set()
+
+    def visit(cls: type) -> None:
+        visiting.append(cls)
+        for dep in graph[cls]:
+            if dep in visiting:
+                raise DependencyCycleError(visiting[visiting.index(dep) :] + [dep])
+            if dep not in done:
+                visit(dep)
+        visiting.pop()
+        done.add(cls)
+
+    for cls in graph:
+        if cls not in done:
+            visit(cls)
+
+
+def warm_up(
+    *classes: type,
+    max_workers: Optional[int] = None,
+    kwargs: Optional[dict[type, dict]] = None,
+) -> dict[type, float]:
+    """
+    Construct singletons ahead of time, building independent ones in parallel.
+
+    Each class is built with ``get_instance(init=True, **kwargs.get(cls, {}))`` on a thread pool, and only
+    once everything it declares in ``depends_on`` has been built. Classes that already have an instance are
+    left as they are.
+
+    Args:
+        *classes: Classes to build along with their dependencies. Defaults to every registered class
+            declared with ``eager=True``.
+        max_workers: Size of the thread pool, as for ``ThreadPoolExecutor``.
+        kwargs: Constructor arguments per class.
+
+    Returns:
+        dict[type, float]: Seconds spent in ``get_instance`` for each class, in completion order.
+
+    Raises:
+        DependencyCycleError: If the dependencies form a cycle. Nothing is built in that case.
+    """
+    if not classes:
+        classes = tuple(cls for cls in registered_singletons() if cls._eager)
+    kwargs = kwargs or {}
+    graph = _dependency_graph(classes)
+    _check_cycles(graph)
+
+    waiting_on = {cls: set(deps) for cls, deps in graph.items()}
+    dependents: dict[type, list[type]] = {cls: [] for cls in graph}
+    for cls, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(cls)
+
+    def build(cls: type) -> float:
+        start = perf_counter()
+        cls.get_instance(init=True, **kwargs.get(cls, {}))
+        return perf_counter() - start
+
+    timings: dict[type, float] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="singleton-warm-up") as pool:
+        running: dict[Future, type] = {pool.submit(build, cls): cls for cls, deps in waiting_on.items() if not deps}
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                cls = running.pop(future)
+                timings[cls] = future.result()
+                for dependent in dependents[cls]:
+                    waiting_on[dependent].discard(cls)
+                    if not waiting_on[dependent]:
+                        running[pool.submit(build, dependent)] = dependent
+    return timings
+
+
+# endregion
@@ -0,0 +1,170 @@
+import weakref
+from contextvars import ContextVar
+from threading import Lock, RLock, Timer, local
+from time import monotonic
+from typing import Any, Optional
+
+PROCESS = "process"
+THREAD = "thread"
+CONTEXT = "context"
+SCOPES = (PROCESS, THREAD, CONTEXT)
+
+
+class ClassState:
+    """
+    State of a singleton class that changes after the class is created: its construction lock and the arguments its
+    instance was built with.
+
+    It is kept on this object rather than on the class, since every write to a class's attributes invalidates the
+    attribute caches and specialized bytecode CPython keeps for the class and its subclasses.
+    """
+
+    __slots__ = ("lock", "fork_args")
+
+    def __init__(self):
+        self.lock = RLock()
+        self.fork_args: tuple[tuple, dict] = ((), {})
+
+
+class ProcessSlot:
+    """Holds the one instance shared by the whole process."""
+
+    __slots__ = ("instance",)
+
+    def __init__(self, name: str):
+        self.instance: Optional[Any] = None
+
+    def clear_all(self) -> None:
+        self.instance = None
+
+    def after_fork(self) -> None:
+        """Nothing to replace: the slot has no lock."""
+
+
+class _ThreadLocalInstance(local):
+    instance: Optional[Any] = None
+
+
+class ThreadSlot:
+    """Holds a separate instance for every thread. Reads and writes never take a lock."""
+
+    __slots__ = ("__local",)
+
+    def __init__(self, name: str):
+        self.__local = _ThreadLocalInstance()
+
+    @property
+    def instance(self) -> Optional[Any]:
+        return self.__local.instance
+
+    @instance.setter
+    def instance(self, value: Optional[Any]) -> None:
+        self.__local.instance = value
+
+    def clear_all(self) -> None:
+        """Drop the instance of every thread by starting over with fresh thread-local storage."""
+        self.__local = _ThreadLocalInstance()
+
+    def after_fork(self) -> None:
+        """Nothing to replace: the slot has no lock."""
+
+
+class ContextSlot:
+    """Holds a separate instance for every ``contextvars.Context``, e.g. one per asyncio task."""
+
+    __slots__ = ("__var", "__generation")
+
+    def __init__(self, name: str):
+        # Each value is tagged with the generation it was set in, so clear_all() can drop every context's instance
+        # without creating a new context variable, which contexts would keep alive for as long as they exist.
+        self.__var: ContextVar[Optional[tuple[int, Any]]] = ContextVar(name, default=None)
+        self.__generation = 0
+
+    @property
+    def instance(self) -> Optional[Any]:
+        value = self.__var.get()
+        if value is None or value[0] != self.__generation:
+            return None
+        return value[1]
+
+    @instance.setter
+    def instance(self, value: Optional[Any]) -> None:
+        self.__var.set(None if value is None else (self.__generation, value))
+
+    def clear_all(self) -> None:
+        """Drop the instance of every context by moving on to a new generation."""
+        self.__generation += 1
+
+    def after_fork(self) -> None:
+        """Nothing to replace: the slot has no lock."""
+
+
+class WeakSlot:
+    """
+    Holds the process-wide instance through a weak reference, so it is freed once nobody else uses it.
+
+    With ``keep_alive`` the instance is also held strongly until ``keep_alive`` seconds have passed without it
+    being read, which avoids rebuilding an instance that is used in bursts.
+    """
+
+    __slots__ = ("__ref", "__keep_alive", "__strong", "__last_used", "__timer", "__lock")
+
+    def __init__(self, name: str, keep_alive: Optional[float] = None):
+        self.__ref: Optional[weakref.ref] = None
+        self.__keep_alive = keep_alive
+        self.__strong: Optional[Any] = None
+        self.__last_used = 0.0
+        self.__timer: Optional[Timer] = None
+        self.__lock = Lock()
+
+    @property
+    def instance(self) -> Optional[Any]:
+        ref = self.__ref
+        instance = None if ref is None else ref()
+        if instance is not None and self.__keep_alive is not None:
+            self.__hold(instance)
+        return instance
+
+    @instance.setter
+    def instance(self, value: Optional[Any]) -> None:
+        self.__ref = None if value is None else weakref.ref(value)
+        if value is None:
+            self.__strong = None
+        elif self.__keep_alive is not None:
+            self.__hold(value)
+
+    def clear_all(self) -> None:
+        self.instance = None
+
+    def after_fork(self) -> None:
+        """Replace the lock, and the keep-alive timer, whose thread does not exist in a forked child."""
+        self.__lock = Lock()
+        self.__timer = None
+        if self.__strong is not None:
+            self.__schedule(self.__keep_alive)
+
+    def __hold(self, instance: Any) -> None:
+        self.__strong = instance
+        self.__last_used = monotonic()
+        if self.__timer is None:
+            with self.__lock:
+                if self.__timer is None:
+                    self.__schedule(self.__keep_alive)
+
+    def __schedule(self, delay: float) -> None:
+        self.__timer = Timer(delay, self.__release)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __release(self) -> None:
+        """Drop the strong reference once the instance has gone unused for ``keep_alive`` seconds."""
+        with self.__lock:
+            idle = monotonic() - self.__last_used
+            if idle < self.__keep_alive:
+                self.__schedule(self.__keep_alive - idle)
+            else:
+                self.__strong = None
+                self.__timer = None
+
+
+SLOT_TYPES = {PROCESS: ProcessSlot, THREAD: ThreadSlot, CONTEXT: ContextSlot}
@@ -0,0 +1,394 @@
+import asyncio
+import atexit
+import inspect
+import logging
+from asyncio import AbstractEventLoop, _get_running_loop
+from queue import Empty, Queue
+from threading import Thread
+from time import monotonic, perf_counter
+from typing import Any, Iterable, Optional
+
+from .singleton_base_host import HostSingletonBase
+from .singleton_base_keyed import KeyedSingletonBase
+from .singleton_base_pool import PooledSingletonBase
+from .singleton_base_sharded import ShardedSingletonBase
+from .singleton_introspect import build_record
+from .singleton_registry import registered_singletons
+
+logger = logging.getLogger(__name__)
+
+
+class ShutdownReport:
+    """What ``shutdown_all()`` did with each singleton class it had to close."""
+
+    __slots__ = ("closed", "failed", "timed_out", "skipped", "seconds")
+
+    def __init__(self):
+        self.closed: dict[type, float] = {}
+        self.failed: dict[type, BaseException] = {}
+        self.timed_out: list[type] = []
+        self.skipped: list[type] = []
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """``True`` if every class was closed without error before the deadline."""
+        return not (self.failed or self.timed_out or self.skipped)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ShutdownReport closed={len(self.closed)} failed={len(self.failed)} timed_out={len(self.timed_out)} "
+            f"skipped={len(self.skipped)} seconds={self.seconds:.3f}>"
+        )
+
+
+def _closable(cls: type) -> list[Any]:
+    """Return the instances of ``cls`` that shutdown closes."""
+    if issubclass(cls, KeyedSingletonBase):
+        with cls._keyed.lock:
+            return list(cls._keyed.instances.values())
+    if issubclass(cls, ShardedSingletonBase):
+        return cls.shard_instances()
+    # Pooled instances are closed through ``on_discard``, and a host-wide instance only by the process that owns it.
+    if issubclass(cls, PooledSingletonBase) or (issubclass(cls, HostSingletonBase) and not cls.is_owner()):
+        return []
+    slot = cls._slot
+    instance = getattr(slot, "inner", slot).instance
+    return [] if instance is None else [instance]
+
+
+def _created_at(cls: type) -> float:
+    record = build_record(cls)
+    return record[0] if record else 0.0
+
+
+def _owning_loop(cls: type) -> Optional[AbstractEventLoop]:
+    """Return the event loop that was running when ``cls`` was last built, if any."""
+    record = build_record(cls)
+    return record[4] if record else None
+
+
+def _blockers(classes: list[type]) -> dict[type, set[type]]:
+    """
+    Map each class to the classes that must be closed before it: those that declare it in ``depends_on``, and
+    those whose construction built it, since they may still use it while closing.
+    """
+    blocked_by: dict[type, set[type]] = {cls: set() for cls in classes}
+    for cls in classes:
+        for dependency in cls._depends_on:
+            if dependency in blocked_by and dependency is not cls:
+                blocked_by[dependency].add(cls)
+    spans = []
+    for cls in classes:
+        record = build_record(cls)
+        if record is not None:
+            finished, seconds, thread, _, _ = record
+            spans.append((cls, finished - seconds, finished, thread))
+    for outer, outer_start, outer_end, outer_thread in spans:
+        for inner, inner_start, inner_end, inner_thread in spans:
+            if (
+                inner is not outer
+                and inner_thread is outer_thread
+                and outer_start <= inner_start
+                and inner_end <= outer_end
+            ):
+                blocked_by[inner].add(outer)
+    return blocked_by
+
+
+class _Plan:
+    """The classes left to close, their instances, and which classes each of them still waits for."""
+
+    __slots__ = ("targets", "loops", "created", "blocked_by", "pending")
+
+    def __init__(self, classes: Iterable[type]):
+        self.targets: dict[type, list[Any]] = {}
+        for cls in classes:
+            instances = _closable(cls)
+            if instances or (issubclass(cls, PooledSingletonBase) and cls.has_instance()):
+                self.targets[cls] = instances
+        self.loops = {cls: _owning_loop(cls) for cls in self.targets}
+        self.created = {cls: _created_at(cls) for cls in self.targets}
+        self.blocked_by = _blockers(list(self.targets))
+        self.pending = set(self.targets)
+
+    def newest_first(self, classes: Iterable[type]) -> list[type]:
+        return sorted(classes, key=self.created.__getitem__, reverse=True)
+
+    def take_ready(self, slots: int, busy: bool) -> list[type]:
+        """Remove and return up to ``slots`` classes that no longer wait for any other, most recently built first."""
+        ready = self.newest_first(cls for cls in self.pending if not self.blocked_by[cls])
+        if not ready and not busy and self.pending:
+            # Only a dependency cycle is left: start with the most recently built class.
+            ready = self.newest_first(self.pending)[:1]
+        ready = ready[:slots]
+        self.pending.difference_update(ready)
+        return ready
+
+    def finish(self, report: ShutdownReport, cls: type, seconds: float, error: Optional[BaseException]) -> None:
+        """Record how closing ``cls`` went and stop the remaining classes from waiting for it."""
+        if error is None:
+            report.closed[cls] = seconds
+        else:
+            report.failed[cls] = error
+        for other in self.pending:
+            self.blocked_by[other].discard(cls)
+
+
+def _worker_limit(parallel: bool, max_workers: Optional[int], plan: _Plan) -> int:
+    return 1 if not parallel else max_workers or len(plan.targets) or 1
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(deadline - monotonic(), 0)
+
+
+def _conclude(
+    report: ShutdownReport, plan: _Plan, running: Iterable[type], start: float, timeout: Optional[float]
+) -> ShutdownReport:
+    """Fill in what was left unfinished at the deadline and log what went wrong."""
+    report.timed_out = plan.newest_first(running)
+    report.skipped = plan.newest_first(plan.pending)
+    report.seconds = perf_counter() - start
+    for cls, error in report.failed.items():
+        logger.warning("Closing %s failed", cls.__qualname__, exc_info=error)
+    if report.timed_out or report.skipped:
+        logger.warning(
+            "Singleton shutdown exceeded its %ss deadline: still closing %s, not started %s",
+            timeout,
+            [cls.__qualname__ for cls in report.timed_out],
+            [cls.__qualname__ for cls in report.skipped],
+        )
+    return report
+
+
+# region Closing on threads
+
+
+async def _aclose(instance: Any) -> None:
+    result = instance.aclose()
+    if inspect.isawaitable(result):
+        await result
+
+
+def _close_instance(instance: Any, loop: Optional[AbstractEventLoop]) -> None:
+    """
+    Call ``instance.close()``, or run ``instance.aclose()`` on ``loop`` if that is still running, so resources tied
+    to the loop are closed on it. Otherwise ``aclose()`` runs on a new event loop.
+    """
+    if callable(getattr(instance, "aclose", None)):
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(_aclose(instance), loop).result()
+        else:
+            asyncio.run(_aclose(instance))
+        return
+    close = getattr(instance, "close", None)
+    if callable(close):
+        close()
+
+
+def _close(cls: type, instances: list[Any], loop: Optional[AbstractEventLoop]) -> None:
+    """Close the instances of ``cls``, then reset it so nothing hands out a closed instance."""
+    try:
+        for instance in instances:
+            _close_instance(instance, loop)
+    finally:
+        cls.reset_instance(all_scopes=True)
+
+
+def _start(run: Any, cls: type) -> None:
+    """Call ``run(cls)`` on a daemon thread, or on this one where threads cannot be started."""
+    try:
+        Thread(target=run, args=(cls,), name=f"shutdown-{cls.__name__}", daemon=True).start()
+    except RuntimeError:
+        run(cls)
+
+
+def _close_on_threads(plan: _Plan, report: ShutdownReport, limit: int, deadline: Optional[float]) -> set[type]:
+    """Close the planned classes in waves on daemon threads until done or past ``deadline``. Returns the overruns."""
+    running: set[type] = set()
+    done: "Queue[tuple[type, float, Optional[BaseException]]]" = Queue()
+
+    def run(cls: type) -> None:
+        began = perf_counter()
+        error = None
+        try:
+            _close(cls, plan.targets[cls], plan.loops[cls])
+        except BaseException as e:
+            error = e
+        done.put((cls, perf_counter() - began, error))
+
+    def settle(cls: type, seconds: float, error: Optional[BaseException]) -> None:
+        running.discard(cls)
+        plan.finish(report, cls, seconds, error)
+
+    while plan.pending or running:
+        for cls in plan.take_ready(limit - len(running), bool(running)):
+            running.add(cls)
+            _start(run, cls)
+        try:
+            settle(*done.get(timeout=_remaining(deadline)))
+        except Empty:
+            break
+    while not done.empty():
+        settle(*done.get_nowait())
+    return running
+
+
+# endregion
+
+# region Closing on the running event loop
+
+
+async def _aclose_instance(instance: Any, loop: Optional[AbstractEventLoop]) -> None:
+    """Await ``instance.aclose()`` on ``loop`` if it is another running loop, or here, or ``close()`` on a thread."""
+    if callable(getattr(instance, "aclose", None)):
+        if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_aclose(instance), loop))
+        else:
+            await _aclose(instance)
+        return
+    close = getattr(instance, "close", None)
+    if callable(close):
+        await asyncio.to_thread(close)
+
+
+async def _aclose_class(
+    cls: type, instances: list[Any], loop: Optional[AbstractEventLoop]
+) -> tuple[float, Optional[BaseException]]:
+    began = perf_counter()
+    try:
+        try:
+            for instance in instances:
+                await _aclose_instance(instance, loop)
+        finally:
+            cls.reset_instance(all_scopes=True)
+    except Exception as e:
+        return perf_counter() - began, e
+    return perf_counter() - began, None
+
+
+async def _close_on_loop(plan: _Plan, report: ShutdownReport, limit: int, deadline: Optional[float]) -> set[type]:
+    """Close the planned classes in waves of tasks until done or past ``deadline``. Overruns are cancelled."""
+    running: dict[asyncio.Task, type] = {}
+    while plan.pending or running:
+        for cls in plan.take_ready(limit - len(running), bool(running)):
+            running[asyncio.ensure_future(_aclose_class(cls, plan.targets[cls], plan.loops[cls]))] = cls
+        finished, _ = await asyncio.wait(running, timeout=_remaining(deadline), return_when=asyncio.FIRST_COMPLETED)
+        if not finished:
+            break
+        for task in finished:
+            plan.finish(report, running.pop(task), *task.result())
+    for task in running:
+        task.cancel()
+    return set(running.values())
+
+
+# endregion
+
+# region Public API
+
+
+def shutdown_all(
+    *classes: type, timeout: Optional[float] = None, parallel: bool = True, max_workers: Optional[int] = None
+) -> ShutdownReport:
+    """
+    Close every singleton that has an instance, dependents first, and reset it.
+
+    Each instance is closed by calling its ``close()``, or by awaiting its ``aclose()`` on the event loop that was
+    running when its class was built, if that loop is still running, so resources tied to the loop are closed on
+    it. Otherwise ``aclose()`` is awaited on a new event loop. Instances with neither are only reset. A class is
+    closed only after the classes that declare it in ``depends_on``, and those whose construction built it, have
+    been closed. Unrelated classes are closed in parallel on their own threads, most recently built first. Every
+    key of a keyed singleton and every shard of a sharded one is closed, pooled singletons close their idle
+    instances through ``on_discard``, and a host-wide singleton is only closed by the process that owns it. For
+    thread and context scoped classes the calling thread's or context's instance is closed and the others are reset.
+
+    Closing runs on daemon threads, so a close that hangs past ``timeout`` is reported and left behind instead of
+    holding up the process. Where threads cannot be started, as at interpreter exit on Python 3.12, classes are
+    closed one by one on the calling thread and the deadline is only checked between them. From a coroutine, use
+    ``await ashutdown_all()`` instead.
+
+    Args:
+        *classes: Classes to shut down. Defaults to every registered class.
+        timeout: Seconds to wait for everything to close, e.g. the part of the termination grace period left for
+            it. ``None`` waits forever.
+        parallel: Close unrelated classes at the same time. With ``False`` they are closed one at a time, in
+            reverse order of construction.
+        max_workers: Maximum number of classes closed at the same time. ``None`` puts no limit on it.
+
+    Returns:
+        ShutdownReport: Which classes were closed and how long each took, which raised, which were still closing
+            at the deadline, and which were never started because a class they had to wait for overran.
+
+    Raises:
+        RuntimeError: If called on the thread running the event loop that some ``aclose()`` must run on, which
+            would deadlock.
+    """
+    start = perf_counter()
+    deadline = None if timeout is None else monotonic() + timeout
+    plan = _Plan(classes or registered_singletons())
+    current = _get_running_loop()
+    if current is not None and current in plan.loops.values():
+        raise RuntimeError("shutdown_all() would block the event loop it has to close on, use `await ashutdown_all()`")
+    report = ShutdownReport()
+    running = _close_on_threads(plan, report, _worker_limit(parallel, max_workers, plan), deadline)
+    return _conclude(report, plan, running, start, timeout)
+
+
+async def ashutdown_all(
+    *classes: type, timeout: Optional[float] = None, parallel: bool = True, max_workers: Optional[int] = None
+) -> ShutdownReport:
+    """
+    Close every singleton that has an instance, dependents first, and reset it, without blocking the event loop.
+
+    Orders and reports closing like ``shutdown_all()``, but ``aclose()`` is awaited on the running event loop, or
+    on the loop that was running when its class was built if that is another loop that is still running. ``close()``
+    methods run on worker threads. Closes still running at the deadline are cancelled.
+
+    Args:
+        *classes: Classes to shut down. Defaults to every registered class.
+        timeout: Seconds to wait for everything to close. ``None`` waits forever.
+        parallel: Close unrelated classes at the same time. With ``False`` they are closed one at a time, in
+            reverse order of construction.
+        max_workers: Maximum number of classes closed at the same time. ``None`` puts no limit on it.
+
+    Returns:
+        ShutdownReport: Which classes were closed and how long each took, which raised, which were cancelled at
+            the deadline, and which were never started because a class they had to wait for overran.
+    """
+    start = perf_counter()
+    deadline = None if timeout is None else monotonic() + timeout
+    plan = _Plan(classes or registered_singletons())
+    report = ShutdownReport()
+    running = await _close_on_loop(plan, report, _worker_limit(parallel, max_workers, plan), deadline)
+    return _conclude(report, plan, running, start, timeout)
+
+
+_exit_options: dict[str, Any] = {}
+
+
+def _shutdown_at_exit() -> None:
+    shutdown_all(**_exit_options)
+
+
+def enable_shutdown_at_exit(
+    timeout: Optional[float] = None, parallel: bool = True, max_workers: Optional[int] = None
+) -> None:
+    """
+    Run ``shutdown_all`` with these arguments when the interpreter exits. Calling it again replaces the arguments.
+
+    ``atexit`` does not run when the process is killed by a signal. Kubernetes stops a pod with ``SIGTERM``, so
+    install a handler that exits normally, such as ``signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))``.
+    """
+    _exit_options.update(timeout=timeout, parallel=parallel, max_workers=max_workers)
+    atexit.unregister(_shutdown_at_exit)
+    atexit.register(_shutdown_at_exit)
+
+
+def disable_shutdown_at_exit() -> None:
+    """Stop ``enable_shutdown_at_exit`` from shutting down singletons at exit."""
+    atexit.unregister(_shutdown_at_exit)
+
+
+# endregion
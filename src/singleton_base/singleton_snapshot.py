@@ -0,0 +1,176 @@
+import logging
+import os
+import pickle
+from time import time
+from typing import Any, Optional, Union
+
+from .singleton_deadlock import construction_lock
+from .singleton_profile import constructing
+from .singleton_registry import registered_singletons
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+PathType = Union[str, "os.PathLike[str]"]
+
+
+def _class_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def check_restorable(cls: type) -> None:
+    """Raise ``TypeError`` if ``cls`` is a variant, such as a keyed or pooled singleton, with no single slot."""
+    if not getattr(cls, "_restorable", False):
+        raise TypeError(f"{cls.__name__} builds its instance its own way and cannot be restored or snapshotted")
+
+
+def _version(cls: type) -> Any:
+    check_restorable(cls)
+    version = getattr(cls, "snapshot_version", None)
+    if version is None:
+        raise TypeError(f"{cls.__name__} does not support snapshots, set `snapshot_version` on the class to opt in")
+    return version
+
+
+def write_snapshot(cls: type, path: PathType) -> None:
+    """Pickle the current instance of ``cls`` to ``path`` behind a header naming the class and its version."""
+    version = _version(cls)
+    instance = cls.get_instance()
+    header = {"format": SNAPSHOT_FORMAT, "class": _class_name(cls), "version": version, "created": time()}
+    path = os.fspath(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Write next to the target and rename, so readers never see a half-written snapshot.
+    partial = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(instance, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
+
+
+def read_snapshot(cls: type, path: PathType) -> Optional[Any]:
+    """
+    Load the instance of ``cls`` saved at ``path``, or return ``None`` if it is missing, stale or unreadable.
+
+    The header is checked before the instance is unpickled, so a snapshot of another class or version is never
+    loaded.
+    """
+    version = _version(cls)
+    try:
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+                logger.warning("Ignoring snapshot %s for %s: unknown format", path, cls.__name__)
+                return None
+            if header.get("class") != _class_name(cls) or header.get("version") != version:
+                logger.warning(
+                    "Ignoring stale snapshot %s: it holds %s version %r, expected %s version %r",
+                    path,
+                    header.get("class"),
+                    header.get("version"),
+                    _class_name(cls),
+                    version,
+                )
+                return None
+            instance = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Ignoring unreadable snapshot %s for %s", path, cls.__name__, exc_info=True)
+        return None
+    if type(instance) is not cls:
+        logger.warning("Ignoring snapshot %s: it holds a %s, not a %s", path, type(instance).__name__, cls.__name__)
+        return None
+    return instance
+
+
+def restore_instance(cls: type, path: PathType, kwargs: dict) -> Optional[Any]:
+    """
+    Publish the instance saved at ``path`` as the singleton of ``cls`` and return it, or ``None`` if it is unusable.
+
+    Must be called with the class lock held and no instance published. The instance is published through the
+    class's ``_publish`` like a built one, with ``kwargs`` as the arguments it was built with, so variants such as
+    ``RefreshingSingletonBase`` schedule its expiry and rebuild it with them.
+    """
+    with constructing(cls, f"{_class_name(cls)} (restored)"):
+        instance = read_snapshot(cls, path)
+    if instance is not None:
+        cls._publish(instance, (), kwargs)
+    return instance
+
+
+def _snapshot_path(directory: PathType, cls: type) -> str:
+    return os.path.join(directory, _class_name(cls) + SNAPSHOT_SUFFIX)
+
+
+def _snapshot_classes() -> list[type]:
+    classes = []
+    for cls in registered_singletons():
+        if getattr(cls, "snapshot_version", None) is None:
+            continue
+        if not getattr(cls, "_restorable", False):
+            logger.warning("Skipping %s: it sets snapshot_version but cannot be snapshotted", cls.__name__)
+            continue
+        classes.append(cls)
+    return classes
+
+
+# region Public API
+
+
+def snapshot_all(directory: PathType) -> dict[type, str]:
+    """
+    Snapshot every built singleton that declares ``snapshot_version`` into ``directory``.
+
+    Keyed, pooled, sharded, host-wide and async singletons cannot be snapshotted and are skipped with a warning.
+
+    Returns:
+        dict[type, str]: The path written for each class.
+    """
+    written = {}
+    for cls in _snapshot_classes():
+        if cls.has_instance():
+            path = _snapshot_path(directory, cls)
+            write_snapshot(cls, path)
+            written[cls] = path
+    return written
+
+
+def restore_all(directory: PathType, kwargs: Optional[dict[type, dict]] = None) -> dict[type, bool]:
+    """
+    Restore every singleton that declares ``snapshot_version`` and has a snapshot in ``directory``.
+
+    A restored instance is published as if it had been built with ``kwargs.get(cls, {})``, which is what a
+    ``RefreshingSingletonBase`` rebuilds it with when it expires, and a ``fork_policy="reinit"`` class after a fork.
+    Classes whose constructor needs arguments must get them here.
+
+    Classes whose snapshot is stale or unreadable are left unbuilt, so they are built normally on first use or by
+    ``warm_up()``. Classes that already have an instance are skipped, and so are the variants ``snapshot_all``
+    skips.
+
+    Args:
+        directory: Directory ``snapshot_all`` wrote to.
+        kwargs: Constructor arguments per class.
+
+    Returns:
+        dict[type, bool]: Whether each class that had a snapshot file was restored from it.
+    """
+    kwargs = kwargs or {}
+    restored = {}
+    for cls in _snapshot_classes():
+        path = _snapshot_path(directory, cls)
+        if not os.path.exists(path):
+            continue
+        with construction_lock(cls):
+            if cls._slot.instance is None:
+                restored[cls] = restore_instance(cls, path, kwargs.get(cls, {})) is not None
+    return restored
+
+
+# endregion
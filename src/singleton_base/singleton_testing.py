@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from .singleton_base_keyed import KeyedSingletonBase
+from .singleton_base_pool import PooledSingletonBase
+from .singleton_base_sharded import ShardedSingletonBase
+from .singleton_base_ttl import RefreshingSingletonBase
+from .singleton_registry import registered_singletons
+
+# region Public API
+
+
+@contextmanager
+def override_instance(cls: type, obj: Any) -> Iterator[Any]:
+    """
+    Make ``obj`` the instance of ``cls`` for the duration of the ``with`` block, e.g. to swap in a fake in a test.
+
+    ``obj`` is published as is, without calling ``__init__``, and the previous instance, or the lack of one, is put
+    back when the block exits. A refreshing singleton does not refresh ``obj``. For classes declared with
+    ``scope="thread"`` or ``scope="context"`` only the calling thread's or context's instance is overridden.
+
+    Args:
+        cls: The singleton class to override.
+        obj: The object ``cls.get_instance()`` and ``cls()`` return inside the block.
+
+    Yields:
+        Any: ``obj``.
+
+    Raises:
+        TypeError: If ``cls`` is keyed, pooled or sharded, which have no single instance to replace.
+    """
+    if issubclass(cls, (KeyedSingletonBase, PooledSingletonBase, ShardedSingletonBase)):
+        raise TypeError(f"{cls.__name__} has no single instance to override")
+    refreshing = issubclass(cls, RefreshingSingletonBase)
+    with cls._lock:
+        previous = cls._slot.instance
+        if refreshing:
+            expiry = cls._refresh.expires_at, cls._refresh.stale_limit_at
+            cls._refresh.expires_at, cls._refresh.stale_limit_at = float("inf"), None
+        cls._slot.instance = obj
+    try:
+        yield obj
+    finally:
+        with cls._lock:
+            cls._slot.instance = previous
+            if refreshing:
+                cls._refresh.expires_at, cls._refresh.stale_limit_at = expiry
+
+
+def reset_all(exclude: frozenset = frozenset()) -> None:
+    """
+    Reset the instances of every registered singleton class, in every thread and context.
+
+    Keyed singletons drop every key, sharded singletons every shard, and pooled singletons discard their idle
+    instances.
+
+    Args:
+        exclude: Classes to leave alone.
+    """
+    for cls in registered_singletons():
+        if cls not in exclude:
+            cls.reset_instance(all_scopes=True)
+
+
+# endregion
@@ -0,0 +1,145 @@
+import asyncio
+from threading import Event, Thread
+
+import pytest
+
+from singleton_base import AsyncSingletonBase
+
+
+class AsyncClient(AsyncSingletonBase):
+    ainit_calls = 0
+
+    def __init__(self, url: str):
+        self.url = url
+        self.connected = False
+
+    async def ainit(self) -> None:
+        AsyncClient.ainit_calls += 1
+        await asyncio.sleep(0.05)
+        self.connected = True
+
+
+class FlakyClient(AsyncSingletonBase):
+    attempts = 0
+
+    async def ainit(self) -> None:
+        FlakyClient.attempts += 1
+        await asyncio.sleep(0)
+        if FlakyClient.attempts == 1:
+            raise ConnectionError("first attempt fails")
+
+
+class SlowStartClient(AsyncSingletonBase):
+    started = Event()
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        SlowStartClient.started.set()
+
+    async def ainit(self) -> None:
+        await asyncio.sleep(self.delay)
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    AsyncClient.reset_instance()
+    AsyncClient.ainit_calls = 0
+    FlakyClient.reset_instance()
+    FlakyClient.attempts = 0
+    SlowStartClient.reset_instance()
+    SlowStartClient.started.clear()
+
+
+def test_aget_instance_initializes_once():
+    """Test that concurrent coroutines share a single in-flight construction."""
+
+    async def main():
+        return await asyncio.gather(*(AsyncClient.aget_instance(init=True, url="http://db") for _ in range(10)))
+
+    instances = asyncio.run(main())
+
+    assert all(instance is instances[0] for instance in instances)
+    assert instances[0].connected
+    assert instances[0].url == "http://db"
+    assert AsyncClient.ainit_calls == 1
+    assert AsyncClient.get_instance() is instances[0]
+    assert AsyncClient() is instances[0]
+
+
+def test_aget_instance_does_not_block_the_loop():
+    """Test that other coroutines keep running while the instance initializes."""
+    ticks = []
+
+    async def ticker():
+        while not AsyncClient.has_instance():
+            ticks.append(1)
+            await asyncio.sleep(0.005)
+
+    async def main():
+        await asyncio.gather(ticker(), AsyncClient.aget_instance(init=True, url="http://db"))
+
+    asyncio.run(main())
+
+    assert len(ticks) > 2
+
+
+def test_aget_instance_uninitialized():
+    """Test that RuntimeError is raised when the instance is requested without init."""
+    with pytest.raises(RuntimeError, match="Instance of AsyncClient is not initialized yet"):
+        asyncio.run(AsyncClient.aget_instance())
+
+
+def test_sync_construction_is_rejected():
+    """Test that a cold async singleton cannot be built through the synchronous paths."""
+    with pytest.raises(RuntimeError, match="initialized asynchronously"):
+        AsyncClient(url="http://db")
+    with pytest.raises(RuntimeError, match="initialized asynchronously"):
+        AsyncClient.get_instance(init=True, url="http://db")
+    assert not AsyncClient.has_instance()
+
+
+def test_failed_ainit_is_not_published():
+    """Test that a failed construction leaves no instance behind and can be retried."""
+    with pytest.raises(ConnectionError):
+        asyncio.run(FlakyClient.aget_instance(init=True))
+    assert not FlakyClient.has_instance()
+
+    instance = asyncio.run(FlakyClient.aget_instance(init=True))
+    assert FlakyClient.get_instance() is instance
+    assert FlakyClient.attempts == 2
+
+
+def test_cancelled_caller_does_not_cancel_construction():
+    """Test that cancelling one waiter leaves the shared construction running for the others."""
+
+    async def main():
+        first = asyncio.ensure_future(AsyncClient.aget_instance(init=True, url="http://db"))
+        second = asyncio.ensure_future(AsyncClient.aget_instance(init=True, url="http://db"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    instance = asyncio.run(main())
+
+    assert instance.connected
+    assert AsyncClient.ainit_calls == 1
+
+
+def test_builds_on_two_loops_publish_one_instance():
+    """Test that overlapping builds on two event loops hand both callers the first published instance."""
+    results = {}
+
+    def run(name: str, delay: float) -> None:
+        results[name] = asyncio.run(SlowStartClient.aget_instance(init=True, delay=delay))
+
+    slow = Thread(target=run, args=("slow", 0.3))
+    slow.start()
+    assert SlowStartClient.started.wait(5)
+    fast = Thread(target=run, args=("fast", 0))
+    fast.start()
+    fast.join(5)
+    slow.join(5)
+
+    assert results["slow"] is results["fast"] is SlowStartClient.get_instance()
+    assert results["fast"].delay == 0
+    assert SlowStartClient._async.pending is None
@@ -0,0 +1,150 @@
+from threading import Barrier, Event, Thread
+from time import sleep
+
+import pytest
+
+from singleton_base import (
+    ConstructionDeadlockError,
+    KeyedSingletonBase,
+    SingletonBase,
+    SingletonTimeoutError,
+    constructions_in_progress,
+    disable_deadlock_detection,
+    enable_deadlock_detection,
+)
+
+both_building = Barrier(2, timeout=5)
+
+
+class Inventory(SingletonBase):
+    def __init__(self, first: bool = True):
+        if first:
+            both_building.wait()
+            Pricing(first=False)
+
+
+class Pricing(SingletonBase):
+    def __init__(self, first: bool = True):
+        if first:
+            both_building.wait()
+            Inventory(first=False)
+
+
+class SlowService(SingletonBase):
+    def __init__(self, delay: float = 0.0):
+        sleep(delay)
+
+
+class TenantClient(KeyedSingletonBase):
+    def __init__(self, tenant: str, delay: float = 0.0):
+        sleep(delay)
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    yield
+    disable_deadlock_detection()
+    both_building.reset()
+    for cls in (Inventory, Pricing, SlowService, TenantClient):
+        cls.reset_instance()
+
+
+def hold_lock(cls, seconds: float) -> Thread:
+    """Hold ``cls``'s construction lock on another thread for ``seconds``."""
+    holding = Event()
+
+    def run():
+        with cls._lock:
+            holding.set()
+            sleep(seconds)
+
+    thread = Thread(target=run)
+    thread.start()
+    holding.wait()
+    return thread
+
+
+def test_get_instance_times_out_while_another_thread_constructs():
+    """Test that get_instance gives up after the timeout instead of waiting for a slow construction."""
+    holder = hold_lock(SlowService, 0.3)
+    with pytest.raises(SingletonTimeoutError, match="SlowService") as info:
+        SlowService.get_instance(init=True, timeout=0.05)
+    holder.join()
+
+    assert info.value.cls is SlowService
+    assert isinstance(info.value, TimeoutError)
+    assert not SlowService.has_instance()
+    assert SlowService.get_instance(init=True, timeout=0.05) is SlowService.get_instance()
+
+
+def test_timeout_does_not_apply_to_an_existing_instance():
+    """Test that a built instance is returned even if another thread holds the lock."""
+    instance = SlowService()
+    holder = hold_lock(SlowService, 0.2)
+    assert SlowService.get_instance(init=True, timeout=0.01) is instance
+    holder.join()
+
+
+def test_keyed_get_instance_times_out():
+    """Test that the timeout also bounds waiting on another thread building the same key."""
+    builder = Thread(target=TenantClient.get_instance, args=("acme",), kwargs={"init": True, "delay": 0.3})
+    builder.start()
+    sleep(0.05)
+    with pytest.raises(SingletonTimeoutError):
+        TenantClient.get_instance("acme", init=True, timeout=0.05)
+    builder.join()
+    assert TenantClient.has_instance("acme")
+
+
+def test_cross_thread_construction_cycle_is_reported():
+    """Test that two threads constructing each other's singletons get an error instead of hanging."""
+    enable_deadlock_detection()
+    errors = []
+
+    def build(cls):
+        try:
+            cls()
+        except ConstructionDeadlockError as e:
+            errors.append(e)
+
+    threads = [Thread(target=build, args=(cls,), name=f"build-{cls.__name__}") for cls in (Inventory, Pricing)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(errors) == 1
+    error = errors[0]
+    assert set(error.cycle) == {Inventory, Pricing}
+    assert set(error.threads) == {"build-Inventory", "build-Pricing"}
+    assert "Singleton construction deadlock: build-" in str(error)
+    # The thread that was not interrupted finishes building both.
+    assert Inventory.has_instance() and Pricing.has_instance()
+    assert constructions_in_progress() == {}
+
+
+def test_constructions_in_progress_names_the_building_thread():
+    """Test that the thread constructing a class is visible while detection is on."""
+    enable_deadlock_detection()
+    seen = {}
+
+    class Recorder(SingletonBase):
+        def __init__(self):
+            seen.update(constructions_in_progress())
+
+    Thread(target=Recorder, name="builder").start()
+    sleep(0.1)
+
+    assert seen == {Recorder: "builder"}
+    assert constructions_in_progress() == {}
+
+
+def test_detection_still_honours_timeouts():
+    """Test that a tracked wait also gives up after the timeout."""
+    enable_deadlock_detection()
+    holder = hold_lock(SlowService, 0.3)
+    with pytest.raises(SingletonTimeoutError):
+        SlowService.get_instance(init=True, timeout=0.05)
+    holder.join()
+    assert SlowService.get_instance(init=True) is SlowService.get_instance()
@@ -0,0 +1,102 @@
+import asyncio
+import types
+
+from singleton_base import AsyncSingletonBase, SingletonBase
+
+
+class FalsySingleton(SingletonBase):
+    """Singleton whose instances are falsy, e.g. an empty container wrapper."""
+
+    created = 0
+
+    def __init__(self):
+        FalsySingleton.created += 1
+
+    def __len__(self) -> int:
+        return 0
+
+
+def test_instance_slot_is_precomputed():
+    """Test that every class gets its own instance slot at class creation time."""
+    assert "_slot" in vars(FalsySingleton)
+    assert FalsySingleton._slot is not SingletonBase._slot
+
+
+class Rebuilt(SingletonBase, fork_policy="reinit"):
+    def __init__(self, value: int = 0):
+        self.value = value
+
+
+class AsyncRebuilt(AsyncSingletonBase):
+    pass
+
+
+def class_namespace(cls: type) -> dict:
+    return {name: id(value) for name, value in vars(cls).items()}
+
+
+def type_version(cls: type) -> int:
+    """Return the version tag CPython bumps whenever the type's caches are invalidated, or 0 if not exposed."""
+    try:
+        from _testcapi import type_get_version
+    except ImportError:
+        return 0
+    getattr(cls, "__init__")  # looking an attribute up assigns a version tag if the type has none
+    return type_get_version(cls)
+
+
+def test_construction_and_reset_leave_the_class_untouched():
+    """Test that building and resetting an instance never writes to the class, which would drop its type caches."""
+    Rebuilt.reset_instance()
+    before = class_namespace(Rebuilt)
+    version = type_version(Rebuilt)
+
+    Rebuilt(value=1)
+    Rebuilt.reset_instance()
+    Rebuilt.get_instance(init=True, value=2)
+    Rebuilt.reload(value=2)
+
+    assert class_namespace(Rebuilt) == before
+    assert type_version(Rebuilt) == version
+    assert Rebuilt._fork_args == ((), {"value": 2})
+
+
+def test_async_construction_leaves_the_class_untouched():
+    """Test that awaiting the construction of an async singleton never writes to the class."""
+    AsyncRebuilt.reset_instance()
+    before = class_namespace(AsyncRebuilt)
+
+    asyncio.run(AsyncRebuilt.aget_instance(init=True))
+
+    assert class_namespace(AsyncRebuilt) == before
+
+
+def test_same_named_classes_in_different_modules_are_separate():
+    """Test that classes sharing a name, even when one inherits the other, never share an instance."""
+    first = types.new_class("Config", (SingletonBase,), exec_body=lambda ns: ns.update(__module__="app.first"))
+    second = types.new_class("Config", (first,), exec_body=lambda ns: ns.update(__module__="app.second"))
+
+    one = first()
+    assert not second.has_instance()
+    two = second()
+
+    assert one is not two
+    assert first.get_instance() is one
+    assert second.get_instance() is two
+    second.reset_instance()
+    assert first.get_instance() is one
+
+
+def test_falsy_instance_is_not_rebuilt():
+    """Test that an instance evaluating to False is still treated as initialized."""
+    FalsySingleton.reset_instance()
+    FalsySingleton.created = 0
+
+    first = FalsySingleton.get_instance(init=True)
+    second = FalsySingleton.get_instance(init=True)
+    third = FalsySingleton()
+
+    assert not first
+    assert first is second is third
+    assert FalsySingleton.has_instance()
+    assert FalsySingleton.created == 1
@@ -0,0 +1,251 @@
+import gc
+import json
+import os
+import warnings
+from threading import Event, Thread
+
+import pytest
+
+from singleton_base import (
+    AsyncSingletonBase,
+    KeyedSingletonBase,
+    PooledSingletonBase,
+    RefreshingSingletonBase,
+    SingletonBase,
+    preload_and_freeze,
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+class InheritedSingleton(SingletonBase):
+    def __init__(self, value: int = 1):
+        self.value = value
+        self.pid = os.getpid()
+
+
+class ResetSingleton(SingletonBase, fork_policy="reset"):
+    def __init__(self):
+        self.pid = os.getpid()
+
+
+class ReinitSingleton(SingletonBase, fork_policy="reinit"):
+    def __init__(self, value: int):
+        self.value = value
+        self.pid = os.getpid()
+
+
+class Preloaded(SingletonBase, eager=True):
+    def __init__(self):
+        self.table = {i: str(i) for i in range(100)}
+
+
+class FailingReinit(SingletonBase, fork_policy="reinit"):
+    parent_pid = os.getpid()
+
+    def __init__(self):
+        if os.getpid() != self.parent_pid:
+            raise OSError("cannot reconnect in the child")
+
+
+class ResetAfterFailure(SingletonBase, fork_policy="reset"):
+    pass
+
+
+class Pooled(PooledSingletonBase):
+    pass
+
+
+class Keyed(KeyedSingletonBase):
+    def __init__(self, key: str):
+        self.key = key
+
+
+class Refreshing(RefreshingSingletonBase):
+    ttl = 60.0
+
+
+VARIANT_LOCKS = {
+    "pool": (lambda: Pooled._pool.condition, lambda: Pooled.acquire(timeout=2).__enter__() is not None),
+    "keyed": (lambda: Keyed._keyed.lock, lambda: Keyed.get_instance("a", init=True, timeout=2).key == "a"),
+    "refresh": (lambda: Refreshing._refresh.lock, lambda: Refreshing._start_refresh().join(2) is None),
+}
+
+
+def run_in_child(check) -> dict:
+    """Fork, run ``check`` in the child and return the JSON-serializable result it produced."""
+    read_fd, write_fd = os.pipe()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            payload = json.dumps(check()).encode()
+        except BaseException as e:
+            payload = json.dumps({"error": repr(e)}).encode()
+        os.write(write_fd, payload)
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as f:
+        data = f.read()
+    os.waitpid(pid, 0)
+    return json.loads(data)
+
+
+@pytest.fixture(autouse=True)
+def reset_singletons():
+    for cls in (InheritedSingleton, ResetSingleton, ReinitSingleton, Preloaded, FailingReinit, ResetAfterFailure):
+        cls.reset_instance()
+
+
+def test_invalid_fork_policy():
+    """Test that an unknown fork policy is rejected at class creation."""
+    with pytest.raises(ValueError, match="fork_policy must be one of"):
+
+        class Broken(SingletonBase, fork_policy="share"):
+            pass
+
+
+def test_fork_policy_is_inherited():
+    """Test that subclasses keep the fork policy of their parent unless they redeclare it."""
+
+    class Child(ResetSingleton):
+        pass
+
+    assert Child._fork_policy == "reset"
+    assert InheritedSingleton._fork_policy == "inherit"
+
+
+def test_lock_held_at_fork_is_usable_in_child():
+    """Test that a lock held by another thread during fork does not deadlock the child."""
+    InheritedSingleton.reset_instance()
+    acquired, release = Event(), Event()
+
+    def hold_lock():
+        with InheritedSingleton._lock:
+            acquired.set()
+            release.wait()
+
+    holder = Thread(target=hold_lock)
+    holder.start()
+    acquired.wait()
+    try:
+        result = run_in_child(
+            lambda: {
+                "acquired": InheritedSingleton._lock.acquire(timeout=2),
+                "value": InheritedSingleton.get_instance(init=True, value=5).value,
+            }
+        )
+    finally:
+        release.set()
+        holder.join()
+
+    assert result == {"acquired": True, "value": 5}
+
+
+@pytest.mark.parametrize("variant", sorted(VARIANT_LOCKS))
+def test_variant_locks_held_at_fork_are_usable_in_child(variant):
+    """Test that the pool, keyed and refresh locks held by another thread during fork are replaced in the child."""
+    get_lock, use = VARIANT_LOCKS[variant]
+    Refreshing.get_instance(init=True)
+    acquired, release = Event(), Event()
+
+    def hold_lock():
+        with get_lock():
+            acquired.set()
+            release.wait()
+
+    holder = Thread(target=hold_lock)
+    holder.start()
+    acquired.wait()
+    try:
+
+        def check():
+            lock = get_lock()
+            acquired = lock.acquire(timeout=2)
+            if acquired:
+                lock.release()
+            return {"acquired": acquired, "used": use()}
+
+        result = run_in_child(check)
+    finally:
+        release.set()
+        holder.join()
+        Refreshing.reset_instance()
+
+    assert result == {"acquired": True, "used": True}
+
+
+def test_failing_fork_policy_does_not_stop_the_others():
+    """Test that a class whose reinit fails is logged and the classes after it still get their policy."""
+    FailingReinit.get_instance(init=True)
+    ResetAfterFailure.get_instance(init=True)
+
+    result = run_in_child(
+        lambda: {
+            "failing_has_instance": FailingReinit.has_instance(),
+            "reset_has_instance": ResetAfterFailure.has_instance(),
+        }
+    )
+
+    assert result == {"failing_has_instance": False, "reset_has_instance": False}
+
+
+def test_async_singletons_cannot_reinit_after_fork():
+    """Test that fork_policy="reinit" is rejected for async singletons, which a fork handler cannot await."""
+    with pytest.raises(ValueError, match="cannot use fork_policy='reinit'"):
+
+        class Client(AsyncSingletonBase, fork_policy="reinit"):
+            pass
+
+
+def test_keyed_singletons_cannot_reinit_after_fork():
+    """Test that fork_policy="reinit" is rejected for keyed singletons, which have no single instance to rebuild."""
+    with pytest.raises(ValueError, match="cannot use fork_policy='reinit'"):
+
+        class Tenants(KeyedSingletonBase, fork_policy="reinit"):
+            pass
+
+
+def test_pooled_singletons_cannot_reinit_after_fork():
+    """Test that fork_policy="reinit" is rejected for pools, whose instances are only created by acquire()."""
+    with pytest.raises(ValueError, match="cannot use fork_policy='reinit'"):
+
+        class Handles(PooledSingletonBase, fork_policy="reinit"):
+            pass
+
+
+def test_fork_policies_in_child():
+    """Test that inherit keeps, reset drops and reinit rebuilds the instance in the child."""
+    parent_pid = os.getpid()
+    InheritedSingleton.get_instance(init=True, value=3)
+    ResetSingleton.get_instance(init=True)
+    ReinitSingleton.get_instance(init=True, value=9)
+
+    result = run_in_child(
+        lambda: {
+            "inherited_pid": InheritedSingleton.get_instance().pid,
+            "reset_has_instance": ResetSingleton.has_instance(),
+            "reinit_pid": ReinitSingleton.get_instance().pid,
+            "reinit_value": ReinitSingleton.get_instance().value,
+            "child_pid": os.getpid(),
+        }
+    )
+
+    assert result["inherited_pid"] == parent_pid
+    assert result["reset_has_instance"] is False
+    assert result["reinit_pid"] == result["child_pid"] != parent_pid
+    assert result["reinit_value"] == 9
+    assert ReinitSingleton.get_instance().pid == parent_pid
+
+
+def test_preload_and_freeze():
+    """Test that preloading builds eager singletons and freezes the heap for copy-on-write sharing."""
+    try:
+        timings = preload_and_freeze()
+        assert Preloaded in timings
+        assert Preloaded.has_instance()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
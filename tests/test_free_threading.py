@@ -0,0 +1,136 @@
+import sys
+from threading import Barrier, Event, Lock, Thread
+from time import monotonic
+
+import pytest
+
+from singleton_base import KeyedSingletonBase, SingletonBase
+
+THREADS = 16
+FIELDS = 50
+
+
+class Registry(SingletonBase):
+    built = 0
+    built_lock = Lock()
+
+    def __init__(self):
+        with Registry.built_lock:
+            Registry.built += 1
+        # A wide object takes long enough to build that readers racing the publish would see it half-filled.
+        for i in range(FIELDS):
+            setattr(self, f"field_{i}", i)
+        self.ready = True
+
+
+class PerThreadBuffer(SingletonBase, scope="thread"):
+    def __init__(self):
+        self.owner = None
+
+
+class Shard(KeyedSingletonBase):
+    max_instances = None
+    built: dict = {}
+    built_lock = Lock()
+
+    def __init__(self, key: int):
+        with Shard.built_lock:
+            Shard.built[key] = Shard.built.get(key, 0) + 1
+
+
+@pytest.fixture(autouse=True)
+def interleave():
+    """On GIL builds, switch threads as often as possible to approximate free-threaded interleavings."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    Registry.reset_instance()
+    Registry.built = 0
+    PerThreadBuffer.reset_instance(all_scopes=True)
+    Shard.reset_instance()
+    Shard.built = {}
+    yield
+    sys.setswitchinterval(interval)
+
+
+def run_together(target, count: int = THREADS) -> list:
+    """Run ``target`` on ``count`` threads released at the same moment and return their results."""
+    barrier = Barrier(count)
+    results = [None] * count
+
+    def run(index: int):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_racing_first_access_builds_once():
+    """Test that threads racing on a cold singleton all get the one instance built by exactly one of them."""
+    for _ in range(20):
+        Registry.reset_instance()
+        instances = run_together(lambda: Registry.get_instance(init=True))
+        assert len({id(instance) for instance in instances}) == 1
+    assert Registry.built == 20
+
+
+def test_readers_never_see_a_partial_instance():
+    """Test that readers racing resets and rebuilds only ever get fully constructed instances."""
+    stop = Event()
+    failures = []
+
+    def rebuild():
+        while not stop.is_set():
+            Registry.reset_instance()
+            Registry()
+
+    def read():
+        deadline = monotonic() + 0.5
+        while monotonic() < deadline:
+            try:
+                instance = Registry.get_instance()
+            except RuntimeError:
+                continue
+            if not getattr(instance, "ready", False) or getattr(instance, f"field_{FIELDS - 1}", None) != FIELDS - 1:
+                failures.append(instance)
+
+    writer = Thread(target=rebuild)
+    writer.start()
+    try:
+        run_together(read, THREADS - 1)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert failures == []
+    assert Registry.built > 1
+
+
+def test_thread_scope_isolates_racing_threads():
+    """Test that thread-scoped instances built at the same moment are never shared."""
+
+    def claim():
+        buffer = PerThreadBuffer()
+        assert buffer.owner is None
+        buffer.owner = id(buffer)
+        return PerThreadBuffer() is buffer
+
+    assert run_together(claim, 32) == [True] * 32
+
+
+def test_keyed_racing_builds_once_per_key():
+    """Test that threads racing on overlapping keys build each key exactly once."""
+    keys = range(8)
+
+    def fetch_all():
+        return [Shard.get_instance(key, init=True) for key in keys]
+
+    results = run_together(fetch_all)
+
+    assert Shard.built == {key: 1 for key in keys}
+    for key in keys:
+        assert len({id(result[key]) for result in results}) == 1
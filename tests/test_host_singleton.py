@@ -0,0 +1,203 @@
+import os
+import stat
+import subprocess
+import sys
+import threading
+import warnings
+
+import pytest
+
+from singleton_base import HostProxy, HostSingletonBase
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="host scope needs Unix domain sockets")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OWNER_SCRIPT = """
+import sys
+from tests.test_host_singleton import Counter
+Counter.get_instance(init=True, start=100)
+print("owner" if Counter.is_owner() else "client", flush=True)
+sys.stdin.readline()
+"""
+
+
+class Counter(HostSingletonBase):
+    def __init__(self, start: int = 0):
+        self.count = start
+
+    def incr(self) -> int:
+        self.count += 1
+        return self.count
+
+    def value(self) -> int:
+        return self.count
+
+    def fail(self) -> None:
+        raise ValueError("remote failure")
+
+    def lock(self) -> threading.Lock:
+        return threading.Lock()
+
+    def exit_after_logging(self, path: str) -> None:
+        with open(path, "a") as f:
+            f.write("ran\n")
+        os._exit(0)
+
+
+class Exposed(HostSingletonBase):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    Counter.reset_instance()
+    yield
+    Counter.reset_instance()
+
+
+def test_first_process_owns_the_instance():
+    """Test that the first process to construct the singleton owns the real object."""
+    counter = Counter.get_instance(init=True, start=5)
+
+    assert Counter.is_owner()
+    assert not isinstance(counter, HostProxy)
+    assert counter.incr() == 6
+
+    with Counter.batch() as batch:
+        batch.incr()
+        batch.value()
+    assert batch.results == [7, 7]
+
+
+def test_other_process_gets_proxy_and_takes_over_when_owner_exits():
+    """Test remote calls, batching, remote errors and owner election across processes."""
+    owner = subprocess.Popen(
+        [sys.executable, "-c", OWNER_SCRIPT], cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert owner.stdout.readline().strip() == "owner"
+
+        counter = Counter.get_instance(init=True, start=0)
+        assert isinstance(counter, HostProxy)
+        assert not Counter.is_owner()
+        assert counter.incr() == 101
+
+        with Counter.batch() as batch:
+            batch.incr()
+            batch.incr()
+            batch.value()
+        assert batch.results == [102, 103, 103]
+
+        with pytest.raises(ValueError, match="remote failure"):
+            counter.fail()
+    finally:
+        owner.stdin.close()
+        owner.wait(timeout=10)
+
+    assert counter.incr() == 1
+    assert Counter.is_owner()
+    assert Counter.get_instance().value() == 1
+
+
+def test_unpicklable_result_fails_the_call_and_the_owner_keeps_serving():
+    """Test that a result the owner cannot pickle raises TypeError for that call only."""
+    owner = subprocess.Popen(
+        [sys.executable, "-c", OWNER_SCRIPT], cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert owner.stdout.readline().strip() == "owner"
+        counter = Counter.get_instance(init=True)
+
+        with pytest.raises(TypeError, match=r"could not pickle the result by lock\(\)"):
+            counter.lock()
+        with Counter.batch() as batch:
+            batch.incr()
+            batch.value()
+        assert batch.results == [101, 101]
+        assert owner.poll() is None
+    finally:
+        owner.stdin.close()
+        owner.wait(timeout=10)
+
+
+def test_forked_worker_uses_the_parent_as_owner():
+    """Test that a forked child gives up the inherited ownership and talks to the parent."""
+    Counter.get_instance(init=True, start=10)
+    read_fd, write_fd = os.pipe()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            proxied = isinstance(Counter.get_instance(), HostProxy)
+            os.write(write_fd, f"{proxied} {Counter.get_instance().incr()}".encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        result = f.read()
+    os.waitpid(pid, 0)
+
+    assert result == "True 11"
+    assert Counter.get_instance().value() == 11
+
+
+def test_default_authkey_is_random_and_private():
+    """Test that the default key is a per-user random key kept in a file only the user can read."""
+    Counter.get_instance(init=True)
+    directory = os.path.dirname(Counter.host_address)
+    key_path = os.path.join(directory, "authkey")
+
+    assert stat.S_IMODE(os.lstat(directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.lstat(key_path).st_mode) == 0o600
+    with open(key_path, "rb") as f:
+        key = f.read()
+    assert len(key) == 32
+    assert Counter._authkey() == key
+
+
+@pytest.mark.parametrize("mode", [0o755, 0o777])
+def test_socket_directory_other_users_can_enter_is_rejected(tmp_path, monkeypatch, mode):
+    """Test that a socket directory with permissions for other users is refused instead of used."""
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(mode)
+    monkeypatch.setattr(Exposed, "host_address", str(shared / "exposed.sock"))
+
+    with pytest.raises(PermissionError, match="mode 0700"):
+        Exposed.get_instance(init=True)
+    assert not Exposed.has_instance()
+
+
+def test_socket_directory_symlink_is_rejected(tmp_path, monkeypatch):
+    """Test that a symlink in place of the socket directory is refused, even if it points somewhere private."""
+    target = tmp_path / "target"
+    target.mkdir(mode=0o700)
+    (tmp_path / "link").symlink_to(target)
+    monkeypatch.setattr(Exposed, "host_address", str(tmp_path / "link" / "exposed.sock"))
+
+    with pytest.raises(PermissionError):
+        Exposed.get_instance(init=True)
+
+
+def test_call_in_flight_when_the_owner_dies_is_not_resent(tmp_path):
+    """Test that a call whose owner exits mid-call raises instead of running again on a new owner."""
+    log = tmp_path / "calls.log"
+    owner = subprocess.Popen(
+        [sys.executable, "-c", OWNER_SCRIPT], cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert owner.stdout.readline().strip() == "owner"
+        counter = Counter.get_instance(init=True)
+
+        with pytest.raises(ConnectionError, match="Lost the owner"):
+            counter.exit_after_logging(str(log))
+    finally:
+        owner.stdin.close()
+        owner.wait(timeout=10)
+
+    assert log.read_text() == "ran\n"
+    assert counter.incr() == 1
+    assert Counter.is_owner()
@@ -0,0 +1,179 @@
+import asyncio
+import gc
+from threading import Event, Thread
+from time import sleep
+
+import pytest
+
+from singleton_base import (
+    AsyncSingletonBase,
+    KeyedSingletonBase,
+    PooledSingletonBase,
+    RefreshingSingletonBase,
+    SingletonBase,
+)
+
+
+class Settings(SingletonBase, fork_policy="reinit"):
+    def __init__(self, version: int = 0, fail: bool = False, delay: float = 0.0):
+        sleep(delay)
+        if fail:
+            raise ValueError("bad config")
+        self.version = version
+
+
+class Flags(RefreshingSingletonBase):
+    ttl = 60.0
+
+    def __init__(self, version: int = 0):
+        self.version = version
+
+
+class AsyncSettings(AsyncSingletonBase):
+    def __init__(self, version: int = 0):
+        self.version = version
+        self.ready = False
+
+    async def ainit(self) -> None:
+        await asyncio.sleep(0)
+        self.ready = True
+
+
+class Tenant(KeyedSingletonBase):
+    pass
+
+
+class Connection(PooledSingletonBase):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    for cls in (Settings, Flags, AsyncSettings):
+        cls.reset_instance()
+    yield
+    for cls in (Settings, Flags, AsyncSettings):
+        cls.reset_instance()
+
+
+def test_reload_swaps_in_a_new_instance():
+    """Test that reload publishes a new instance while holders of the old one keep it."""
+    old = Settings(version=1)
+    new = Settings.reload(version=2)
+
+    assert new is not old
+    assert Settings.get_instance() is new
+    assert Settings() is new
+    assert (old.version, new.version) == (1, 2)
+    assert Settings._fork_args == ((), {"version": 2})
+
+
+def test_reload_builds_when_there_is_no_instance():
+    """Test that reloading an unbuilt singleton builds it."""
+    assert Settings.reload(version=3).version == 3
+    assert Settings.get_instance().version == 3
+
+
+def test_failed_reload_keeps_the_current_instance():
+    """Test that an exception in ``__init__`` leaves the current instance published."""
+    current = Settings(version=1)
+    with pytest.raises(ValueError, match="bad config"):
+        Settings.reload(version=2, fail=True)
+    assert Settings.get_instance() is current
+
+
+def test_readers_never_see_a_missing_instance():
+    """Test that readers racing reloads always get an instance, never an error."""
+    Settings(version=0)
+    stop = Event()
+    errors = []
+    seen = set()
+
+    def read():
+        while not stop.is_set():
+            try:
+                seen.add(Settings.get_instance().version)
+            except RuntimeError as e:
+                errors.append(e)
+
+    readers = [Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for version in range(1, 6):
+        Settings.reload(version=version, delay=0.01)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert Settings.get_instance().version == 5
+    assert len(seen) > 1
+
+
+def test_on_retired_runs_once_the_old_instance_is_unreferenced():
+    """Test that the retire callback waits for the last reference to the old instance to go away."""
+    retired = []
+    old = Settings(version=1)
+
+    Settings.reload(version=2, on_retired=lambda: retired.append(True))
+    gc.collect()
+    assert retired == []
+
+    del old
+    gc.collect()
+    assert retired == [True]
+
+
+def test_replace_instance_publishes_as_is():
+    """Test that replace_instance publishes an instance built elsewhere without initializing it again."""
+    retired = []
+    Settings(version=1)
+    replacement = object.__new__(Settings)
+    replacement.version = 7
+
+    Settings.replace_instance(replacement, on_retired=lambda: retired.append(True))
+    gc.collect()
+
+    assert Settings.get_instance() is replacement
+    assert retired == [True]
+    assert Settings._fork_args == ((), {"version": 1})
+
+
+def test_reload_restarts_the_ttl_and_refreshes_use_the_new_arguments():
+    """Test that a reloaded refreshing singleton gets a fresh expiry and is refreshed with its new arguments."""
+    Flags(version=1)
+    Flags._refresh.expires_at = 0.0
+
+    Flags.reload(version=2)
+    assert Flags._refresh.expires_at > 0.0
+    assert Flags._refresh.args == ((), {"version": 2})
+
+    Flags.refresh()
+    Flags._refresh.thread.join()
+    assert Flags.get_instance().version == 2
+
+
+def test_areload_awaits_ainit():
+    """Test that async singletons reload with ``areload``, which awaits ``ainit`` before publishing."""
+
+    async def main():
+        old = await AsyncSettings.aget_instance(init=True, version=1)
+        new = await AsyncSettings.areload(version=2)
+        return old, new
+
+    old, new = asyncio.run(main())
+
+    assert new is not old
+    assert new.ready
+    assert AsyncSettings.get_instance() is new
+    with pytest.raises(TypeError, match="areload"):
+        AsyncSettings.reload(version=3)
+
+
+@pytest.mark.parametrize("cls", [Tenant, Connection])
+def test_classes_without_a_single_instance_cannot_swap(cls):
+    """Test that keyed and pooled singletons reject reload and replace_instance."""
+    with pytest.raises(TypeError, match="no single instance"):
+        cls.reload()
+    with pytest.raises(TypeError, match="no single instance"):
+        cls.replace_instance(object())
@@ -0,0 +1,116 @@
+import tracemalloc
+from threading import Thread
+from time import sleep
+
+import pytest
+
+from singleton_base import SingletonBase, deep_sizeof, live_singletons
+
+
+class Config(SingletonBase):
+    def __init__(self, size: int = 10):
+        self.values = [str(i) * 10 for i in range(size)]
+
+
+class Cache(SingletonBase):
+    def __init__(self):
+        self.config = Config.get_instance(init=True)
+        self.entries = {}
+
+
+class Slow(SingletonBase):
+    def __init__(self):
+        sleep(0.02)
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    for cls in (Config, Cache, Slow):
+        cls.reset_instance()
+    yield
+    for cls in (Config, Cache, Slow):
+        cls.reset_instance()
+
+
+def info_for(cls, **kwargs):
+    return next((info for info in live_singletons(**kwargs) if info.cls is cls), None)
+
+
+def test_lists_only_live_instances():
+    """Test that classes without an instance are not reported."""
+    assert info_for(Config) is None
+    Config()
+    assert info_for(Config).name == f"{__name__}.Config"
+    Config.reset_instance()
+    assert info_for(Config) is None
+
+
+def test_deep_size_grows_with_payload():
+    """Test that the deep size counts what the instance holds."""
+    Config(size=10)
+    small = info_for(Config).deep_size
+    Config.reset_instance()
+    Config(size=10_000)
+    large = info_for(Config).deep_size
+
+    assert large > small + 10_000 * 50
+
+
+def test_other_singletons_are_not_counted_twice():
+    """Test that a singleton referenced by another one is only counted under its own entry."""
+    Config(size=10_000)
+    cache = Cache()
+
+    assert info_for(Cache).deep_size < info_for(Config).deep_size
+    assert info_for(Cache).deep_size < deep_sizeof(cache)
+
+
+def test_largest_first():
+    """Test that entries are sorted by deep size, largest first."""
+    Config(size=10_000)
+    Slow()
+    sizes = [info.deep_size for info in live_singletons()]
+
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def test_records_build_time_age_and_thread():
+    """Test that construction time, age and the building thread are reported."""
+    thread = Thread(target=Slow, name="builder")
+    thread.start()
+    thread.join()
+    sleep(0.01)
+    info = info_for(Slow)
+
+    assert info.construction_seconds >= 0.02
+    assert info.age >= 0.01
+    assert info.built_by == "builder"
+    assert set(info.as_dict()) == {
+        "name",
+        "deep_size",
+        "allocated",
+        "built_at",
+        "age",
+        "construction_seconds",
+        "built_by",
+    }
+
+
+def test_allocated_needs_tracemalloc():
+    """Test that allocations during construction are only reported while tracemalloc is tracing."""
+    Config(size=10_000)
+    assert info_for(Config).allocated is None
+    Config.reset_instance()
+
+    tracemalloc.start()
+    try:
+        Config(size=10_000)
+    finally:
+        tracemalloc.stop()
+    assert info_for(Config).allocated > 10_000 * 50
+
+
+def test_deep_size_can_be_skipped():
+    """Test that ``deep_size=False`` lists instances without walking them."""
+    Config()
+    assert info_for(Config, deep_size=False).deep_size is None
@@ -0,0 +1,152 @@
+from threading import Thread
+from time import perf_counter, sleep
+
+import pytest
+
+from singleton_base import KeyedSingletonBase
+
+BUILD_DELAY = 0.3
+
+
+class TenantClient(KeyedSingletonBase):
+    max_instances = 2
+    closed: list[str] = []
+
+    def __init__(self, tenant: str, region: str = "us"):
+        self.tenant = tenant
+        self.region = region
+
+    @classmethod
+    def on_evict(cls, key, instance):
+        cls.closed.append(key)
+
+
+class SlowClient(KeyedSingletonBase):
+    max_instances = None
+    built: list[str] = []
+
+    def __init__(self, key: str):
+        sleep(BUILD_DELAY)
+        SlowClient.built.append(key)
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    for cls in (TenantClient, SlowClient):
+        cls.reset_instance()
+        cls._keyed.hits = cls._keyed.misses = cls._keyed.evictions = 0
+    TenantClient.closed.clear()
+    SlowClient.built.clear()
+
+
+def test_one_instance_per_key():
+    """Test that each key gets its own instance, built with the key and kwargs."""
+    acme = TenantClient.get_instance("acme", init=True, region="eu")
+    globex = TenantClient.get_instance(key="globex", init=True)
+
+    assert acme is not globex
+    assert acme.tenant == "acme" and acme.region == "eu"
+    assert TenantClient.get_instance("acme") is acme
+    assert TenantClient.has_instance("acme")
+    assert not TenantClient.has_instance("initech")
+
+
+def test_uninitialized_key_and_direct_call():
+    """Test that a missing key raises without init and that direct construction is rejected."""
+    with pytest.raises(RuntimeError, match="Instance of TenantClient for key 'acme' is not initialized yet"):
+        TenantClient.get_instance("acme")
+    with pytest.raises(RuntimeError, match="is keyed"):
+        TenantClient("acme")
+
+
+def test_lru_eviction_calls_on_evict():
+    """Test that the least recently used instance is evicted once max_instances is exceeded."""
+    TenantClient.get_instance("a", init=True)
+    TenantClient.get_instance("b", init=True)
+    TenantClient.get_instance("a")
+    TenantClient.get_instance("c", init=True)
+
+    assert TenantClient.keys() == ["a", "c"]
+    assert TenantClient.closed == ["b"]
+    assert TenantClient.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "max_instances": 2}
+
+
+def test_reset_instance_by_key():
+    """Test resetting a single key and then every key."""
+    TenantClient.get_instance("a", init=True)
+    TenantClient.get_instance("b", init=True)
+
+    TenantClient.reset_instance("a")
+    assert TenantClient.keys() == ["b"]
+
+    TenantClient.reset_instance()
+    assert not TenantClient.has_instance()
+    assert TenantClient.closed == []
+
+
+def test_different_keys_build_in_parallel_and_same_key_once():
+    """Test per-key construction locking."""
+    threads = [Thread(target=SlowClient.get_instance, args=(key,), kwargs={"init": True}) for key in "xyzxyz"]
+
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    assert sorted(SlowClient.built) == ["x", "y", "z"]
+    assert elapsed < BUILD_DELAY * 1.8, f"Expected parallel construction, took {elapsed:.2f}s"
+    assert SlowClient.stats()["misses"] == 3
+    assert SlowClient.stats()["hits"] == 3
+
+
+class _WatchedLocks(dict):
+    """Key lock map that records when a key lock is dropped."""
+
+    dropped = False
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dropped = True
+
+
+class _RacingLock:
+    """Map lock that runs ``race`` on another thread the first time it is taken after a key lock was dropped."""
+
+    def __init__(self, lock, key_locks: _WatchedLocks, race):
+        self.lock = lock
+        self.key_locks = key_locks
+        self.race = race
+
+    def __enter__(self):
+        if self.key_locks.dropped and self.race is not None:
+            race, self.race = self.race, None
+            thread = Thread(target=race)
+            thread.start()
+            thread.join(5)
+        return self.lock.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.lock.__exit__(*exc_info)
+
+
+def test_no_second_build_between_dropping_the_key_lock_and_publishing():
+    """Test that a caller arriving right after the key lock is dropped finds the published instance."""
+
+    class Counted(KeyedSingletonBase):
+        built = 0
+
+        def __init__(self, key: str):
+            Counted.built += 1
+
+    state = Counted._keyed
+    raced = []
+    state.key_locks = _WatchedLocks()
+    state.lock = _RacingLock(state.lock, state.key_locks, lambda: raced.append(Counted.get_instance("k", init=True)))
+
+    first = Counted.get_instance("k", init=True)
+    assert Counted.has_instance("k")
+
+    assert Counted.built == 1
+    assert raced == [first]
@@ -0,0 +1,99 @@
+from threading import Thread
+from time import sleep
+
+from singleton_base import RefreshingSingletonBase, SingletonBase, SingletonProxy
+
+
+class ExpensiveSingleton(SingletonBase):
+    constructed = 0
+
+    def __init__(self, value: int):
+        ExpensiveSingleton.constructed += 1
+        self.value = value
+
+    def double(self) -> int:
+        return self.value * 2
+
+
+class Rates(RefreshingSingletonBase):
+    ttl = 0.05
+    max_staleness = 0.05
+    generation = 0
+
+    def __init__(self, region: str):
+        Rates.generation += 1
+        self.region = region
+        self.generation = Rates.generation
+
+
+def setup_function():
+    ExpensiveSingleton.reset_instance()
+    ExpensiveSingleton.constructed = 0
+    Rates.reset_instance()
+    Rates.generation = 0
+
+
+def test_lazy_defers_construction():
+    """Test that creating the proxy does not build the singleton."""
+    proxy = ExpensiveSingleton.lazy(value=21)
+
+    assert isinstance(proxy, SingletonProxy)
+    assert not ExpensiveSingleton.has_instance()
+    assert ExpensiveSingleton.constructed == 0
+    assert "not constructed" in repr(proxy)
+
+
+def test_lazy_builds_on_first_use():
+    """Test that the first attribute access builds the instance through get_instance."""
+    proxy = ExpensiveSingleton.lazy(value=21)
+
+    assert proxy.double() == 42
+    assert proxy.value == 21
+    assert ExpensiveSingleton.get_instance().value == 21
+    assert ExpensiveSingleton.constructed == 1
+
+
+def test_lazy_uses_existing_instance():
+    """Test that a proxy resolves to an instance built elsewhere instead of using its own kwargs."""
+    proxy = ExpensiveSingleton.lazy(value=1)
+    ExpensiveSingleton.get_instance(init=True, value=5)
+
+    assert proxy.value == 5
+    assert ExpensiveSingleton.constructed == 1
+
+
+def test_lazy_forwards_setattr_and_follows_reset():
+    """Test that assignment is forwarded and a reset singleton is rebuilt on next use."""
+    proxy = ExpensiveSingleton.lazy(value=3)
+    proxy.value = 10
+    assert ExpensiveSingleton.get_instance().value == 10
+
+    ExpensiveSingleton.reset_instance()
+    assert proxy.value == 3
+    assert ExpensiveSingleton.constructed == 2
+
+
+def test_lazy_concurrent_first_use():
+    """Test that concurrent first use from many threads builds a single instance."""
+    proxy = ExpensiveSingleton.lazy(value=7)
+    results = []
+
+    threads = [Thread(target=lambda: results.append(proxy.double())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [14] * 20
+    assert ExpensiveSingleton.constructed == 1
+
+
+def test_lazy_proxy_of_a_refreshing_singleton_refreshes():
+    """Test that a proxy goes through get_instance, so an expired refreshing singleton is rebuilt."""
+    proxy = Rates.lazy(region="eu")
+    assert proxy.generation == 1
+
+    sleep(0.2)
+
+    assert proxy.generation == 2
+    assert proxy.region == "eu"
@@ -0,0 +1,101 @@
+import mmap
+import sys
+from array import array
+
+import pytest
+
+from singleton_base import MappedSingletonBase, MappedStrings, write_mapped_file
+
+
+class Vocabulary(MappedSingletonBase):
+    published: list = []
+
+    @classmethod
+    def _publish(cls, instance, args=None, kwargs=None) -> None:
+        cls.published.append(instance)
+        super()._publish(instance, args, kwargs)
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = tmp_path / "vocab.map"
+    write_mapped_file(
+        path,
+        {"ids": array("q", [10, 20, 30]), "weights": array("d", [0.5, 1.5]), "raw": b"\x00\x01", "tokens": ["a", "bé"]},
+        meta={"source": "v1"},
+    )
+    Vocabulary.reset_instance()
+    Vocabulary.data_path = str(path)
+    yield path
+    Vocabulary.reset_instance()
+    Vocabulary.data_path = None
+
+
+def test_sections_read_back_without_copying(table_path):
+    """Test that sections come back with their formats, straight from the mapping."""
+    table = Vocabulary.get_instance(init=True)
+
+    assert table.meta == {"source": "v1"}
+    assert table.sections() == ["ids", "weights", "raw", "tokens"]
+    ids = table.section("ids")
+    assert ids.format == "q" and ids.tolist() == [10, 20, 30]
+    assert ids.readonly
+    assert isinstance(ids.obj, mmap.mmap)
+    assert table.section("weights").tolist() == [0.5, 1.5]
+    assert bytes(table.section("raw")) == b"\x00\x01"
+    assert table.section("ids") is ids
+
+
+def test_string_sections(table_path):
+    """Test that string sequences are decoded on access with sequence semantics."""
+    tokens = Vocabulary.get_instance(init=True).section("tokens")
+
+    assert isinstance(tokens, MappedStrings)
+    assert len(tokens) == 2
+    assert list(tokens) == ["a", "bé"]
+    assert tokens[-1] == "bé"
+    assert tokens[0:1] == ["a"]
+    assert "bé" in tokens
+    with pytest.raises(IndexError):
+        tokens[2]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="__buffer__ needs Python 3.12+")
+def test_buffer_protocol(table_path):
+    """Test that the instance itself can be viewed as a buffer."""
+    table = Vocabulary.get_instance(init=True)
+    assert memoryview(table).nbytes == table_path.stat().st_size
+
+
+def test_invalid_inputs(tmp_path):
+    """Test that unmappable data, foreign files and a missing path are rejected."""
+    with pytest.raises(ValueError, match="Unsupported buffer format"):
+        write_mapped_file(tmp_path / "bad.map", {"chars": memoryview(b"ab").cast("c")})
+    assert list(tmp_path.iterdir()) == []
+
+    foreign = tmp_path / "foreign.map"
+    foreign.write_bytes(b"definitely not a table")
+    with pytest.raises(ValueError, match="not written by write_mapped_file"):
+        Vocabulary(path=str(foreign))
+    with pytest.raises(ValueError, match="needs a `data_path`"):
+        Vocabulary.get_instance(init=True)
+
+
+def test_remap_after_replacement(table_path):
+    """Test that a replaced file is mapped again while holders of the old mapping keep the old data."""
+    old = Vocabulary.get_instance(init=True)
+    old_ids = old.section("ids")
+    assert not old.is_stale()
+    assert not Vocabulary.remap()
+
+    write_mapped_file(table_path, {"ids": array("q", [7])}, meta={"source": "v2"})
+
+    assert old.is_stale()
+    assert Vocabulary.remap()
+    new = Vocabulary.get_instance()
+    assert new is not old
+    assert Vocabulary.published[-1] is new
+    assert new.meta == {"source": "v2"}
+    assert new.section("ids").tolist() == [7]
+    assert old_ids.tolist() == [10, 20, 30]
+    assert not Vocabulary.remap()
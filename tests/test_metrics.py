@@ -0,0 +1,169 @@
+import asyncio
+from threading import Event, Thread
+from time import sleep
+
+import pytest
+
+from singleton_base import (
+    AsyncSingletonBase,
+    RefreshingSingletonBase,
+    SingletonBase,
+    add_metrics_hook,
+    disable_metrics,
+    enable_metrics,
+    metrics_snapshot,
+    remove_metrics_hook,
+)
+from singleton_base.singleton_scope import ProcessSlot
+
+BUILD_TIME = 0.05
+
+
+class MeteredService(SingletonBase):
+    def __init__(self, delay: float = 0.0):
+        sleep(delay)
+
+
+class UnmeteredService(SingletonBase):
+    pass
+
+
+class MeteredClient(AsyncSingletonBase):
+    async def ainit(self) -> None:
+        await asyncio.sleep(BUILD_TIME)
+
+
+class MeteredFlags(RefreshingSingletonBase):
+    ttl = 0.01
+
+    def __init__(self):
+        sleep(BUILD_TIME)
+
+
+KEY = f"{MeteredService.__module__}.{MeteredService.__qualname__}"
+
+
+@pytest.fixture(autouse=True)
+def metered():
+    MeteredService.reset_instance()
+    enable_metrics(MeteredService)
+    yield
+    disable_metrics(MeteredService)
+    MeteredService.reset_instance()
+
+
+def test_hits_and_constructions():
+    """Test that the first access counts as a construction and later reads as hits."""
+    MeteredService.get_instance(init=True)
+    MeteredService.get_instance()
+    MeteredService()
+    assert MeteredService.has_instance()
+
+    stats = metrics_snapshot(MeteredService)[KEY]
+    assert stats["constructions"] == 1
+    assert stats["hits"] == 3
+
+
+def test_construction_time_is_recorded():
+    """Test that the construction time covers the time spent in __init__."""
+    MeteredService.get_instance(init=True, delay=BUILD_TIME)
+
+    stats = metrics_snapshot(MeteredService)[KEY]
+    assert stats["construction_seconds_total"] >= BUILD_TIME
+    assert stats["construction_seconds_max"] == stats["construction_seconds_total"]
+
+
+def test_lock_wait_is_recorded():
+    """Test that waiting on another thread's construction is counted as a lock wait."""
+    started = Event()
+
+    def build():
+        with MeteredService._lock:
+            started.set()
+            sleep(BUILD_TIME)
+            MeteredService()
+
+    builder = Thread(target=build)
+    builder.start()
+    started.wait()
+    MeteredService()
+    builder.join()
+
+    stats = metrics_snapshot(MeteredService)[KEY]
+    assert stats["lock_waits"] == 2
+    assert stats["lock_wait_seconds_max"] >= BUILD_TIME / 2
+    assert stats["constructions"] == 1
+
+
+def test_resets_are_recorded():
+    """Test that reset_instance() is counted for plain and all-scope resets."""
+    MeteredService()
+    MeteredService.reset_instance()
+    MeteredService.reset_instance(all_scopes=True)
+
+    assert metrics_snapshot(MeteredService)[KEY]["resets"] == 2
+
+
+def test_hooks_receive_events():
+    """Test that hooks get construct, lock_wait and reset events and that failing hooks are ignored."""
+    events = []
+
+    def record(event, cls, seconds):
+        events.append((event, cls))
+
+    def broken(event, cls, seconds):
+        raise ValueError("hook failure")
+
+    add_metrics_hook(record)
+    add_metrics_hook(broken)
+    try:
+        MeteredService()
+        MeteredService.reset_instance()
+    finally:
+        remove_metrics_hook(record)
+        remove_metrics_hook(broken)
+
+    assert ("construct", MeteredService) in events
+    assert ("lock_wait", MeteredService) in events
+    assert ("reset", MeteredService) in events
+
+
+def test_only_enabled_classes_are_reported():
+    """Test that classes without metrics are left untouched and absent from the snapshot."""
+    UnmeteredService()
+
+    assert type(UnmeteredService._slot) is ProcessSlot
+    assert metrics_snapshot(UnmeteredService) == {}
+    assert KEY in metrics_snapshot()
+
+
+def test_disable_restores_original_slot_and_lock():
+    """Test that disabling metrics puts back the plain slot and lock and keeps the instance."""
+    instance = MeteredService()
+    disable_metrics(MeteredService)
+
+    assert type(MeteredService._slot) is ProcessSlot
+    assert type(MeteredService._lock) is type(UnmeteredService._lock)
+    assert MeteredService.get_instance() is instance
+    assert metrics_snapshot(MeteredService) == {}
+
+
+def test_construction_time_of_async_and_refreshed_builds():
+    """Test that builds that publish under the lock only briefly still record the time spent building."""
+    enable_metrics(MeteredClient, MeteredFlags)
+    try:
+        asyncio.run(MeteredClient.aget_instance(init=True))
+        MeteredFlags.get_instance(init=True)
+        MeteredFlags._start_refresh(force=True).join(5)
+
+        stats = metrics_snapshot(MeteredClient, MeteredFlags)
+        client = stats[f"{MeteredClient.__module__}.{MeteredClient.__qualname__}"]
+        flags = stats[f"{MeteredFlags.__module__}.{MeteredFlags.__qualname__}"]
+        assert client["constructions"] == 1
+        assert client["construction_seconds_total"] >= BUILD_TIME
+        assert flags["constructions"] == 2
+        assert flags["construction_seconds_total"] >= 2 * BUILD_TIME
+    finally:
+        disable_metrics(MeteredClient, MeteredFlags)
+        MeteredClient.reset_instance()
+        MeteredFlags.reset_instance()
@@ -0,0 +1,69 @@
+from threading import Thread
+from time import perf_counter, sleep
+
+from singleton_base import SingletonBase
+
+INIT_DELAY = 0.5
+
+
+class SlowSingletonA(SingletonBase):
+    def __init__(self):
+        sleep(INIT_DELAY)
+        self.name = "A"
+
+
+class SlowSingletonB(SingletonBase):
+    def __init__(self):
+        sleep(INIT_DELAY)
+        self.name = "B"
+
+
+class Dependency(SingletonBase):
+    def __init__(self, value: int):
+        self.value = value
+
+
+class Dependent(SingletonBase):
+    def __init__(self):
+        self.dependency = Dependency.get_instance(init=True, value=7)
+        self.again = Dependent.has_instance()
+
+
+def test_each_class_has_its_own_lock():
+    """Test that subclasses do not share a lock with each other or with the base."""
+    assert SlowSingletonA._lock is not SlowSingletonB._lock
+    assert SlowSingletonA._lock is not SingletonBase._lock
+
+
+def test_unrelated_singletons_initialize_in_parallel():
+    """Test that a slow constructor does not block construction of an unrelated singleton."""
+    SlowSingletonA.reset_instance()
+    SlowSingletonB.reset_instance()
+
+    threads = [
+        Thread(target=SlowSingletonA.get_instance, kwargs={"init": True}),
+        Thread(target=SlowSingletonB.get_instance, kwargs={"init": True}),
+    ]
+
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    assert SlowSingletonA.get_instance().name == "A"
+    assert SlowSingletonB.get_instance().name == "B"
+    assert elapsed < INIT_DELAY * 1.8, f"Expected parallel construction, took {elapsed:.2f}s"
+
+
+def test_reentrant_dependency_init():
+    """Test that a constructor can build its dependencies and query its own class."""
+    Dependency.reset_instance()
+    Dependent.reset_instance()
+
+    instance = Dependent.get_instance(init=True)
+
+    assert instance.dependency is Dependency.get_instance()
+    assert instance.dependency.value == 7
+    assert instance.again is False
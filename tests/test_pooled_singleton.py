@@ -0,0 +1,196 @@
+from threading import Barrier, Event, Thread
+from time import sleep
+
+import pytest
+
+from singleton_base import PooledSingletonBase, SingletonTimeoutError
+
+
+class TemplateEngine(PooledSingletonBase):
+    max_size = 2
+    built = 0
+    discarded: list = []
+
+    def __init__(self, dialect: str = "jinja"):
+        type(self).built += 1
+        self.dialect = dialect
+        self.broken = False
+
+    @classmethod
+    def is_healthy(cls, instance) -> bool:
+        return not instance.broken
+
+    @classmethod
+    def on_discard(cls, instance) -> None:
+        cls.discarded.append(instance)
+
+
+class IdleHandle(PooledSingletonBase):
+    max_size = 4
+    min_size = 1
+    max_idle = 0.05
+
+
+@pytest.fixture
+def pool() -> type[TemplateEngine]:
+    """A fresh pool with its own counters for every test."""
+
+    class Pool(TemplateEngine):
+        built = 0
+        discarded: list = []
+
+    return Pool
+
+
+def test_direct_use_is_rejected(pool):
+    """Test that pooled classes can only be used through acquire()."""
+    with pytest.raises(RuntimeError, match="is pooled"):
+        pool()
+    with pytest.raises(RuntimeError, match="is pooled"):
+        pool.get_instance(init=True)
+
+
+def test_invalid_max_size():
+    """Test that a pool must be able to hold at least one instance."""
+    with pytest.raises(ValueError, match="max_size must be at least 1"):
+
+        class Broken(PooledSingletonBase):
+            max_size = 0
+
+
+def test_instances_are_created_lazily_and_reused(pool):
+    """Test that instances are only created when none is idle and are then reused."""
+    assert not pool.has_instance()
+    with pool.acquire(dialect="mako") as first:
+        assert first.dialect == "mako"
+        with pool.acquire() as second:
+            assert second is not first
+    with pool.acquire() as again:
+        assert again is first or again is second
+
+    assert pool.built == 2
+    assert pool.has_instance()
+    assert pool.stats()["idle"] == 2
+
+
+def test_acquire_waits_and_times_out_when_exhausted(pool):
+    """Test that callers wait for a returned instance and give up after the timeout."""
+    with pool.acquire(), pool.acquire():
+        with pytest.raises(SingletonTimeoutError):
+            with pool.acquire(timeout=0.05):
+                pass
+
+    holding = Event()
+
+    def hold():
+        with pool.acquire():
+            holding.set()
+            sleep(0.1)
+
+    holders = [Thread(target=hold) for _ in range(2)]
+    for thread in holders:
+        thread.start()
+    holding.wait()
+    sleep(0.01)
+    with pool.acquire(timeout=2):
+        pass
+    for thread in holders:
+        thread.join()
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 1
+    assert stats["wait_seconds_max"] >= 0.05
+    assert pool.built == 2
+
+
+def test_unhealthy_instances_are_discarded(pool):
+    """Test that an instance failing the health check is dropped and replaced on the next acquire."""
+    with pool.acquire() as engine:
+        engine.broken = True
+    assert pool.discarded == [engine]
+    assert not pool.has_instance()
+
+    with pool.acquire() as replacement:
+        assert replacement is not engine
+    assert pool.stats()["discarded"] == 1
+
+
+def test_instances_never_shared_between_threads(pool):
+    """Test that concurrent callers never hold the same instance."""
+    barrier = Barrier(8)
+    held = set()
+    overlaps = []
+
+    def use():
+        barrier.wait()
+        for _ in range(20):
+            with pool.acquire() as engine:
+                if id(engine) in held:
+                    overlaps.append(engine)
+                held.add(id(engine))
+                sleep(0.001)
+                held.discard(id(engine))
+
+    threads = [Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert overlaps == []
+    assert pool.built == 2
+    assert stats["acquisitions"] == 160
+    assert stats["peak_in_use"] == 2
+    assert 0 < stats["mean_utilization"] <= 1
+
+
+def test_idle_instances_shrink_to_min_size():
+    """Test that instances idle past max_idle are discarded, keeping min_size."""
+    with IdleHandle.acquire(), IdleHandle.acquire(), IdleHandle.acquire():
+        pass
+    assert IdleHandle.stats()["size"] == 3
+
+    sleep(0.1)
+    assert IdleHandle.shrink() == 2
+    assert IdleHandle.stats()["size"] == 1
+
+
+def test_failing_on_discard_does_not_leak_capacity():
+    """Test that an on_discard error while checking out gives the reserved slot back to the pool."""
+
+    class Flaky(PooledSingletonBase):
+        max_size = 1
+        max_idle = 0.05
+        failures = 1
+
+        @classmethod
+        def on_discard(cls, instance) -> None:
+            if cls.failures:
+                cls.failures -= 1
+                raise OSError("close failed")
+
+    with Flaky.acquire():
+        pass
+    sleep(0.1)
+
+    with pytest.raises(OSError, match="close failed"):
+        with Flaky.acquire():
+            pass
+    assert Flaky.stats()["in_use"] == 0
+
+    with Flaky.acquire(timeout=0.5) as instance:
+        assert isinstance(instance, Flaky)
+
+
+def test_reset_discards_idle_and_returned_instances(pool):
+    """Test that reset drops idle instances at once and checked out ones when they come back."""
+    with pool.acquire() as held:
+        with pool.acquire() as idle:
+            pass
+        pool.reset_instance()
+        assert pool.discarded == [idle]
+    assert pool.discarded == [idle, held]
+    assert not pool.has_instance()
+    assert pool.stats()["utilization"] == 0
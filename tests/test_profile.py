@@ -0,0 +1,141 @@
+import asyncio
+import json
+from time import sleep
+
+import pytest
+
+from singleton_base import (
+    AsyncSingletonBase,
+    KeyedSingletonBase,
+    SingletonBase,
+    record_constructions,
+    start_recording,
+    stop_recording,
+)
+
+PREFIX = __name__
+
+
+class Settings(SingletonBase):
+    def __init__(self):
+        sleep(0.02)
+
+
+class Database(SingletonBase):
+    def __init__(self):
+        Settings.get_instance(init=True)
+        sleep(0.03)
+
+
+class App(SingletonBase):
+    def __init__(self):
+        Database()
+
+
+class Broken(SingletonBase):
+    def __init__(self):
+        raise ValueError("no config")
+
+
+class Tenant(KeyedSingletonBase):
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Session(AsyncSingletonBase):
+    async def ainit(self) -> None:
+        Settings.get_instance(init=True)
+
+
+@pytest.fixture(autouse=True)
+def reset_all():
+    for cls in (Settings, Database, App, Broken, Tenant, Session):
+        cls.reset_instance()
+
+
+def test_nested_constructions_form_a_tree():
+    """Test that singletons built by another singleton's constructor are nested under it."""
+    with record_constructions() as profile:
+        App.get_instance(init=True)
+        App.get_instance()
+
+    [app] = profile.roots
+    [database] = app.children
+    [settings] = database.children
+    assert [app.name, database.name, settings.name] == [f"{PREFIX}.App", f"{PREFIX}.Database", f"{PREFIX}.Settings"]
+    assert settings.inclusive >= 0.02
+    assert database.inclusive >= database.exclusive >= 0.03
+    assert database.exclusive == pytest.approx(database.inclusive - settings.inclusive)
+    assert app.inclusive >= database.inclusive
+    assert app.start <= database.start <= settings.start
+
+
+def test_call_site_points_at_the_trigger():
+    """Test that each record names the code that triggered it, outside the package."""
+    with record_constructions() as profile:
+        App()
+
+    [app] = profile.roots
+    settings = app.children[0].children[0]
+    assert app.call_site.startswith(__file__) and app.call_site.endswith("in test_call_site_points_at_the_trigger")
+    assert settings.call_site.endswith("in __init__")
+    assert app.thread == "MainThread"
+
+
+def test_failed_construction_is_recorded():
+    """Test that a constructor that raises is kept in the profile with its exception type."""
+    with record_constructions() as profile:
+        with pytest.raises(ValueError):
+            Broken()
+
+    assert profile.roots[0].error == "ValueError"
+    assert "FAILED (ValueError)" in profile.report()
+
+
+def test_keyed_and_async_constructions_are_recorded():
+    """Test that keyed instances are labelled with their key and async ainit nests its constructions."""
+
+    async def connect():
+        await Session.aget_instance(init=True)
+
+    with record_constructions() as profile:
+        Tenant.get_instance("acme", init=True)
+        asyncio.run(connect())
+
+    tenant, session = profile.roots
+    assert tenant.name == f"{PREFIX}.Tenant['acme']"
+    assert session.name == f"{PREFIX}.Session"
+    assert session.call_site.endswith("in connect")
+    assert [child.name for child in session.children] == [f"{PREFIX}.Settings"]
+
+
+def test_reports():
+    """Test the text, JSON and folded renderings of the same profile."""
+    with record_constructions() as profile:
+        App()
+
+    report = profile.report().splitlines()
+    assert report[0].startswith("Singleton construction profile: 3 constructions")
+    assert f"  {PREFIX}.App  [MainThread, {__file__}:" in report[2]
+    assert f"    {PREFIX}.Settings" in report[4]
+
+    data = json.loads(profile.to_json())
+    assert data["total"] == pytest.approx(profile.roots[0].inclusive)
+    assert data["constructions"][0]["children"][0]["name"] == f"{PREFIX}.Database"
+
+    folded = profile.folded().splitlines()
+    assert folded[2].startswith(f"{PREFIX}.App;{PREFIX}.Database;{PREFIX}.Settings ")
+    assert int(folded[2].split()[-1]) >= 20_000
+
+
+def test_recording_is_exclusive_and_stops():
+    """Test that recordings cannot overlap and that nothing is recorded after stopping."""
+    profile = start_recording()
+    with pytest.raises(RuntimeError, match="already running"):
+        start_recording()
+    assert stop_recording() is profile
+    with pytest.raises(RuntimeError, match="No singleton construction recording"):
+        stop_recording()
+
+    Settings()
+    assert profile.roots == []
@@ -0,0 +1,260 @@
+import pytest
+
+from singleton_base import (
+    KeyedSingletonBase,
+    RefreshingSingletonBase,
+    SingletonBase,
+    override_instance,
+    reset_all,
+)
+
+pytest_plugins = ["pytester"]
+
+
+class Service(SingletonBase):
+    def __init__(self):
+        self.name = "real"
+
+
+class PerThread(SingletonBase, scope="thread"):
+    pass
+
+
+class Flags(RefreshingSingletonBase):
+    ttl = 0.001
+
+
+class Tenant(KeyedSingletonBase):
+    def __init__(self, key: str):
+        self.key = key
+
+
+@pytest.fixture
+def plugin_installed(request):
+    if not request.config.pluginmanager.has_plugin("singleton_base"):
+        pytest.skip("singleton-base is not installed, so its pytest plugin is not registered")
+
+
+def test_override_instance_restores_previous():
+    """Test that the override is visible inside the block and the previous instance is back afterwards."""
+    Service.reset_instance()
+    real = Service()
+    fake = object()
+
+    with override_instance(Service, fake) as obj:
+        assert obj is fake
+        assert Service.get_instance() is fake
+        assert Service() is fake
+    assert Service.get_instance() is real
+
+
+def test_override_instance_without_previous_instance():
+    """Test that overriding an unbuilt singleton leaves it unbuilt afterwards, and skips construction."""
+    Service.reset_instance()
+    with override_instance(Service, "fake"):
+        assert Service.get_instance() == "fake"
+    assert not Service.has_instance()
+
+
+def test_override_instance_is_not_refreshed():
+    """Test that a refreshing singleton keeps the override past its TTL."""
+    Flags.reset_instance()
+    Flags.get_instance(init=True)
+    fake = object()
+    with override_instance(Flags, fake):
+        Flags.get_instance()
+        assert Flags.get_instance() is fake
+    Flags.reset_instance()
+
+
+def test_override_instance_rejects_keyed():
+    """Test that classes without a single instance cannot be overridden."""
+    with pytest.raises(TypeError, match="no single instance"):
+        with override_instance(Tenant, object()):
+            pass
+
+
+def test_reset_all_covers_scopes_and_keys():
+    """Test that reset_all drops instances of every kind, except excluded classes."""
+    Service.get_instance(init=True)
+    PerThread()
+    Tenant.get_instance("a", init=True)
+
+    reset_all(exclude=frozenset({Service}))
+
+    assert Service.has_instance()
+    assert not PerThread.has_instance()
+    assert not Tenant.has_instance()
+    Service.reset_instance()
+
+
+CONFTEST = """
+import pytest
+
+from singleton_base import SingletonBase
+
+
+class Model(SingletonBase):
+    built = 0
+
+    def __init__(self, size=3):
+        Model.built += 1
+        self.weights = list(range(size))
+
+
+class Cache(SingletonBase):
+    built = 0
+
+    def __init__(self):
+        Cache.built += 1
+        self.entries = {}
+
+
+@pytest.fixture(scope="session")
+def model(frozen_singleton):
+    return frozen_singleton(Model, size=5)
+"""
+
+
+def test_autoreset_resets_between_tests(pytester, plugin_installed):
+    """Test that every singleton is rebuilt in each test when autoreset is enabled."""
+    pytester.makeconftest(CONFTEST)
+    pytester.makeini("[pytest]\nsingleton_autoreset = true\n")
+    source = """
+        from conftest import Cache
+
+        def test_one():
+            Cache().entries["a"] = 1
+
+        def test_two():
+            assert Cache().entries == {}
+            assert Cache.built == 2
+        """
+    pytester.makepyfile(source)
+    pytester.runpytest().assert_outcomes(passed=2)
+
+
+def test_without_autoreset_state_is_kept_unless_requested(pytester, plugin_installed):
+    """Test that singletons survive between tests by default and ``reset_singletons`` resets them on request."""
+    pytester.makeconftest(CONFTEST)
+    source = """
+        from conftest import Cache
+
+        def test_one(reset_singletons):
+            Cache().entries["a"] = 1
+
+        def test_two():
+            assert Cache().entries == {}
+            Cache().entries["b"] = 2
+
+        def test_three():
+            assert Cache().entries == {"b": 2}
+        """
+    pytester.makepyfile(source)
+    pytester.runpytest().assert_outcomes(passed=3)
+
+
+def test_frozen_singleton_is_built_once(pytester, plugin_installed):
+    """Test that a frozen singleton is built once per session and survives autoreset and manual resets."""
+    pytester.makeconftest(CONFTEST)
+    pytester.makeini("[pytest]\nsingleton_autoreset = true\n")
+    source = """
+        from conftest import Model
+
+        def test_one(model):
+            assert model.weights == [0, 1, 2, 3, 4]
+            Model.reset_instance()
+
+        def test_two(model):
+            assert Model.get_instance() is model
+            assert Model.built == 1
+        """
+    pytester.makepyfile(source)
+    pytester.runpytest().assert_outcomes(passed=2)
+
+
+def test_mutating_frozen_singleton_fails_and_is_restored(pytester, plugin_installed):
+    """Test that a test mutating a frozen singleton fails, and the next test sees the original state."""
+    pytester.makeconftest(CONFTEST)
+    source = """
+        def test_mutates(model):
+            model.weights.append(99)
+
+        def test_sees_original(model):
+            assert model.weights == [0, 1, 2, 3, 4]
+        """
+    pytester.makepyfile(source)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, errors=1)
+    result.stdout.fnmatch_lines(["*Test mutated frozen singleton Model*"])
+
+
+def test_rebinding_frozen_singleton_attribute_fails_and_is_restored(pytester, plugin_installed):
+    """Test that rebinding an attribute of a frozen singleton is caught without pickling it after each test."""
+    pytester.makeconftest(CONFTEST)
+    source = """
+        def test_rebinds(model):
+            model.weights = []
+
+        def test_in_place_change_is_not_checked_by_default(model):
+            assert model.weights == [0, 1, 2, 3, 4]
+            model.weights[0] = 99
+        """
+    pytester.makepyfile(source)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, errors=1)
+    result.stdout.fnmatch_lines(["*Test mutated frozen singleton Model*"])
+
+
+def test_deep_check_catches_changes_that_keep_sizes(pytester, plugin_installed):
+    """Test that singleton_check_frozen_deep pickles the instance after each test to catch in-place changes."""
+    pytester.makeconftest(CONFTEST)
+    pytester.makeini("[pytest]\nsingleton_check_frozen_deep = true\n")
+    source = """
+        def test_mutates(model):
+            model.weights[0] = 99
+
+        def test_sees_original(model):
+            assert model.weights == [0, 1, 2, 3, 4]
+        """
+    pytester.makepyfile(source)
+    result = pytester.runpytest()
+    result.assert_outcomes(passed=2, errors=1)
+    result.stdout.fnmatch_lines(["*Test mutated frozen singleton Model*"])
+
+
+def test_singleton_override_fixture(pytester, plugin_installed):
+    """Test that the fixture's overrides last until the end of the test."""
+    pytester.makeconftest(CONFTEST)
+    source = """
+        from conftest import Cache
+
+        def test_fake(singleton_override):
+            fake = singleton_override(Cache, "fake")
+            assert Cache.get_instance() == "fake"
+
+        def test_real():
+            assert isinstance(Cache(), Cache)
+        """
+    pytester.makepyfile(source)
+    pytester.runpytest().assert_outcomes(passed=2)
+
+
+def test_xdist_workers_are_isolated(pytester, plugin_installed):
+    """Test that autoreset and frozen singletons work in every pytest-xdist worker."""
+    pytest.importorskip("xdist")
+    pytester.makeconftest(CONFTEST)
+    pytester.makeini("[pytest]\nsingleton_autoreset = true\n")
+    source = """
+        from conftest import Cache, Model
+
+        def test_a(model):
+            Cache().entries["a"] = 1
+            assert Model.built == 1
+
+        def test_b(model):
+            assert Cache().entries == {}
+            assert Model.built == 1
+        """
+    pytester.makepyfile(**{f"test_worker_{index}": source for index in range(4)})
+    pytester.runpytest_subprocess("-n", "2").assert_outcomes(passed=8)
@@ -0,0 +1,174 @@
+from threading import Event
+from time import monotonic, sleep
+
+import pytest
+
+from singleton_base import RefreshingSingletonBase
+
+TTL = 0.1
+
+
+class FlagSnapshot(RefreshingSingletonBase):
+    ttl = TTL
+    version = 0
+    gate = Event()
+
+    def __init__(self, source: str):
+        FlagSnapshot.version += 1
+        if FlagSnapshot.version > 1:
+            FlagSnapshot.gate.wait(5)
+        self.source = source
+        self.version = FlagSnapshot.version
+
+
+class Credentials(RefreshingSingletonBase):
+    ttl = TTL
+    max_staleness = 0.1
+    fail = False
+    version = 0
+
+    def __init__(self):
+        if Credentials.fail:
+            raise ConnectionError("vault unavailable")
+        Credentials.version += 1
+        self.version = Credentials.version
+
+
+class Quotas(RefreshingSingletonBase):
+    ttl = TTL
+    refresh_backoff = 0.2
+    refresh_backoff_max = 0.3
+    fail = False
+    attempts = 0
+    version = 0
+
+    def __init__(self):
+        Quotas.attempts += 1
+        if Quotas.fail:
+            raise ConnectionError("quota service unavailable")
+        Quotas.version += 1
+        self.version = Quotas.version
+
+
+@pytest.fixture(autouse=True)
+def reset_snapshots():
+    for cls in (FlagSnapshot, Credentials, Quotas):
+        cls.reset_instance()
+        cls.version = 0
+    FlagSnapshot.gate.set()
+    Credentials.fail = False
+    Quotas.fail = False
+    Quotas.attempts = 0
+
+
+def wait_for(predicate, timeout: float = 2.0) -> None:
+    for _ in range(int(timeout / 0.01)):
+        if predicate():
+            return
+        sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def test_invalid_ttl():
+    """Test that a non-positive ttl is rejected at class creation."""
+    with pytest.raises(ValueError, match="ttl must be positive"):
+
+        class Broken(RefreshingSingletonBase):
+            ttl = 0
+
+
+def test_fresh_instance_is_returned_as_is():
+    """Test that nothing is rebuilt before the TTL expires."""
+    first = FlagSnapshot.get_instance(init=True, source="s3")
+
+    assert FlagSnapshot.get_instance() is first
+    assert FlagSnapshot() is first
+    assert FlagSnapshot.version == 1
+
+
+def test_expired_instance_is_served_while_refreshing():
+    """Test stale-while-revalidate: readers get the old instance until one background rebuild swaps in."""
+    first = FlagSnapshot.get_instance(init=True, source="s3")
+    FlagSnapshot.gate.clear()
+    sleep(TTL * 1.5)
+
+    readers = [FlagSnapshot.get_instance() for _ in range(20)]
+
+    assert all(reader is first for reader in readers)
+    FlagSnapshot.gate.set()
+    wait_for(lambda: FlagSnapshot.get_instance() is not first)
+    refreshed = FlagSnapshot.get_instance()
+    assert refreshed.version == 2
+    assert refreshed.source == "s3"
+    assert FlagSnapshot.version == 2
+
+
+def test_failed_refresh_keeps_current_instance():
+    """Test that a failing background refresh leaves the current instance in place."""
+    first = Credentials.get_instance(init=True)
+    Credentials.fail = True
+    sleep(TTL * 1.2)
+
+    assert Credentials.get_instance() is first
+    wait_for(lambda: Credentials._refresh.thread is None)
+    assert isinstance(Credentials._refresh.last_error, ConnectionError)
+
+
+def test_failed_refresh_backs_off_exponentially():
+    """Test that after a failed refresh, accesses do not retry until the backoff passes, and it doubles up to a cap."""
+    first = Quotas.get_instance(init=True)
+    Quotas.fail = True
+    sleep(TTL * 1.2)
+
+    Quotas.get_instance()
+    wait_for(lambda: Quotas._refresh.thread is None)
+    for _ in range(50):
+        assert Quotas.get_instance() is first
+    assert Quotas._refresh.thread is None
+    assert Quotas.attempts == 2
+
+    sleep(0.25)
+    Quotas.get_instance()
+    wait_for(lambda: Quotas._refresh.thread is None)
+    assert Quotas.attempts == 3
+    assert 0.2 < Quotas._refresh.retry_at - monotonic() <= 0.3
+
+    Quotas.fail = False
+    sleep(0.35)
+    Quotas.get_instance()
+    wait_for(lambda: Quotas.get_instance() is not first)
+    assert Quotas._refresh.failures == 0
+
+
+def test_invalid_refresh_backoff():
+    """Test that a negative backoff, or one above its cap, is rejected at class creation."""
+    with pytest.raises(ValueError, match="refresh_backoff"):
+
+        class Broken(RefreshingSingletonBase):
+            refresh_backoff = 10
+            refresh_backoff_max = 1
+
+
+def test_max_staleness_blocks_for_refresh_or_raises():
+    """Test that past max_staleness readers wait for the replacement, or fail loudly if it cannot be built."""
+    Credentials.get_instance(init=True)
+    sleep(TTL + 0.15)
+
+    assert Credentials.get_instance().version == 2
+
+    Credentials.fail = True
+    sleep(TTL + 0.15)
+    with pytest.raises(RuntimeError, match="past its max_staleness"):
+        Credentials.get_instance()
+
+
+def test_reset_during_refresh_wins():
+    """Test that a refresh finishing after reset_instance() does not resurrect the instance."""
+    FlagSnapshot.get_instance(init=True, source="s3")
+    FlagSnapshot.gate.clear()
+    FlagSnapshot.refresh()
+    FlagSnapshot.reset_instance()
+    FlagSnapshot.gate.set()
+
+    wait_for(lambda: FlagSnapshot._refresh.thread is None)
+    assert not FlagSnapshot.has_instance()
@@ -0,0 +1,114 @@
+from threading import get_ident
+from time import perf_counter, sleep
+
+import pytest
+
+from singleton_base import DependencyCycleError, SingletonBase, registered_singletons, warm_up
+
+BUILD_DELAY = 0.3
+
+
+class Database(SingletonBase):
+    def __init__(self, dsn: str = "sqlite://"):
+        sleep(BUILD_DELAY)
+        self.dsn = dsn
+        self.thread = get_ident()
+
+
+class Metrics(SingletonBase):
+    def __init__(self):
+        sleep(BUILD_DELAY)
+        self.thread = get_ident()
+
+
+class Repository(SingletonBase, depends_on=(Database,), eager=True):
+    def __init__(self):
+        assert Database.has_instance(), "Database should be built before Repository"
+        self.database = Database.get_instance()
+
+
+class Service(SingletonBase, depends_on=(Repository, Metrics)):
+    def __init__(self):
+        assert Repository.has_instance() and Metrics.has_instance()
+
+
+@pytest.fixture(autouse=True)
+def reset_singletons():
+    for cls in (Database, Metrics, Repository, Service):
+        cls.reset_instance()
+
+
+def test_subclasses_are_registered():
+    """Test that SingletonMeta records every subclass, but not the base class itself."""
+    registered = registered_singletons()
+
+    assert {Database, Metrics, Repository, Service} <= set(registered)
+    assert SingletonBase not in registered
+    assert registered.index(Database) < registered.index(Service)
+
+
+def test_variant_base_classes_are_not_registered():
+    """Test that only user classes are registered, not the variant bases the package itself defines."""
+    import singleton_base
+
+    registered = registered_singletons()
+
+    assert [cls for cls in registered if cls.__module__.startswith("singleton_base")] == []
+    for name in singleton_base.__all__:
+        assert getattr(singleton_base, name) not in registered
+    assert {Database, Metrics} <= set(registered)
+
+
+def test_depends_on_is_inherited():
+    """Test that subclasses inherit declared dependencies but not the eager flag."""
+
+    class SpecialRepository(Repository):
+        pass
+
+    assert SpecialRepository._depends_on == (Database,)
+    assert not SpecialRepository._eager
+
+
+def test_warm_up_builds_in_dependency_order_and_in_parallel():
+    """Test that independent singletons build concurrently and dependents wait for their dependencies."""
+    start = perf_counter()
+    timings = warm_up(Service, max_workers=4, kwargs={Database: {"dsn": "postgres://"}})
+    elapsed = perf_counter() - start
+
+    assert set(timings) == {Database, Metrics, Repository, Service}
+    assert list(timings)[-1] is Service
+    assert Database.get_instance().dsn == "postgres://"
+    assert Database.get_instance().thread != Metrics.get_instance().thread
+    assert timings[Database] >= BUILD_DELAY
+    assert elapsed < BUILD_DELAY * 1.8, f"Expected Database and Metrics to build in parallel, took {elapsed:.2f}s"
+
+
+def test_warm_up_defaults_to_eager_classes():
+    """Test that warm_up() with no classes builds the eager classes and their dependencies."""
+    timings = warm_up()
+
+    assert Repository in timings and Database in timings
+    assert not Metrics.has_instance()
+    assert not Service.has_instance()
+
+
+def test_warm_up_rejects_cycles():
+    """Test that a dependency cycle is reported with its full chain before anything is built."""
+
+    class First(SingletonBase):
+        pass
+
+    class Second(SingletonBase, depends_on=(First,)):
+        pass
+
+    class Third(SingletonBase, depends_on=(Second,)):
+        pass
+
+    First._depends_on = (Third,)
+
+    with pytest.raises(DependencyCycleError, match="Dependency cycle between singletons: ") as exc_info:
+        warm_up(Third)
+    cycle = exc_info.value.cycle
+    assert cycle[0] is cycle[-1]
+    assert set(cycle) == {First, Second, Third}
+    assert not any(cls.has_instance() for cls in (First, Second, Third))
@@ -0,0 +1,152 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+import pytest
+
+from singleton_base import SingletonBase
+
+
+class Parser(SingletonBase, scope="thread"):
+    def __init__(self, dialect: str = "default"):
+        self.dialect = dialect
+
+
+class RequestState(SingletonBase, scope="context"):
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+
+
+@pytest.fixture(autouse=True)
+def reset_scoped():
+    Parser.reset_instance(all_scopes=True)
+    RequestState.reset_instance(all_scopes=True)
+
+
+def test_invalid_scope():
+    """Test that an unknown scope is rejected at class creation."""
+    with pytest.raises(ValueError, match="scope must be one of"):
+
+        class Broken(SingletonBase, scope="galaxy"):
+            pass
+
+
+def test_scope_is_inherited():
+    """Test that subclasses keep the scope of their parent but get their own slot."""
+
+    class SqlParser(Parser):
+        pass
+
+    assert SqlParser._scope == "thread"
+    assert SqlParser._slot is not Parser._slot
+
+
+def test_thread_scope_gives_each_thread_its_own_instance():
+    """Test that each thread builds and keeps its own instance."""
+    main = Parser.get_instance(init=True, dialect="main")
+
+    results = []
+
+    def work(i: int):
+        first = Parser.get_instance(init=True, dialect=f"worker-{i}")
+        results.append((first, Parser.get_instance()))
+
+    threads = [Thread(target=work, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(first is again for first, again in results)
+    assert len({id(first) for first, _ in results}) == 4
+    assert sorted(first.dialect for first, _ in results) == [f"worker-{i}" for i in range(4)]
+    assert Parser.get_instance() is main
+
+
+def test_thread_scope_has_and_reset_are_per_thread():
+    """Test that has_instance and reset_instance only see the calling thread's instance."""
+    Parser.get_instance(init=True)
+    seen = {}
+
+    def other_thread():
+        seen["before"] = Parser.has_instance()
+        Parser.get_instance(init=True)
+        Parser.reset_instance()
+        seen["after"] = Parser.has_instance()
+
+    thread = Thread(target=other_thread)
+    thread.start()
+    thread.join()
+
+    assert seen == {"before": False, "after": False}
+    assert Parser.has_instance()
+
+
+def test_bulk_reset_clears_every_thread():
+    """Test that reset_instance(all_scopes=True) drops the instance of every thread."""
+    built = []
+
+    def build():
+        Parser.get_instance(init=True)
+        built.append(Parser.has_instance())
+
+    threads = [Thread(target=build) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    Parser.get_instance(init=True)
+
+    Parser.reset_instance(all_scopes=True)
+
+    assert built == [True, True, True]
+    assert not Parser.has_instance()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(Parser.has_instance).result() is False
+
+
+def test_context_scope_gives_each_task_its_own_instance():
+    """Test that concurrent asyncio tasks each resolve their own instance."""
+
+    async def handle(request_id: int) -> int:
+        RequestState.get_instance(init=True, request_id=request_id)
+        await asyncio.sleep(0.01)
+        return RequestState.get_instance().request_id
+
+    async def main():
+        return await asyncio.gather(*(handle(i) for i in range(5)))
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    assert not RequestState.has_instance()
+
+
+def test_context_scope_follows_copied_contexts():
+    """Test that a copied context starts with the instance of its parent but can replace it independently."""
+    RequestState.get_instance(init=True, request_id=1)
+    context = contextvars.copy_context()
+
+    def in_copy():
+        assert RequestState.get_instance().request_id == 1
+        RequestState.reset_instance()
+        return RequestState.get_instance(init=True, request_id=2).request_id
+
+    assert context.run(in_copy) == 2
+    assert RequestState.get_instance().request_id == 1
+
+    RequestState.reset_instance(all_scopes=True)
+    assert not RequestState.has_instance()
+    assert context.run(RequestState.has_instance) is False
+
+
+def test_context_scope_reset_all_scopes_does_not_grow_contexts():
+    """Test that resetting every context reuses one context variable instead of adding one per reset."""
+    RequestState.get_instance(init=True, request_id=0)
+    size = len(contextvars.copy_context())
+
+    for request_id in range(50):
+        RequestState.reset_instance(all_scopes=True)
+        RequestState.get_instance(init=True, request_id=request_id)
+
+    assert len(contextvars.copy_context()) == size
+    RequestState.reset_instance(all_scopes=True)
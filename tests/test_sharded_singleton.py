@@ -0,0 +1,127 @@
+from threading import Barrier, Lock, Thread
+
+import pytest
+
+from singleton_base import ShardedSingletonBase
+
+
+class RequestCounter(ShardedSingletonBase):
+    shards = 4
+
+    def __init__(self, start: int = 0):
+        self.lock = Lock()
+        self.count = start
+
+    def increment(self) -> None:
+        with self.lock:
+            self.count += 1
+
+    @classmethod
+    def merge(cls, shards: list["RequestCounter"]) -> int:
+        return sum(shard.count for shard in shards)
+
+
+class Plain(ShardedSingletonBase):
+    shards = 2
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    RequestCounter.reset_instance()
+    Plain.reset_instance()
+    yield
+    RequestCounter.reset_instance()
+    Plain.reset_instance()
+
+
+def run_threads(target, count: int) -> list:
+    barrier = Barrier(count)
+    results = [None] * count
+
+    def run(index: int):
+        barrier.wait()
+        results[index] = target()
+
+    threads = [Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_threads_get_their_own_shard():
+    """Test that each thread keeps one shard, distinct from the others' while there are enough shards."""
+    shards = run_threads(lambda: (RequestCounter.get_instance(init=True), RequestCounter()), 4)
+
+    assert all(first is second for first, second in shards)
+    assert len({id(first) for first, _ in shards}) == 4
+    assert len(RequestCounter.shard_instances()) == 4
+
+
+def test_threads_share_shards_beyond_the_shard_count():
+    """Test that more threads than shards are spread over the fixed number of shards."""
+    RequestCounter.get_instance(init=True)
+    run_threads(RequestCounter.get_instance, 12)
+    assert len(RequestCounter.shard_instances()) == 4
+
+
+def test_merged_combines_every_shard():
+    """Test that increments spread over shards add up when merged."""
+
+    def work():
+        counter = RequestCounter.get_instance(init=True)
+        for _ in range(1000):
+            counter.increment()
+
+    run_threads(work, 10)
+
+    assert RequestCounter.merged() == 10_000
+    assert sum(shard.count for shard in RequestCounter.shard_instances()) == 10_000
+
+
+def test_shards_are_built_with_the_first_arguments():
+    """Test that later shards reuse the first shard's arguments, built on first use by their thread."""
+    with pytest.raises(RuntimeError, match="not initialized"):
+        RequestCounter.get_instance()
+
+    first = run_threads(lambda: RequestCounter.get_instance(init=True, start=5), 1)[0]
+    second = run_threads(RequestCounter.get_instance, 1)[0]
+
+    assert second is not first
+    assert second.count == 5
+    assert RequestCounter.merged() == 10
+
+
+def test_reset_drops_every_shard():
+    """Test that resetting drops all shards and their arguments."""
+    RequestCounter.get_instance(init=True, start=3)
+    run_threads(RequestCounter.get_instance, 2)
+    assert RequestCounter.has_instance()
+
+    RequestCounter.reset_instance()
+
+    assert not RequestCounter.has_instance()
+    assert RequestCounter.merged() == 0
+    with pytest.raises(RuntimeError):
+        RequestCounter.get_instance()
+
+
+def test_default_merge_returns_the_shards():
+    """Test that without a merge hook, merged() returns the shards."""
+    shard = Plain()
+    assert Plain.merged() == [shard]
+
+
+def test_invalid_shard_count():
+    """Test that a shard count below one is rejected when the class is defined."""
+    with pytest.raises(ValueError, match="shards must be at least 1"):
+
+        class Empty(ShardedSingletonBase):
+            shards = 0
+
+
+def test_cannot_be_swapped():
+    """Test that a sharded singleton has no single instance to replace."""
+    with pytest.raises(TypeError, match="no single instance"):
+        Plain.reload()
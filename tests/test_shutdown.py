@@ -0,0 +1,291 @@
+import asyncio
+import subprocess
+import sys
+import textwrap
+from threading import Event, Lock, Thread
+from time import perf_counter, sleep
+
+import pytest
+
+from singleton_base import KeyedSingletonBase, SingletonBase, ashutdown_all, shutdown_all
+
+closed: list[str] = []
+closed_lock = Lock()
+
+
+def record(name: str) -> None:
+    with closed_lock:
+        closed.append(name)
+
+
+class Database(SingletonBase):
+    def close(self) -> None:
+        record("Database")
+
+
+class Repository(SingletonBase, depends_on=(Database,)):
+    def close(self) -> None:
+        record("Repository")
+
+
+class EventBus(SingletonBase):
+    async def aclose(self) -> None:
+        await asyncio.sleep(0)
+        record("EventBus")
+
+
+class Cache(SingletonBase):
+    def close(self) -> None:
+        record("Cache")
+
+
+class Service(SingletonBase):
+    def __init__(self):
+        self.cache = Cache()
+
+    def close(self) -> None:
+        record("Service")
+
+
+class SlowA(SingletonBase):
+    def close(self) -> None:
+        sleep(0.3)
+        record("SlowA")
+
+
+class SlowB(SingletonBase):
+    def close(self) -> None:
+        sleep(0.3)
+        record("SlowB")
+
+
+release = Event()
+
+
+class Hanging(SingletonBase, depends_on=(Database,)):
+    def close(self) -> None:
+        release.wait(5)
+
+
+class Broken(SingletonBase, depends_on=(Database,)):
+    def close(self) -> None:
+        raise OSError("socket already gone")
+
+
+class Tenant(KeyedSingletonBase):
+    def __init__(self, key: str):
+        self.key = key
+
+    def close(self) -> None:
+        record(f"Tenant[{self.key}]")
+
+
+class LoopWorker(SingletonBase):
+    """Owns a task on the event loop it was built on, which only that loop can await."""
+
+    def __init__(self):
+        self.stop = asyncio.Event()
+        self.task = asyncio.ensure_future(self.stop.wait())
+
+    async def aclose(self) -> None:
+        self.stop.set()
+        await self.task
+        record("LoopWorker")
+
+
+class Stuck(SingletonBase):
+    async def aclose(self) -> None:
+        await asyncio.sleep(10)
+
+
+ALL = (Database, Repository, EventBus, Cache, Service, SlowA, SlowB, Hanging, Broken, Tenant, LoopWorker, Stuck)
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    release.clear()
+    closed.clear()
+    for cls in ALL:
+        cls.reset_instance()
+    yield
+    release.set()
+    for cls in ALL:
+        cls.reset_instance()
+
+
+def test_close_and_aclose_are_called_and_instances_reset():
+    """Test that close() and aclose() are both honoured and the classes are reset afterwards."""
+    Database()
+    EventBus()
+
+    report = shutdown_all(Database, EventBus)
+
+    assert sorted(closed) == ["Database", "EventBus"]
+    assert set(report.closed) == {Database, EventBus}
+    assert report.ok
+    assert not Database.has_instance() and not EventBus.has_instance()
+
+
+def test_classes_without_an_instance_are_left_alone():
+    """Test that only classes with an instance are closed."""
+    report = shutdown_all(Database, Repository)
+    assert closed == [] and report.closed == {}
+
+
+def test_dependents_close_before_their_dependencies():
+    """Test that a class is closed after the classes that declare it in depends_on, even if built later."""
+    Repository()
+    Database()
+
+    shutdown_all(Database, Repository)
+
+    assert closed == ["Repository", "Database"]
+
+
+def test_construction_nesting_orders_closing():
+    """Test that a singleton built inside another's __init__ is closed after it."""
+    Service()
+
+    shutdown_all(Cache, Service)
+
+    assert closed == ["Service", "Cache"]
+
+
+def test_unrelated_classes_close_in_parallel():
+    """Test that unrelated classes are closed at the same time, and one at a time with parallel=False."""
+    SlowA()
+    SlowB()
+    start = perf_counter()
+    report = shutdown_all(SlowA, SlowB)
+    assert perf_counter() - start < 0.55
+    assert set(report.closed) == {SlowA, SlowB}
+
+    SlowA()
+    SlowB()
+    closed.clear()
+    start = perf_counter()
+    shutdown_all(SlowA, SlowB, parallel=False)
+    assert perf_counter() - start >= 0.6
+    assert closed == ["SlowB", "SlowA"]
+
+
+def test_deadline_reports_overruns_and_skips_their_dependencies():
+    """Test that a close still running at the deadline is reported, and what waits on it is never started."""
+    Database()
+    Hanging()
+    Cache()
+
+    start = perf_counter()
+    report = shutdown_all(Database, Hanging, Cache, timeout=0.2)
+
+    assert perf_counter() - start < 1.0
+    assert report.timed_out == [Hanging]
+    assert report.skipped == [Database]
+    assert Cache in report.closed
+    assert not report.ok
+    assert Database.has_instance()
+
+
+def test_failing_close_is_reported_and_still_resets():
+    """Test that an exception from close() is reported, the class is reset and its dependencies still close."""
+    Database()
+    Broken()
+
+    report = shutdown_all(Database, Broken)
+
+    assert isinstance(report.failed[Broken], OSError)
+    assert Database in report.closed
+    assert not Broken.has_instance()
+    assert closed == ["Database"]
+
+
+def test_every_key_of_a_keyed_singleton_is_closed():
+    """Test that keyed singletons close the instance of every key."""
+    Tenant.get_instance("acme", init=True)
+    Tenant.get_instance("globex", init=True)
+
+    shutdown_all(Tenant)
+
+    assert sorted(closed) == ["Tenant[acme]", "Tenant[globex]"]
+    assert not Tenant.has_instance("acme")
+
+
+def test_shutdown_at_exit():
+    """Test that enable_shutdown_at_exit closes singletons when the interpreter exits."""
+    source = """
+        from singleton_base import SingletonBase, enable_shutdown_at_exit
+
+        class Pool(SingletonBase):
+            def close(self):
+                print("pool closed", flush=True)
+
+        class Worker(SingletonBase):
+            def close(self):
+                print("worker closed", flush=True)
+
+        Pool()
+        Worker()
+        enable_shutdown_at_exit(timeout=5)
+        """
+    script = textwrap.dedent(source)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert "pool closed" in result.stdout and "worker closed" in result.stdout
+
+    disabled = script + "\nfrom singleton_base import disable_shutdown_at_exit\ndisable_shutdown_at_exit()\n"
+    result = subprocess.run([sys.executable, "-c", disabled], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert "closed" not in result.stdout
+
+
+def test_aclose_runs_on_the_loop_that_built_the_instance():
+    """Test that shutdown_all awaits aclose() on the still running loop the instance was built on."""
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def build():
+        return LoopWorker()
+
+    try:
+        asyncio.run_coroutine_threadsafe(build(), loop).result(5)
+        report = shutdown_all(LoopWorker)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+    assert report.ok
+    assert closed == ["LoopWorker"]
+
+
+def test_ashutdown_all_closes_on_the_running_loop():
+    """Test that ashutdown_all awaits aclose() on the running loop and runs close() on a thread."""
+
+    async def main():
+        LoopWorker()
+        Database()
+        with pytest.raises(RuntimeError, match="ashutdown_all"):
+            shutdown_all(LoopWorker)
+        return await ashutdown_all(LoopWorker, Database)
+
+    report = asyncio.run(main())
+
+    assert report.ok
+    assert sorted(closed) == ["Database", "LoopWorker"]
+    assert not LoopWorker.has_instance()
+
+
+def test_ashutdown_all_cancels_closes_past_the_deadline():
+    """Test that ashutdown_all cancels an aclose() still running at the deadline and reports it."""
+
+    async def main():
+        Stuck()
+        return await ashutdown_all(Stuck, timeout=0.1)
+
+    start = perf_counter()
+    report = asyncio.run(main())
+
+    assert perf_counter() - start < 1.0
+    assert report.timed_out == [Stuck]
+    assert not Stuck.has_instance()
@@ -0,0 +1,222 @@
+import logging
+from time import monotonic
+
+import pytest
+
+from singleton_base import KeyedSingletonBase, RefreshingSingletonBase, SingletonBase, restore_all, snapshot_all
+
+
+class SearchIndex(SingletonBase):
+    snapshot_version = 1
+    builds = 0
+
+    def __init__(self, words: tuple = ("alpha", "beta")):
+        SearchIndex.builds += 1
+        self.postings = {word: [i] for i, word in enumerate(words)}
+        self.connection = object()
+
+    def __getstate__(self) -> dict:
+        return {"postings": self.postings}
+
+    def __setstate__(self, state: dict) -> None:
+        self.postings = state["postings"]
+        self.connection = object()
+
+
+class Vocabulary(SingletonBase):
+    snapshot_version = "2024-01"
+
+    def __init__(self):
+        self.tokens = ["<pad>", "<unk>"]
+
+
+class Unversioned(SingletonBase):
+    pass
+
+
+class Flags(RefreshingSingletonBase):
+    snapshot_version = 1
+    ttl = 60
+
+    def __init__(self, source: str = "defaults"):
+        self.source = source
+
+
+class Rates(RefreshingSingletonBase):
+    snapshot_version = 1
+    ttl = 60
+
+    def __init__(self, region: str):
+        self.region = region
+
+
+class Tenant(KeyedSingletonBase):
+    snapshot_version = 1
+
+    def __init__(self, key: str):
+        self.key = key
+
+
+@pytest.fixture(autouse=True)
+def reset_snapshotted():
+    for cls in (SearchIndex, Vocabulary, Unversioned, Flags, Rates):
+        cls.reset_instance()
+    Tenant.reset_instance("acme")
+    SearchIndex.builds = 0
+
+
+def test_restore_skips_the_build(tmp_path):
+    """Test that a restored instance has the saved state and is published without running __init__."""
+    path = tmp_path / "index.snapshot"
+    original = SearchIndex.get_instance(init=True, words=("gamma",))
+    SearchIndex.snapshot(path)
+    SearchIndex.reset_instance()
+
+    restored = SearchIndex.get_instance(init=True, restore_from=path)
+
+    assert restored is not original
+    assert restored.postings == {"gamma": [0]}
+    assert restored.connection is not original.connection
+    assert SearchIndex.builds == 1
+    assert SearchIndex.get_instance() is restored
+    assert SearchIndex() is restored
+
+
+def test_stale_snapshot_falls_back_to_a_build(tmp_path, monkeypatch, caplog):
+    """Test that a snapshot written by another version is rejected and the instance is built normally."""
+    path = tmp_path / "index.snapshot"
+    SearchIndex.get_instance(init=True)
+    SearchIndex.snapshot(path)
+    SearchIndex.reset_instance()
+    monkeypatch.setattr(SearchIndex, "snapshot_version", 2)
+
+    with caplog.at_level(logging.WARNING):
+        instance = SearchIndex.get_instance(init=True, restore_from=path, words=("delta",))
+
+    assert instance.postings == {"delta": [0]}
+    assert SearchIndex.builds == 2
+    assert "Ignoring stale snapshot" in caplog.text
+
+
+def test_snapshot_of_another_class_is_rejected(tmp_path):
+    """Test that a snapshot is only restored into the class that wrote it."""
+    path = tmp_path / "vocab.snapshot"
+    Vocabulary.get_instance(init=True)
+    Vocabulary.snapshot(path)
+
+    SearchIndex.get_instance(init=True, restore_from=path)
+    assert SearchIndex.builds == 1
+
+
+@pytest.mark.parametrize("content", [None, b"not a pickle"])
+def test_missing_or_corrupt_snapshot_falls_back_to_a_build(tmp_path, content):
+    """Test that a missing or unreadable snapshot builds the instance instead of failing."""
+    path = tmp_path / "index.snapshot"
+    if content is not None:
+        path.write_bytes(content)
+
+    instance = SearchIndex.get_instance(init=True, restore_from=path)
+
+    assert instance.postings == {"alpha": [0], "beta": [1]}
+    assert SearchIndex.builds == 1
+
+
+def test_existing_instance_wins_over_snapshot(tmp_path):
+    """Test that restore_from is ignored when the instance already exists."""
+    path = tmp_path / "index.snapshot"
+    instance = SearchIndex.get_instance(init=True)
+    SearchIndex.snapshot(path)
+
+    assert SearchIndex.get_instance(init=True, restore_from=path) is instance
+
+
+def test_snapshot_requires_opt_in_and_an_instance(tmp_path):
+    """Test that classes without snapshot_version cannot be snapshotted, nor can unbuilt ones."""
+    Unversioned.get_instance(init=True)
+    with pytest.raises(TypeError, match="set `snapshot_version`"):
+        Unversioned.snapshot(tmp_path / "x.snapshot")
+    with pytest.raises(RuntimeError, match="not initialized"):
+        SearchIndex.snapshot(tmp_path / "index.snapshot")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_snapshot_all_and_restore_all(tmp_path, monkeypatch):
+    """Test that every built, versioned singleton is saved and restored, and stale ones are left unbuilt."""
+    SearchIndex.get_instance(init=True)
+    Vocabulary.get_instance(init=True)
+    Unversioned.get_instance(init=True)
+
+    written = snapshot_all(tmp_path)
+
+    assert set(written) >= {SearchIndex, Vocabulary}
+    assert Unversioned not in written
+    for cls in (SearchIndex, Vocabulary, Unversioned):
+        cls.reset_instance()
+    monkeypatch.setattr(Vocabulary, "snapshot_version", "2025-01")
+
+    restored = restore_all(tmp_path)
+
+    assert restored[SearchIndex] is True
+    assert restored[Vocabulary] is False
+    assert SearchIndex.has_instance() and SearchIndex.builds == 1
+    assert not Vocabulary.has_instance()
+
+
+def test_variants_reject_restore_from(tmp_path):
+    """Test that variants with their own construction path refuse to restore a snapshot."""
+    from singleton_base import HostSingletonBase
+
+    class Shared(HostSingletonBase):
+        snapshot_version = 1
+
+    with pytest.raises(TypeError, match="cannot be restored"):
+        Shared.get_instance(init=True, restore_from=tmp_path / "shared.snapshot")
+
+
+def test_restored_ttl_instance_expires_and_refreshes(tmp_path):
+    """Test that a TTL singleton restored from a snapshot gets an expiry and is refreshed with the given kwargs."""
+    path = tmp_path / "flags.snapshot"
+    Flags.get_instance(init=True, source="snapshot")
+    Flags.snapshot(path)
+    Flags.reset_instance()
+
+    restored = Flags.get_instance(init=True, restore_from=path, source="service")
+
+    assert restored.source == "snapshot"
+    assert monotonic() < Flags._refresh.expires_at <= monotonic() + Flags.ttl
+    Flags._refresh.expires_at = 0
+    Flags.get_instance()
+    thread = Flags._refresh.thread
+    if thread is not None:
+        thread.join(5)
+    assert Flags.get_instance().source == "service"
+
+
+def test_restore_all_publishes_with_the_given_kwargs(tmp_path):
+    """Test that restore_all records each class's kwargs, so a restored TTL singleton refreshes with them."""
+    Rates.get_instance(init=True, region="eu")
+    snapshot_all(tmp_path)
+    Rates.reset_instance()
+
+    restored = restore_all(tmp_path, kwargs={Rates: {"region": "us"}})
+
+    assert restored[Rates] is True
+    assert Rates.get_instance().region == "eu"
+    Rates._start_refresh(force=True).join(5)
+    assert Rates._refresh.last_error is None
+    assert Rates.get_instance().region == "us"
+
+
+def test_keyed_classes_are_skipped_by_snapshot_all_and_restore_all(tmp_path, caplog):
+    """Test that a keyed class setting snapshot_version is skipped with a warning and rejects snapshot()."""
+    Tenant.get_instance("acme", init=True)
+    (tmp_path / f"{__name__}.Tenant.snapshot").write_bytes(b"")
+
+    with caplog.at_level(logging.WARNING):
+        written = snapshot_all(tmp_path)
+        restored = restore_all(tmp_path)
+
+    assert Tenant not in written and Tenant not in restored
+    assert "Skipping Tenant" in caplog.text
+    with pytest.raises(TypeError, match="cannot be restored or snapshotted"):
+        Tenant.snapshot(tmp_path / "tenant.snapshot")
@@ -0,0 +1,76 @@
+import gc
+from time import sleep
+
+import pytest
+
+from singleton_base import SingletonBase
+
+KEEP_ALIVE = 0.2
+
+
+class ReportGenerator(SingletonBase, weak=True):
+    built = 0
+
+    def __init__(self, size: int = 10):
+        ReportGenerator.built += 1
+        self.buffer = bytearray(size)
+
+
+class LookupCache(SingletonBase, weak=True, keep_alive=KEEP_ALIVE):
+    def __init__(self):
+        self.table = {}
+
+
+@pytest.fixture(autouse=True)
+def reset_weak():
+    ReportGenerator.reset_instance()
+    ReportGenerator.built = 0
+    LookupCache.reset_instance()
+
+
+def test_weak_requires_process_scope():
+    """Test that weak mode is rejected for thread and context scopes."""
+    with pytest.raises(ValueError, match="only supported with scope='process'"):
+
+        class Broken(SingletonBase, weak=True, scope="thread"):
+            pass
+
+
+def test_weak_instance_lives_while_referenced():
+    """Test that a referenced weak singleton behaves like a normal one."""
+    report = ReportGenerator.get_instance(init=True)
+    gc.collect()
+
+    assert ReportGenerator.has_instance()
+    assert ReportGenerator.get_instance() is report
+    assert ReportGenerator() is report
+    assert ReportGenerator.built == 1
+
+
+def test_weak_instance_is_freed_and_rebuilt():
+    """Test that the instance is freed once unreferenced and rebuilt by the next get_instance(init=True)."""
+    ReportGenerator.get_instance(init=True, size=1024)
+    gc.collect()
+
+    assert not ReportGenerator.has_instance()
+    with pytest.raises(RuntimeError, match="not initialized yet"):
+        ReportGenerator.get_instance()
+
+    rebuilt = ReportGenerator.get_instance(init=True, size=8)
+    assert len(rebuilt.buffer) == 8
+    assert ReportGenerator.built == 2
+
+
+def test_keep_alive_holds_instance_after_last_use():
+    """Test that keep_alive holds the instance for the grace period after the last access only."""
+    first_id = id(LookupCache.get_instance(init=True))
+    gc.collect()
+    assert LookupCache.has_instance()
+
+    for _ in range(3):
+        sleep(KEEP_ALIVE / 2)
+        assert id(LookupCache.get_instance()) == first_id
+
+    sleep(KEEP_ALIVE * 2.5)
+    gc.collect()
+    assert not LookupCache.has_instance()